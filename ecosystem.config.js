@@ -40,6 +40,30 @@ module.exports = {
       max_restarts: 10,
       restart_delay: 2000,
     },
+    // Urgent trigger — starts an --urgent-only scheduler run as soon as an
+    // urgent email / WhatsApp action file lands in Needs_Action
+    {
+      name: "urgent-trigger",
+      script: "src/urgent_trigger.py",
+      interpreter: "D:\\ai-employee-project\\.venv\\Scripts\\python.exe",
+      cwd: "D:\\ai-employee-project",
+      watch: false,
+      autorestart: true,
+      max_restarts: 10,
+      restart_delay: 2000,
+    },
+    // Expiry sweeper — flags drafts in Pending_Approval the moment their
+    // approval deadline passes
+    {
+      name: "expiry-sweeper",
+      script: "src/expiry_sweeper.py",
+      interpreter: "D:\\ai-employee-project\\.venv\\Scripts\\python.exe",
+      cwd: "D:\\ai-employee-project",
+      watch: false,
+      autorestart: true,
+      max_restarts: 10,
+      restart_delay: 2000,
+    },
     // AI scheduler — runs every 30 min to trigger reasoning tasks
     // Note: WhatsApp watcher is NOT here — start it manually with --first-run for QR scan
     {
@@ -51,5 +75,17 @@ module.exports = {
       autorestart: false,
       watch: false,
     },
+    // Vault maintenance — nightly: partitions stray files in Done/, Plans/ and
+    // Logs/ by month and rolls old months into archive/YYYY-MM.zip
+    {
+      name: "vault-maintenance",
+      script: "src/vault_archive.py",
+      args: "compact",
+      interpreter: "D:\\ai-employee-project\\.venv\\Scripts\\python.exe",
+      cwd: "D:\\ai-employee-project",
+      cron_restart: "30 3 * * *",
+      autorestart: false,
+      watch: false,
+    },
   ],
 };
@@ -1,5 +1,358 @@
-def main():
-    print("Hello from ai-employee-project!")
+"""
+AI Employee — single-process supervisor
+Runs the watchers and the scheduled jobs in one Python process instead of
+one PM2 interpreter each, so libraries are imported, .env is loaded and
+logging is configured once.
+
+- Long-running components (file drop watcher, orchestrator, Gmail watcher,
+  urgent trigger, expiry sweeper) each run their blocking loop in a worker
+  thread under an asyncio task. They share one watchdog observer — every
+  handler is wrapped so its exceptions are logged instead of stopping the
+  observer for everyone — and one pooled HTTP session for the LinkedIn and
+  Tavily calls. Each component's run() takes these as optional arguments
+  and creates its own when run as a script.
+- The observer delivers every component's events on one thread, so a slow
+  handler would hold up all the others. Handlers on it must only queue
+  work (DropBatcher, UrgentTrigger, ExpirySweeper and the orchestrator's
+  approval queue all do) and never execute it themselves.
+- A component that crashes or returns is restarted with exponential backoff
+  (BACKOFF_INITIAL doubling up to BACKOFF_MAX, reset once a run has lasted
+  STABLE_AFTER). One that exits on purpose (missing token, missing package)
+  is not restarted; the others keep running.
+- The cron jobs keep their PM2 schedules: the news fetch and vault
+  maintenance run in-process; the reasoning scheduler is still started as a
+  subprocess, as the urgent trigger does, because each run holds the
+  scheduler's run lock and spends its time in Claude Code processes anyway.
+
+The WhatsApp watcher stays manual (it needs a visible browser for QR scans).
+Run this instead of the ecosystem.config.js apps, not alongside them.
+
+Usage:
+    uv run python main.py
+    uv run python main.py --only file-watcher orchestrator
+    uv run python main.py --skip gmail-watcher news-watcher
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import requests
+from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+
+PROJECT_DIR = Path(__file__).resolve().parent
+# Components import each other by module name, as when run as scripts (this
+# also runs in the file watcher's extraction worker processes)
+sys.path[:0] = [str(PROJECT_DIR / "src"), str(PROJECT_DIR / "src" / "watchers")]
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+load_dotenv(PROJECT_DIR / ".env")
+
+BACKOFF_INITIAL = 2    # seconds before the first restart
+BACKOFF_MAX = 300      # restart delay ceiling
+STABLE_AFTER = 600     # a component that ran this long restarts with the initial delay again
+CLOCK_CHECK = 60       # scheduled jobs re-check the wall clock at least this often
+HTTP_POOL_SIZE = 8     # connections kept per host by the shared session
+
+# Same schedules as ecosystem.config.js (local time)
+NEWS_AT = (8, 0)
+MAINTENANCE_AT = (3, 30)
+SCHEDULER_EVERY_MINUTES = 30
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s  [%(levelname)s]  %(name)s: %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+log = logging.getLogger("supervisor")
+
+
+# ---------------------------------------------------------------------------
+# Shared resources
+# ---------------------------------------------------------------------------
+
+class _Guarded(FileSystemEventHandler):
+    """One component's handler; its exceptions are logged, not raised into the observer."""
+
+    def __init__(self, handler: FileSystemEventHandler) -> None:
+        super().__init__()
+        self._handler = handler
+
+    def dispatch(self, event: FileSystemEvent) -> None:
+        try:
+            self._handler.dispatch(event)
+        except Exception:
+            log.exception("%s failed on %s", type(self._handler).__name__, event.src_path)
+
+
+class SharedObserver(Observer):
+    """
+    The one watchdog observer every component schedules its folder on.
+    Its handlers run on a single thread and must only queue work.
+    """
+
+    def schedule(self, event_handler, path, *, recursive=False, **kwargs):
+        return super().schedule(_Guarded(event_handler), path, recursive=recursive, **kwargs)
+
+
+class Shared:
+    """What the components share: the observer and the HTTP session."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._observer: BaseObserver | None = None
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def observer(self) -> BaseObserver:
+        """The running observer — a fresh one if the last has died."""
+        with self._lock:
+            if self._observer is None or not self._observer.is_alive():
+                if self._observer is not None:
+                    log.warning("Shared file system observer stopped — starting a new one")
+                self._observer = SharedObserver()
+                self._observer.start()
+            return self._observer
+
+    def close(self) -> None:
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+        self.session.close()
+
+
+# ---------------------------------------------------------------------------
+# Components
+# ---------------------------------------------------------------------------
+# Imported inside each function, so one that cannot load (missing package or
+# setting) fails on its own instead of taking the supervisor down.
+
+def _file_watcher(stop: threading.Event, shared: Shared) -> None:
+    import filesystem_watcher
+    filesystem_watcher.run(stop, shared.observer())
+
+
+def _orchestrator(stop: threading.Event, shared: Shared) -> None:
+    import orchestrator
+    orchestrator.run(stop, shared.observer(), shared.session)
+
+
+def _gmail_watcher(stop: threading.Event, shared: Shared) -> None:
+    import gmail_watcher
+    gmail_watcher.run(stop)
+
+
+def _urgent_trigger(stop: threading.Event, shared: Shared) -> None:
+    import urgent_trigger
+    urgent_trigger.run(stop, shared.observer())
+
+
+def _expiry_sweeper(stop: threading.Event, shared: Shared) -> None:
+    import expiry_sweeper
+    expiry_sweeper.run(stop, shared.observer())
+
+
+COMPONENTS: dict[str, Callable[[threading.Event, Shared], None]] = {
+    "file-watcher": _file_watcher,
+    "orchestrator": _orchestrator,
+    "gmail-watcher": _gmail_watcher,
+    "urgent-trigger": _urgent_trigger,
+    "expiry-sweeper": _expiry_sweeper,
+}
+
+
+# ---------------------------------------------------------------------------
+# Scheduled jobs
+# ---------------------------------------------------------------------------
+
+def _daily(hour: int, minute: int) -> Callable[[datetime], datetime]:
+    def next_run(now: datetime) -> datetime:
+        due = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        return due if due > now else due + timedelta(days=1)
+    return next_run
+
+
+def _every(minutes: int) -> Callable[[datetime], datetime]:
+    def next_run(now: datetime) -> datetime:
+        due = now.replace(minute=0, second=0, microsecond=0)
+        while due <= now:
+            due += timedelta(minutes=minutes)
+        return due
+    return next_run
+
+
+async def _news(shared: Shared, stopping: asyncio.Event) -> None:
+    def fetch() -> None:
+        import news_watcher
+        news_watcher.run(shared.session)
+    await asyncio.to_thread(fetch)
+
+
+async def _maintenance(shared: Shared, stopping: asyncio.Event) -> None:
+    def sweep() -> None:
+        import vault_archive
+        vault_archive.migrate()
+        vault_archive.compact()
+    await asyncio.to_thread(sweep)
+
+
+async def _scheduler(shared: Shared, stopping: asyncio.Event) -> None:
+    proc = await asyncio.create_subprocess_exec(
+        sys.executable, str(PROJECT_DIR / "src" / "scheduler.py"), cwd=str(PROJECT_DIR),
+    )
+    finished = asyncio.ensure_future(proc.wait())
+    stopped = asyncio.ensure_future(stopping.wait())
+    await asyncio.wait({finished, stopped}, return_when=asyncio.FIRST_COMPLETED)
+    stopped.cancel()
+    if not finished.done():
+        log.info("Stopping the running scheduler (its lock lease lets the next run recover)")
+        proc.terminate()
+    if await finished:
+        log.warning("Scheduler run exited with code %d", proc.returncode)
+
+
+JOBS: dict[str, tuple[Callable[[datetime], datetime], Callable[[Shared, asyncio.Event], Awaitable[None]]]] = {
+    "news-watcher": (_daily(*NEWS_AT), _news),
+    "ai-scheduler": (_every(SCHEDULER_EVERY_MINUTES), _scheduler),
+    "vault-maintenance": (_daily(*MAINTENANCE_AT), _maintenance),
+}
+
+
+# ---------------------------------------------------------------------------
+# Supervision
+# ---------------------------------------------------------------------------
+
+async def _wait(stopping: asyncio.Event, seconds: float) -> bool:
+    """Sleep for seconds; True if the supervisor is stopping."""
+    try:
+        await asyncio.wait_for(stopping.wait(), timeout=max(seconds, 0))
+        return True
+    except TimeoutError:
+        return False
+
+
+async def _supervise(name: str, target: Callable[[threading.Event, Shared], None],
+                     shared: Shared, stop: threading.Event, stopping: asyncio.Event) -> None:
+    """Run one component in a worker thread, restarting it with backoff until stopped."""
+    delay = BACKOFF_INITIAL
+    while not stopping.is_set():
+        started = time.monotonic()
+        try:
+            await asyncio.to_thread(target, stop, shared)
+        except SystemExit as exc:
+            log.error("%s exited (code %s) — not restarting", name, exc.code)
+            return
+        except ImportError as exc:
+            log.error("%s cannot be loaded (%s) — not restarting", name, exc)
+            return
+        except Exception:
+            log.exception("%s crashed", name)
+        else:
+            if stopping.is_set():
+                return
+            log.warning("%s stopped unexpectedly", name)
+
+        if time.monotonic() - started >= STABLE_AFTER:
+            delay = BACKOFF_INITIAL
+        log.info("Restarting %s in %d s", name, delay)
+        if await _wait(stopping, delay):
+            return
+        delay = min(delay * 2, BACKOFF_MAX)
+
+
+async def _run_job(name: str, next_run: Callable[[datetime], datetime],
+                   job: Callable[[Shared, asyncio.Event], Awaitable[None]],
+                   shared: Shared, stopping: asyncio.Event) -> None:
+    """Run one scheduled job at each due time; a failure only costs that run."""
+    while True:
+        due = next_run(datetime.now())
+        while (remaining := (due - datetime.now()).total_seconds()) > 0:
+            if await _wait(stopping, min(remaining, CLOCK_CHECK)):
+                return
+        log.info("Running scheduled job %s", name)
+        try:
+            await job(shared, stopping)
+        except SystemExit as exc:
+            log.error("%s exited (code %s)", name, exc.code)
+        except Exception:
+            log.exception("%s failed", name)
+        if stopping.is_set():
+            return
+
+
+async def supervise(components: list[str], jobs: list[str]) -> None:
+    stop = threading.Event()   # seen by the component threads
+    stopping = asyncio.Event()  # seen by the supervising tasks
+    shared = Shared()
+
+    tasks = [
+        asyncio.create_task(_supervise(name, COMPONENTS[name], shared, stop, stopping), name=name)
+        for name in components
+    ] + [
+        asyncio.create_task(_run_job(name, *JOBS[name], shared, stopping), name=name)
+        for name in jobs
+    ]
+    main_task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, main_task.cancel)
+    except (NotImplementedError, AttributeError):
+        pass  # Windows: Ctrl+C (KeyboardInterrupt) still cancels this task
+
+    log.info("Supervisor started — components: %s; jobs: %s", ", ".join(components) or "-", ", ".join(jobs) or "-")
+    try:
+        await asyncio.wait(tasks)  # only returns once every task has given up
+    finally:
+        log.info("Shutting down...")
+        stop.set()
+        stopping.set()
+        # Not cancelled: each task waits for its thread / subprocess to finish cleanly
+        await asyncio.wait(tasks)
+        shared.close()
+        log.info("Supervisor stopped.")
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def _parse_args() -> argparse.Namespace:
+    names = [*COMPONENTS, *JOBS]
+    parser = argparse.ArgumentParser(description="Run every AI Employee component in one process")
+    parser.add_argument("--only", nargs="+", choices=names, metavar="NAME",
+                        help=f"Run only these ({', '.join(names)})")
+    parser.add_argument("--skip", nargs="+", choices=names, default=[], metavar="NAME",
+                        help="Run everything except these")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = _parse_args()
+    os.chdir(PROJECT_DIR)  # components keep their state under secrets/, relative to the project
+    selected = [name for name in (args.only or [*COMPONENTS, *JOBS]) if name not in args.skip]
+    try:
+        asyncio.run(supervise(
+            [name for name in COMPONENTS if name in selected],
+            [name for name in JOBS if name in selected],
+        ))
+    except (KeyboardInterrupt, asyncio.CancelledError):
+        pass
 
 
 if __name__ == "__main__":
@@ -0,0 +1,404 @@
+"""
+Expiry Sweeper — approval deadlines for /Pending_Approval/
+The Company Handbook gives approvals 24 hours. This daemon makes that
+deadline fire on time instead of waiting for a Claude Code run to notice.
+
+Each draft's deadline is read once from its front-matter: an explicit
+expires: date, otherwise created: + APPROVAL_TTL_HOURS (the file's mtime if
+there is no created:). Deadlines go into a min-heap and the sweeper sleeps
+until the earliest one. Watchdog events keep the heap current — a new or
+edited draft is re-read (only if its size or mtime changed), a draft that
+is approved, rejected or deleted is dropped — so the folder is listed once
+at startup and never rescanned.
+
+When drafts fall due they are flagged (status: expired, expired_at:) and
+stay in /Pending_Approval/ for Taha to decide, or, with
+APPROVAL_EXPIRY_ACTION=reject, are moved to /Rejected/. Dashboard.md gets
+an alert line, the draft's Pending Reviews entry is marked EXPIRED and a
+LinkedIn post's weekly-table status becomes Expired; each expiry is logged.
+"""
+
+import heapq
+import json
+import logging
+import os
+import queue
+import re
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+
+import vault_catalog
+import vault_io
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+load_dotenv()
+
+VAULT_PATH = Path(os.environ["VAULT_PATH"])
+PENDING = VAULT_PATH / "Pending_Approval"
+REJECTED = VAULT_PATH / "Rejected"
+LOGS_DIR = VAULT_PATH / "Logs"
+DASHBOARD = VAULT_PATH / "Dashboard.md"
+
+TTL_HOURS = float(os.environ.get("APPROVAL_TTL_HOURS", "24"))
+EXPIRY_ACTION = os.environ.get("APPROVAL_EXPIRY_ACTION", "flag").lower()  # flag | reject
+MAX_SLEEP_SECONDS = 300  # re-check the wall clock at least this often (suspend, clock changes)
+RETRY_SECONDS = 60       # delay before retrying a draft whose expiry failed
+
+log = logging.getLogger("expiry_sweeper")
+
+
+# ---------------------------------------------------------------------------
+# Deadlines
+# ---------------------------------------------------------------------------
+
+def _parse_time(value: str) -> tuple[datetime, bool] | None:
+    """(UTC datetime, date-only?) for an ISO date or timestamp, or None."""
+    value = value.strip()
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.astimezone(timezone.utc), len(value) == 10
+
+
+def deadline(meta: dict[str, str], mtime: float) -> float | None:
+    """When a draft expires (epoch seconds), or None if it is already flagged."""
+    if meta.get("status", "").lower() == "expired":
+        return None
+    expires = _parse_time(meta.get("expires", ""))
+    if expires is not None:
+        when, date_only = expires
+        return (when + timedelta(days=1) if date_only else when).timestamp()  # a bare date lasts all day
+    created = _parse_time(meta.get("created", ""))
+    start = created[0].timestamp() if created is not None else mtime
+    return start + TTL_HOURS * 3600
+
+
+# ---------------------------------------------------------------------------
+# Expiry actions
+# ---------------------------------------------------------------------------
+
+def _flag(path: Path, now: datetime) -> None:
+    """
+    Set status: expired and expired_at: in the draft's front-matter. The
+    draft is rewritten in place through a handle that cannot create it, so
+    one approved or rejected meanwhile is never put back into
+    /Pending_Approval/ — FileNotFoundError instead, as for any vanished draft.
+    """
+    with open(path, "r+b") as fh:
+        text = fh.read().decode("utf-8").lstrip("\ufeff")
+        stamp = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+        match = re.match(r"^---\n(.*?)\n---", text, re.DOTALL)
+        if match is None:
+            text = f"---\nstatus: expired\nexpired_at: {stamp}\n---\n\n{text}"
+        else:
+            header = re.sub(r"^(?:status|expired_at):.*\n?", "", match.group(1) + "\n", flags=re.MULTILINE)
+            header += f"status: expired\nexpired_at: {stamp}"
+            text = f"---\n{header}{text[match.end(1):]}"
+        fh.seek(0)
+        fh.write(text.encode("utf-8"))
+        fh.truncate()  # after the write, so readers never see an empty note
+        fh.flush()
+        os.fsync(fh.fileno())
+    vault_catalog.record(path)
+
+
+def _append_log(entry: dict) -> None:
+    """Append a structured entry to today's JSON log file."""
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    log_path = vault_io.dated(LOGS_DIR, now) / f"{today}.json"
+
+    try:
+        data = json.loads(log_path.read_text(encoding="utf-8")) if log_path.exists() else {}
+    except (json.JSONDecodeError, OSError):
+        data = {}
+
+    data.setdefault("date", today)
+    data.setdefault("entries", [])
+    data["entries"].append(entry)
+
+    vault_io.write(log_path, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _update_dashboard(expired: list[tuple[str, dict, datetime]], now: datetime) -> None:
+    """Patch Dashboard.md for drafts that just expired: alerts, Pending Reviews, weekly table."""
+    if not DASHBOARD.exists():
+        return
+
+    ts_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    rejected = EXPIRY_ACTION == "reject"
+    text = DASHBOARD.read_text(encoding="utf-8")
+
+    # 1. Update last_updated in YAML front-matter
+    text = re.sub(r"(?<=last_updated: )[\d\-T:Z]+", ts_iso, text)
+
+    for name, meta, due in expired:
+        # 2. Alert line, once per draft
+        where = "moved to /Rejected/" if rejected else "still in /Pending_Approval/ for Taha to decide"
+        alert = f"- Approval expired without review: {name} (expired {due:%Y-%m-%d %H:%M} UTC — {where})"
+        if alert not in text:
+            text = re.sub(r"(## ⚠️ Alerts\n\n?)(?:_No [^\n]*_\n)?", lambda m: f"{m.group(1)}{alert}\n", text, count=1)
+
+        # 3. Pending Reviews entry: marked expired, or removed once rejected
+        if rejected:
+            text = re.sub(rf"- 📝 {re.escape(name)}[^\n]*\n?", "", text)
+        else:
+            text = re.sub(
+                rf"^(- 📝 {re.escape(name)}[^\n]*?)(?: \((?:pending|EXPIRED)[^)\n]*\))?$",
+                r"\1 (EXPIRED — review and decide)",
+                text,
+                flags=re.MULTILINE,
+            )
+
+        # 4. LinkedIn post status in the weekly table (Pending → Expired)
+        if meta.get("action") == "linkedin_post" and meta.get("topic"):
+            text = re.sub(
+                rf"(\| [^\|]+ \| {re.escape(meta['topic'])} \| )Pending( \|)",
+                r"\1Expired\2",
+                text,
+            )
+
+    # 5. Pipeline Overview counts, straight from the vault catalog
+    if rejected:
+        counts = vault_catalog.refresh_counts()
+        for folder, count in (counts or {}).items():
+            text = re.sub(
+                rf"(\| [^|\n]+ \| )\d+( \| /{folder}/ \|)",
+                lambda m: f"{m.group(1)}{count}{m.group(2)}",
+                text,
+            )
+
+    # 6. Update footer timestamp
+    text = re.sub(
+        r"\*Dashboard auto-updated by AI Employee at [\d\-T:Z]+\*",
+        f"*Dashboard auto-updated by AI Employee at {ts_iso}*",
+        text,
+    )
+
+    vault_io.write(DASHBOARD, text)
+
+
+# ---------------------------------------------------------------------------
+# Sweeper
+# ---------------------------------------------------------------------------
+
+class ExpirySweeper:
+    """
+    Keeps the deadline heap. The observer thread only queues file names;
+    reading front-matter, sleeping until the next deadline and expiring
+    drafts all happen on the sweeper's own thread.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[tuple[str, str] | None] = queue.Queue()
+        self._heap: list[tuple[float, str]] = []
+        self._due: dict[str, float] = {}                # name → live deadline (heap entries may be stale)
+        self._seen: dict[str, tuple[int, int]] = {}     # name → (size, mtime_ns) last read
+        self._thread = threading.Thread(target=self._run, name="expiry-sweeper", daemon=True)
+        self._thread.start()
+
+    def changed(self, name: str) -> None:
+        self._queue.put(("changed", name))
+
+    def gone(self, name: str) -> None:
+        self._queue.put(("gone", name))
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        with os.scandir(PENDING) as entries:
+            for entry in entries:
+                if entry.name.endswith(".md") and not entry.name.startswith("."):
+                    self._read(entry.name)
+        log.info("Tracking %d pending approval(s)%s", len(self._due), self._next_due())
+
+        while True:
+            wait = self._heap[0][0] - time.time() if self._heap else MAX_SLEEP_SECONDS
+            try:
+                item = self._queue.get(timeout=min(max(wait, 0), MAX_SLEEP_SECONDS))
+            except queue.Empty:
+                pass
+            else:
+                if item is None:
+                    return
+                kind, name = item
+                if kind == "gone":
+                    self._forget(name)
+                else:
+                    self._read(name)
+                continue
+            try:
+                self._sweep()
+            except Exception:
+                log.exception("Expiry sweep failed")
+
+    def _next_due(self) -> str:
+        if not self._due:
+            return ""
+        name = min(self._due, key=self._due.get)
+        return f" — next: {name} at {datetime.fromtimestamp(self._due[name], timezone.utc):%Y-%m-%d %H:%M} UTC"
+
+    def _read(self, name: str) -> None:
+        """(Re)schedule a draft from its front-matter, if it changed since last read."""
+        path = PENDING / name
+        try:
+            st = path.stat()
+            signature = (st.st_size, st.st_mtime_ns)
+            if self._seen.get(name) == signature:
+                return
+            meta = vault_catalog.read_front_matter(path)
+        except FileNotFoundError:
+            self._forget(name)
+            return
+        except OSError as exc:
+            log.warning("Could not read %s (%s)", name, exc)
+            return
+        self._seen[name] = signature
+        due = deadline(meta, st.st_mtime)
+        if due is None:
+            self._due.pop(name, None)
+        elif self._due.get(name) != due:
+            self._due[name] = due
+            heapq.heappush(self._heap, (due, name))
+
+    def _forget(self, name: str) -> None:
+        self._due.pop(name, None)  # its heap entry is skipped when it surfaces
+        self._seen.pop(name, None)
+
+    def _sweep(self) -> None:
+        """Expire every draft whose deadline has passed."""
+        now = datetime.now(timezone.utc)
+        expired = []
+        while self._heap and self._heap[0][0] <= now.timestamp():
+            due, name = heapq.heappop(self._heap)
+            if self._due.get(name) != due:
+                continue  # rescheduled or gone since this entry was pushed
+            del self._due[name]
+            path = PENDING / name
+            try:
+                meta = vault_catalog.read_front_matter(path)
+                _flag(path, now)
+                if EXPIRY_ACTION == "reject":
+                    vault_io.move(path, REJECTED)
+            except FileNotFoundError:
+                self._seen.pop(name, None)
+                continue
+            except Exception:
+                # Keep the deadline — one bad draft must not stop the sweep
+                log.exception("Could not expire %s — retrying in %ds", name, RETRY_SECONDS)
+                retry = max(due, now.timestamp()) + RETRY_SECONDS
+                self._due[name] = retry
+                heapq.heappush(self._heap, (retry, name))
+                continue
+            expired.append((name, meta, datetime.fromtimestamp(due, timezone.utc)))
+            log.info("Expired: %s (due %s UTC)%s", name, f"{expired[-1][2]:%Y-%m-%d %H:%M}",
+                     " → /Rejected/" if EXPIRY_ACTION == "reject" else "")
+            _append_log({
+                "timestamp": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "component": "expiry_sweeper",
+                "level": "warning",
+                "action": meta.get("action", "unknown"),
+                "topic": meta.get("topic", name),
+                "source_file": name,
+                "result": "rejected_expired" if EXPIRY_ACTION == "reject" else "expired",
+            })
+        if expired:
+            _update_dashboard(expired, now)
+
+
+# ---------------------------------------------------------------------------
+# Watchdog event handler
+# ---------------------------------------------------------------------------
+
+class PendingHandler(FileSystemEventHandler):
+    def __init__(self, sweeper: ExpirySweeper) -> None:
+        super().__init__()
+        self._sweeper = sweeper
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        self._changed(event.src_path, event.is_directory)
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        self._changed(event.src_path, event.is_directory)
+
+    def on_deleted(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self._sweeper.gone(Path(event.src_path).name)
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        if event.is_directory:
+            return
+        if Path(event.src_path).parent == PENDING:
+            self._sweeper.gone(Path(event.src_path).name)
+        if Path(event.dest_path).parent == PENDING:
+            self._changed(event.dest_path, False)
+
+    def _changed(self, src_path: str, is_directory: bool) -> None:
+        path = Path(src_path)
+        if not is_directory and path.suffix == ".md" and not path.name.startswith("."):
+            self._sweeper.changed(path.name)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def run(stop: threading.Event, observer: BaseObserver | None = None) -> None:
+    """
+    Watch /Pending_Approval/ until stop is set, on the given (already running)
+    observer if there is one, and otherwise on one of its own.
+    """
+    if EXPIRY_ACTION not in ("flag", "reject"):
+        raise SystemExit(f"APPROVAL_EXPIRY_ACTION must be 'flag' or 'reject', not {EXPIRY_ACTION!r}")
+    PENDING.mkdir(parents=True, exist_ok=True)
+    log.info("Expiry Sweeper started — watching %s (TTL %g h, expired drafts: %s)", PENDING, TTL_HOURS, EXPIRY_ACTION)
+
+    sweeper = ExpirySweeper()
+    own_observer = observer is None
+    if own_observer:
+        observer = Observer()
+        observer.start()
+    watch = observer.schedule(PendingHandler(sweeper), str(PENDING), recursive=False)
+
+    try:
+        while not stop.wait(1):
+            if not observer.is_alive():
+                raise RuntimeError("file system observer stopped")
+    except KeyboardInterrupt:
+        log.info("Shutting down...")
+    finally:
+        if own_observer:
+            observer.stop()
+            observer.join()
+        else:
+            observer.unschedule(watch)
+        sweeper.stop()
+        log.info("Expiry Sweeper stopped.")
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s  [%(levelname)s]  %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    run(threading.Event())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,18 @@
 """
 Orchestrator — Execution Layer
 Monitors /Approved/ in the Obsidian vault. When Taha moves a file there,
-logs the action, moves it to /Done/, and updates the dashboard.
+logs the action, moves it to /Done/, and updates the dashboard. Both moves
+are recorded in the vault catalog, and the dashboard's Pipeline Overview
+counts are read from it.
 """
 
 import json
 import logging
 import os
+import queue
 import re
-import shutil
 import subprocess
+import threading
 import time
 import webbrowser
 from datetime import datetime, timezone
@@ -19,6 +22,10 @@ import requests
 from dotenv import load_dotenv
 from watchdog.events import FileCreatedEvent, FileSystemEventHandler
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+
+import vault_catalog
+import vault_io
 
 # ---------------------------------------------------------------------------
 # Setup
@@ -38,6 +45,9 @@ LINKEDIN_UGC_URL = "https://api.linkedin.com/v2/ugcPosts"
 # Populated once at startup by _load_linkedin_token()
 _linkedin_token: dict | None = None
 
+# HTTP session for the LinkedIn API; set by run() (the supervisor shares one)
+_session: requests.Session | None = None
+
 DRY_RUN = os.environ.get("DRY_RUN", "true").lower() != "false"
 
 logging.basicConfig(
@@ -160,7 +170,7 @@ def _handle_linkedin_post(content: str) -> None:
     }
 
     try:
-        response = requests.post(
+        response = _session.post(
             LINKEDIN_UGC_URL,
             json=body,
             headers={
@@ -206,8 +216,9 @@ def _handle_linkedin_post(content: str) -> None:
 
 def _append_log(entry: dict) -> None:
     """Append a structured entry to today's JSON log file."""
-    today = datetime.now(timezone.utc).strftime("%Y-%m-%d")
-    log_path = LOGS_DIR / f"{today}.json"
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    log_path = vault_io.dated(LOGS_DIR, now) / f"{today}.json"
 
     try:
         data = json.loads(log_path.read_text(encoding="utf-8")) if log_path.exists() else {}
@@ -218,8 +229,7 @@ def _append_log(entry: dict) -> None:
     data.setdefault("entries", [])
     data["entries"].append(entry)
 
-    LOGS_DIR.mkdir(parents=True, exist_ok=True)
-    log_path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+    vault_io.write(log_path, json.dumps(data, indent=2, ensure_ascii=False))
 
 
 # ---------------------------------------------------------------------------
@@ -248,6 +258,15 @@ def _update_dashboard(filename: str, meta: dict, now: datetime) -> None:
         text,
     )
 
+    # 2b. Pipeline Overview counts, straight from the vault catalog
+    counts = vault_catalog.refresh_counts()
+    for folder, count in (counts or {}).items():
+        text = re.sub(
+            rf"(\| [^|\n]+ \| )\d+( \| /{folder}/ \|)",
+            lambda m: f"{m.group(1)}{count}{m.group(2)}",
+            text,
+        )
+
     # 3. Prepend activity entry to Today's Activity section
     activity_line = f"- {ts_hm} Approved & completed: {action} — {topic}"
     if "_No activity yet today._" in text:
@@ -306,7 +325,82 @@ def _update_dashboard(filename: str, meta: dict, now: datetime) -> None:
         text,
     )
 
-    DASHBOARD.write_text(text, encoding="utf-8")
+    vault_io.write(DASHBOARD, text)
+
+
+# ---------------------------------------------------------------------------
+# Approved file processing
+# ---------------------------------------------------------------------------
+
+def _process_approved(src: Path) -> None:
+    """Execute one approved action file, log it and move it to /Done/."""
+    # Give the OS time to finish moving the file
+    time.sleep(0.5)
+
+    # File may already be gone if a duplicate event beat us here
+    if not src.exists():
+        return
+    vault_catalog.record(src)  # moved here by hand in Obsidian
+
+    try:
+        content = src.read_text(encoding="utf-8")
+        meta = _parse_frontmatter(content)
+
+        action = meta.get("action", "unknown")
+        topic = meta.get("topic", src.name)
+
+        log.debug("Parsed front-matter from %s: %s", src.name, meta)
+        if not meta:
+            log.warning(
+                "Front-matter parse failed for %s — "
+                "file may have unexpected encoding or missing --- delimiters",
+                src.name,
+            )
+
+        # --- Dispatch by action type ---
+        if action == "linkedin_post":
+            if DRY_RUN:
+                post_text = _extract_linkedin_post_text(content)
+                log.info(
+                    "[DRY RUN] Would post to LinkedIn API — %s\n%s",
+                    topic,
+                    post_text or "(could not extract post text)",
+                )
+            else:
+                log.info("Executing: %s — %s", action, topic)
+                _handle_linkedin_post(content)
+        else:
+            # send_gmail, send_whatsapp, etc. — MCP servers will be added later
+            if DRY_RUN:
+                log.info("[DRY RUN] Would execute: %s — %s", action, topic)
+            else:
+                log.info("Executing: %s — %s (no handler yet)", action, topic)
+
+        now = datetime.now(timezone.utc)
+
+        # Append structured entry to today's log
+        _append_log({
+            "timestamp": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "component": "orchestrator",
+            "level": "info",
+            "action": action,
+            "topic": topic,
+            "source_file": src.name,
+            "dry_run": DRY_RUN,
+            "result": "completed",
+        })
+
+        # Move file from /Approved/ to this month's /Done/ partition
+        # (a taken name gets a numeric suffix)
+        dest = vault_io.move(src, vault_io.dated(DONE, now))
+
+        # Update the dashboard
+        _update_dashboard(src.name, meta, now)
+
+        log.info("Completed: %s → /%s", src.name, dest.relative_to(VAULT_PATH).as_posix())
+
+    except Exception:
+        log.exception("Error processing approved file: %s", src.name)
 
 
 # ---------------------------------------------------------------------------
@@ -314,8 +408,11 @@ def _update_dashboard(filename: str, meta: dict, now: datetime) -> None:
 # ---------------------------------------------------------------------------
 
 class ApprovalHandler(FileSystemEventHandler):
-    def __init__(self) -> None:
+    """Queues approved files for run() — the observer thread is never blocked."""
+
+    def __init__(self, approved: queue.Queue[Path]) -> None:
         super().__init__()
+        self._approved = approved
         self._processed: set[str] = set()
 
     def on_created(self, event: FileCreatedEvent) -> None:
@@ -332,107 +429,67 @@ class ApprovalHandler(FileSystemEventHandler):
         if event.src_path in self._processed:
             return
         self._processed.add(event.src_path)
-
-        # Give the OS time to finish moving the file
-        time.sleep(0.5)
-
-        # File may already be gone if a duplicate event beat us here
-        if not src.exists():
-            return
-
-        try:
-            content = src.read_text(encoding="utf-8")
-            meta = _parse_frontmatter(content)
-
-            action = meta.get("action", "unknown")
-            topic = meta.get("topic", src.name)
-
-            log.debug("Parsed front-matter from %s: %s", src.name, meta)
-            if not meta:
-                log.warning(
-                    "Front-matter parse failed for %s — "
-                    "file may have unexpected encoding or missing --- delimiters",
-                    src.name,
-                )
-
-            # --- Dispatch by action type ---
-            if action == "linkedin_post":
-                if DRY_RUN:
-                    post_text = _extract_linkedin_post_text(content)
-                    log.info(
-                        "[DRY RUN] Would post to LinkedIn API — %s\n%s",
-                        topic,
-                        post_text or "(could not extract post text)",
-                    )
-                else:
-                    log.info("Executing: %s — %s", action, topic)
-                    _handle_linkedin_post(content)
-            else:
-                # send_gmail, send_whatsapp, etc. — MCP servers will be added later
-                if DRY_RUN:
-                    log.info("[DRY RUN] Would execute: %s — %s", action, topic)
-                else:
-                    log.info("Executing: %s — %s (no handler yet)", action, topic)
-
-            now = datetime.now(timezone.utc)
-
-            # Append structured entry to today's log
-            _append_log({
-                "timestamp": now.strftime("%Y-%m-%dT%H:%M:%SZ"),
-                "component": "orchestrator",
-                "level": "info",
-                "action": action,
-                "topic": topic,
-                "source_file": src.name,
-                "dry_run": DRY_RUN,
-                "result": "completed",
-            })
-
-            # Move file from /Approved/ to /Done/
-            dest = DONE / src.name
-            if dest.exists():
-                ts = now.strftime("%Y%m%d_%H%M%S")
-                dest = DONE / f"{src.stem}_{ts}{src.suffix}"
-            shutil.move(str(src), str(dest))
-
-            # Update the dashboard
-            _update_dashboard(src.name, meta, now)
-
-            log.info("Completed: %s → /Done/", src.name)
-
-        except Exception:
-            log.exception("Error processing approved file: %s", src.name)
+        self._approved.put(src)
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def run(
+    stop: threading.Event,
+    observer: BaseObserver | None = None,
+    session: requests.Session | None = None,
+) -> None:
+    """
+    Watch /Approved/ until stop is set, executing approved files on this
+    thread. Uses the given (already running) observer and HTTP session if
+    there are any, and otherwise creates its own.
+    """
+    global _session
+
     APPROVED.mkdir(parents=True, exist_ok=True)
     DONE.mkdir(parents=True, exist_ok=True)
     LOGS_DIR.mkdir(parents=True, exist_ok=True)
 
     _load_linkedin_token()
+    _session = session or requests.Session()
 
     mode = "DRY RUN" if DRY_RUN else "LIVE"
     log.info("Orchestrator running in %s mode — watching /Approved/", mode)
 
-    handler = ApprovalHandler()
-    observer = Observer()
-    observer.schedule(handler, str(APPROVED), recursive=False)
-    observer.start()
+    own_observer = observer is None
+    if own_observer:
+        observer = Observer()
+        observer.start()
+    approved: queue.Queue[Path] = queue.Queue()
+    watch = observer.schedule(ApprovalHandler(approved), str(APPROVED), recursive=False)
 
     try:
-        while observer.is_alive():
-            time.sleep(1)
+        while not stop.is_set():
+            if not observer.is_alive():
+                raise RuntimeError("file system observer stopped")
+            try:
+                src = approved.get(timeout=1)
+            except queue.Empty:
+                continue
+            _process_approved(src)
     except KeyboardInterrupt:
         log.info("Shutting down...")
     finally:
-        observer.stop()
-        observer.join()
+        if own_observer:
+            observer.stop()
+            observer.join()
+        else:
+            observer.unschedule(watch)
+        if session is None:
+            _session.close()
         log.info("Orchestrator stopped.")
 
 
+def main() -> None:
+    run(threading.Event())
+
+
 if __name__ == "__main__":
     main()
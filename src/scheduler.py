@@ -2,17 +2,78 @@
 Scheduler — Reasoning Loop Trigger
 Invoked by PM2 cron. Calls Claude Code in non-interactive mode with the
 reasoning_loop prompt. Runs once per execution — PM2 handles the schedule.
+
+Before launching Claude, a pre-flight check compares /Needs_Action/ (name,
+size and mtime of every action file) and the review folders against the
+snapshot saved after the last successful run, and exits straight away when
+there is no new work. Use --force to run regardless.
+
+Pending action files are described in a compact manifest (type, source,
+summary, priority hints, size and hash from each file's front-matter) that
+is handed to Claude in the prompt, so no run spends time surveying the
+folder. Files are split into shards by type (messages before drafts, at
+most SHARD_MAX_FILES each) and several bounded Claude Code runs work
+through them in parallel. Each file is claimed with a lock file in
+secrets/claims/ so shards — and overlapping scheduler runs — never touch
+the same file. When a shard fails or times out, its claims are released and
+whatever it left in /Needs_Action/ is requeued for the next run. A single
+update_dashboard run refreshes Dashboard.md once all shards are done; the
+vault catalog is synced first (Claude's writes bypass it) and its folder
+counts are handed to that run, so the Pipeline Overview is never guessed.
+Plans and logs are written to this month's partition (Plans/YYYY/MM/), and
+anything a run left at the top of /Done/, /Plans/ or /Logs/ is swept into
+its partition afterwards (see vault_archive.py).
+
+Every draft a run writes to /Pending_Approval/ is tagged with the
+action_key (content hash) of the action file it answers, and the scheduler
+records key → drafts in a result cache (secrets/result_cache.json). Before
+work is dispatched the cache is consulted: an action file whose drafts
+already exist — left behind by a run that timed out after drafting, or a
+re-drop of identical content — is archived to /Done/ with a pointer to
+them instead of being reasoned about again.
+
+Only one scheduler runs at a time: it holds a leased lock file in secrets/,
+renewed by a heartbeat thread, and a lock whose lease has lapsed (crashed
+run, killed process) is recovered. A trigger that arrives mid-run is
+skipped, or with SCHEDULER_OVERLAP=coalesce, turned into exactly one
+follow-up run once the current run finishes.
+
+--urgent-only (used by urgent_trigger.py) processes just the new action
+files that match the local urgency rule, skips the dashboard refresh and
+leaves everything else for the regular cron cadence.
+
+Claude Code's stream-json output is read line by line, so tool calls and
+progress appear in the log while a run is going (and silence is flagged),
+and each scheduler run appends one record to /Logs/ with per-shard
+duration, files processed, exit status, tool-call counts and cost.
 """
 
+import argparse
+import hashlib
+import json
 import logging
 import os
+import queue
+import re
 import shutil
+import socket
 import subprocess
 import sys
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
 
+import vault_archive
+import vault_catalog
+import vault_io
+
 # ---------------------------------------------------------------------------
 # Setup
 # ---------------------------------------------------------------------------
@@ -21,6 +82,45 @@ load_dotenv()
 
 PROJECT_DIR = Path(__file__).parent.parent  # D:\ai-employee-project
 VAULT_PATH = Path(os.environ["VAULT_PATH"])
+NEEDS_ACTION = VAULT_PATH / "Needs_Action"
+LOGS_DIR = VAULT_PATH / "Logs"
+PENDING_APPROVAL = VAULT_PATH / "Pending_Approval"
+DONE = VAULT_PATH / "Done"
+
+STATE_PATH = Path("secrets/scheduler_state.json")
+
+# Folders whose changes only affect Dashboard.md counts — refreshed at most
+# every DASHBOARD_REFRESH_MINUTES rather than on every trigger.
+DASHBOARD_FOLDERS = ("Pending_Approval", "Approved", "Rejected", "Done")
+DASHBOARD_REFRESH_MINUTES = int(os.environ.get("SCHEDULER_DASHBOARD_REFRESH_MIN", "240"))
+
+SHARD_WORKERS = int(os.environ.get("SCHEDULER_SHARDS", "3"))  # concurrent Claude Code runs
+SHARD_MAX_FILES = 10         # action files per run
+SHARD_TIMEOUT = 600          # seconds per shard run
+DASHBOARD_TIMEOUT = 300      # seconds for the closing update_dashboard run
+SILENCE_WARNING = 60         # log a warning when a run has printed nothing for this long
+
+# Structured, line-per-event output so progress can be logged as it happens
+STREAM_ARGS = ["--output-format", "stream-json", "--verbose"]
+
+CLAIMS_DIR = Path("secrets/claims")
+CLAIM_TTL = SHARD_TIMEOUT * 2  # a claim older than this was left by a crashed run
+
+LOCK_PATH = Path("secrets/scheduler.lock")
+FOLLOWUP_PATH = Path("secrets/scheduler.followup")  # a coalesced trigger waiting for the current run
+LEASE_SECONDS = 120      # a lock not renewed for this long belongs to a dead run
+HEARTBEAT_INTERVAL = 30  # how often the running scheduler renews its lease
+OVERLAP_POLICY = os.environ.get("SCHEDULER_OVERLAP", "skip").lower()  # "skip" or "coalesce"
+
+RESULT_CACHE_PATH = Path("secrets/result_cache.json")
+RESULT_CACHE_DAYS = 30  # entries older than this are dropped
+# Where a cached draft may be found — it moves on as it is reviewed. A
+# rejected draft is not a valid answer, so its action file is reasoned again.
+OUTPUT_FOLDERS = ("Pending_Approval", "Approved", "Done")
+PARTITIONED_OUTPUTS = {"Done"}  # found through the catalog — they sit in YYYY/MM partitions
+
+# Action file type → shard order. Messages go first: they may be urgent.
+TYPE_PRIORITY = {"whatsapp": 0, "email": 1, "thought_drop": 2, "tech_news": 3}
 
 logging.basicConfig(
     level=logging.INFO,
@@ -29,19 +129,556 @@ logging.basicConfig(
 )
 log = logging.getLogger("scheduler")
 
+# ---------------------------------------------------------------------------
+# Pre-flight check
+# ---------------------------------------------------------------------------
+
+Snapshot = dict[str, list[int]]  # action file name → [size, mtime_ns]
+
+
+def _snapshot_needs_action() -> Snapshot:
+    """Name, size and mtime of every action file — one scandir, no reads."""
+    snapshot: Snapshot = {}
+    try:
+        with os.scandir(NEEDS_ACTION) as entries:
+            for entry in entries:
+                if entry.name.startswith(".") or not entry.name.endswith(".md"):
+                    continue
+                if not entry.is_file():
+                    continue
+                st = entry.stat()
+                snapshot[entry.name] = [st.st_size, st.st_mtime_ns]
+    except FileNotFoundError:
+        pass
+    return snapshot
+
+
+def _folder_stamps() -> dict[str, int]:
+    """Directory mtime of each dashboard folder — moves whenever a file enters or leaves."""
+    stamps = {}
+    for name in DASHBOARD_FOLDERS:
+        try:
+            stamps[name] = (VAULT_PATH / name).stat().st_mtime_ns
+        except FileNotFoundError:
+            stamps[name] = 0
+    return stamps
+
+
+def _load_state() -> dict:
+    try:
+        return json.loads(STATE_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as exc:
+        log.warning("Could not read %s (%s) — treating this as a first run", STATE_PATH, exc)
+        return {}
+
+
+def _save_state(needs_action: Snapshot, stamps: dict[str, int]) -> None:
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    state = {
+        "last_run": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "last_run_epoch": time.time(),
+        "needs_action": needs_action,
+        "folders": stamps,
+    }
+    tmp = STATE_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    tmp.replace(STATE_PATH)
+
+
+def _preflight(state: dict, needs_action: Snapshot, stamps: dict[str, int]) -> tuple[bool, str]:
+    """Return (should_run, reason) by diffing the vault against the last run's snapshot."""
+    if not state:
+        return True, "no previous run recorded"
+
+    seen = state.get("needs_action", {})
+    new = sorted(name for name, sig in needs_action.items() if seen.get(name) != sig)
+    if new:
+        preview = ", ".join(new[:5]) + (f" (+{len(new) - 5} more)" if len(new) > 5 else "")
+        return True, f"{len(new)} new or changed action file(s) in Needs_Action: {preview}"
+
+    since = state.get("last_run", "unknown")
+    changed = [name for name, stamp in stamps.items() if state.get("folders", {}).get(name) != stamp]
+    if changed:
+        idle_minutes = (time.time() - state.get("last_run_epoch", 0)) / 60
+        if idle_minutes >= DASHBOARD_REFRESH_MINUTES:
+            return True, f"dashboard refresh — {', '.join(changed)} changed since {since}"
+        return False, (
+            f"no new work; {', '.join(changed)} changed, dashboard refresh due in "
+            f"{DASHBOARD_REFRESH_MINUTES - idle_minutes:.0f} min"
+        )
+
+    pending = f"{len(needs_action)} action file(s) already seen" if needs_action else "Needs_Action empty"
+    return False, f"no new work since last run at {since} ({pending})"
+
+
+# ---------------------------------------------------------------------------
+# Claims and sharding
+# ---------------------------------------------------------------------------
+
+@dataclass
+class Shard:
+    label: str
+    files: list[str]
+    manifest: list[dict]                         # manifest_entry() for each file
+    record: dict = field(default_factory=dict)  # filled in by _run_claude
+
+    @property
+    def ok(self) -> bool:
+        return self.record.get("ok", False)
+
+
+def _claim(name: str) -> bool:
+    """Atomically claim an action file for this run. False if someone else holds it."""
+    CLAIMS_DIR.mkdir(parents=True, exist_ok=True)
+    path = CLAIMS_DIR / f"{name}.lock"
+    for _ in range(2):
+        try:
+            fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            try:
+                age = time.time() - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age < CLAIM_TTL:
+                return False
+            log.warning("Breaking stale claim on %s (%.0f min old)", name, age / 60)
+            path.unlink(missing_ok=True)
+            continue
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump({"pid": os.getpid(), "claimed_at": time.time()}, fh)
+        return True
+    return False
+
+
+def _release(names: list[str]) -> None:
+    for name in names:
+        (CLAIMS_DIR / f"{name}.lock").unlink(missing_ok=True)
+
+
+def _plan_shards(manifest: list[dict]) -> list[Shard]:
+    """
+    Group manifest entries by type, in priority order, SHARD_MAX_FILES per
+    shard. Within a type, files with urgency keywords go first, then oldest.
+    """
+    by_type: dict[str, list[dict]] = {}
+    for entry in manifest:
+        by_type.setdefault(entry["type"], []).append(entry)
+
+    shards = []
+    for kind in sorted(by_type, key=lambda k: (TYPE_PRIORITY.get(k, len(TYPE_PRIORITY)), k)):
+        entries = sorted(
+            by_type[kind],
+            key=lambda e: (not any(h.startswith("keyword:") for h in e["hints"]), e["created"], e["file"]),
+        )
+        chunks = [entries[i:i + SHARD_MAX_FILES] for i in range(0, len(entries), SHARD_MAX_FILES)]
+        for i, chunk in enumerate(chunks, start=1):
+            label = kind if len(chunks) == 1 else f"{kind}-{i}"
+            shards.append(Shard(label, [e["file"] for e in chunk], chunk))
+    return shards
+
+
+# ---------------------------------------------------------------------------
+# Work manifest
+# ---------------------------------------------------------------------------
+
+# Front-matter fields that best describe an action file, by type
+_SUMMARY_FIELDS = ("subject", "article_title", "contact", "original_file", "topic")
+
+URGENT_TYPES = ("email", "whatsapp")
+URGENT_WORDS = ("urgent", "asap", "emergency", "immediately", "deadline", "overdue", "invoice", "payment")
+_URGENT_RE = re.compile(r"\b(" + "|".join(URGENT_WORDS) + r")\b", re.IGNORECASE)
+
+
+def _split_front_matter(text: str) -> tuple[dict[str, str], str]:
+    """Parse the flat key: value front-matter the watchers write. Returns (meta, body)."""
+    if not text.startswith("---"):
+        return {}, text
+    end = text.find("\n---", 3)
+    if end == -1:
+        return {}, text
+    meta = {}
+    for line in text[3:end].splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not key.startswith((" ", "\t")):
+            meta[key.strip()] = value.strip().strip("\"'")
+    return meta, text[end + 4:]
+
+
+def manifest_entry(name: str) -> dict | None:
+    """
+    Describe one action file for the prompt: type, source, a one-line
+    summary, priority hints, size, hash and action_key. None if it has gone.
+    """
+    try:
+        raw = (NEEDS_ACTION / name).read_bytes()
+    except FileNotFoundError:
+        return None
+    meta, body = _split_front_matter(raw.decode("utf-8", errors="replace"))
+    key = action_key(meta, body)
+    # The instructions section is boilerplate (it mentions "urgent" itself)
+    body = body.split("## Instructions for Claude", 1)[0]
+
+    hints = []
+    haystack = " ".join(meta.get(k, "") for k in _SUMMARY_FIELDS) + " " + body[:2048]
+    for word in sorted({m.lower() for m in _URGENT_RE.findall(haystack)}):
+        hints.append(f"keyword:{word}")
+    if meta.get("unread_count", "0") not in ("", "0"):
+        hints.append(f"unread:{meta['unread_count']}")
+    if meta.get("parts"):
+        hints.append(f"part:{meta.get('part', '?')}/{meta['parts']}")
+    if meta.get("alternate_sources", "0") not in ("", "0"):
+        hints.append(f"sources:{int(meta['alternate_sources']) + 1}")
+    if meta.get("file_count"):
+        hints.append(f"files:{meta['file_count']}")
+
+    summary = next((meta[k] for k in _SUMMARY_FIELDS if meta.get(k)), "")
+    return {
+        "file": name,
+        "type": meta.get("type", "unknown"),
+        "source": meta.get("source", ""),
+        "summary": _one_line(summary, 80),
+        "hints": hints,
+        "size": len(raw),
+        "sha256": hashlib.sha256(raw).hexdigest(),
+        "key": key,
+        "created": meta.get("created", ""),
+        "priority": meta.get("priority", ""),
+    }
+
+
+def action_key(meta: dict[str, str], body: str) -> str:
+    """
+    Content hash of an action file for the result cache: its type and body.
+    created / status are left out so a re-drop of the same content matches.
+    """
+    digest = hashlib.sha256(f"{meta.get('type', 'unknown')}\n{body.strip()}".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def is_urgent(entry: dict) -> bool:
+    """
+    The cheap local urgency rule: an explicit priority: urgent, or a message
+    (email / WhatsApp) whose subject or text contains an urgency keyword.
+    """
+    if entry["priority"].lower() == "urgent":
+        return True
+    return entry["type"] in URGENT_TYPES and any(h.startswith("keyword:") for h in entry["hints"])
+
+
+def _build_manifest(names: list[str]) -> list[dict]:
+    started = time.monotonic()
+    manifest = [entry for entry in map(manifest_entry, names) if entry is not None]
+    log.info(
+        "Manifest: %d action file(s), %s bytes, built in %.0f ms",
+        len(manifest), f"{sum(e['size'] for e in manifest):,}", (time.monotonic() - started) * 1000,
+    )
+    return manifest
+
+
+def _render_manifest(entries: list[dict]) -> str:
+    """Compact markdown table of a shard's files for the prompt."""
+    rows = ["| file | type | source | summary | hints | size | action_key |", "|---|---|---|---|---|---|---|"]
+    for e in entries:
+        cells = [
+            e["file"], e["type"], e["source"], e["summary"],
+            " ".join(e["hints"]) or "-", str(e["size"]), e["key"],
+        ]
+        rows.append("| " + " | ".join(cell.replace("|", "/") for cell in cells) + " |")
+    return "\n".join(rows)
+
+
+# ---------------------------------------------------------------------------
+# Result cache
+# ---------------------------------------------------------------------------
+
+def _load_result_cache() -> dict:
+    try:
+        return json.loads(RESULT_CACHE_PATH.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as exc:
+        log.warning("Could not read %s (%s) — starting with an empty result cache", RESULT_CACHE_PATH, exc)
+        return {}
+
+
+def _save_result_cache(cache: dict) -> None:
+    cutoff = time.time() - RESULT_CACHE_DAYS * 86400
+    cache = {key: hit for key, hit in cache.items() if hit.get("cached_at_epoch", 0) >= cutoff}
+    RESULT_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp = RESULT_CACHE_PATH.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+    tmp.replace(RESULT_CACHE_PATH)
+
+
+def _live_outputs(hit: dict) -> list[str]:
+    """Vault-relative paths of a cache entry's drafts that still exist (and weren't rejected)."""
+    found = []
+    for name in hit.get("outputs", []):
+        for folder in OUTPUT_FOLDERS:
+            if folder in PARTITIONED_OUTPUTS:
+                paths = vault_catalog.locate(folder, name)
+            else:
+                paths = [f"{folder}/{name}"] if (VAULT_PATH / folder / name).is_file() else []
+            if paths:
+                found.append(paths[0])
+                break
+    return found
+
+
+def _collect_outputs(since_ns: int, keys: set[str]) -> dict[str, list[str]]:
+    """Drafts written to /Pending_Approval/ since since_ns, grouped by the action_key they carry."""
+    outputs: dict[str, list[str]] = {}
+    try:
+        with os.scandir(PENDING_APPROVAL) as entries:
+            for entry in entries:
+                if not entry.name.endswith(".md") or not entry.is_file():
+                    continue
+                if entry.stat().st_mtime_ns < since_ns:
+                    continue
+                try:
+                    meta, _ = _split_front_matter(Path(entry.path).read_text(encoding="utf-8", errors="replace"))
+                except OSError:
+                    continue
+                key = meta.get("action_key", "")
+                if key in keys:
+                    outputs.setdefault(key, []).append(entry.name)
+    except FileNotFoundError:
+        pass
+    return outputs
+
+
+def _record_outputs(cache: dict, manifest: list[dict], outputs: dict[str, list[str]]) -> int:
+    """Add this run's drafts to the cache. Returns how many action files gained an entry."""
+    now = time.time()
+    recorded = 0
+    for entry in manifest:
+        names = outputs.get(entry["key"])
+        if not names:
+            continue
+        hit = cache.setdefault(entry["key"], {"file": entry["file"], "outputs": []})
+        hit["outputs"] = sorted(set(hit["outputs"]) | set(names))
+        hit["cached_at"] = datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        hit["cached_at_epoch"] = now
+        recorded += 1
+    return recorded
+
+
+def _answer_from_cache(entry: dict, hit: dict, outputs: list[str]) -> bool:
+    """Archive an action file whose drafts already exist to /Done/, noting where they are."""
+    src = NEEDS_ACTION / entry["file"]
+    # Bare note names: Obsidian still resolves them after a draft moves on to /Approved/ or /Done/
+    links = "\n".join(f"- [[{Path(path).stem}]]" for path in outputs)
+    note = (
+        f"\n\n## Result Cache\n\n"
+        f"Answered without a new reasoning run: the same content ({entry['key']}) was already "
+        f"handled as {hit['file']} on {hit.get('cached_at', 'an earlier run')}. Drafts:\n{links}\n"
+    )
+    try:
+        text = src.read_text(encoding="utf-8")
+        vault_io.create(vault_io.dated(DONE), entry["file"], text.rstrip("\n") + note)
+        vault_io.remove(src)
+    except OSError as exc:
+        log.warning("Could not archive %s from the result cache (%s) — dispatching it instead", entry["file"], exc)
+        return False
+    log.info("Cache hit: %s → /Done/ (drafts: %s)", entry["file"], ", ".join(outputs))
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Single-flight lock
+# ---------------------------------------------------------------------------
+
+def _read_json(path: Path) -> dict | None:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _describe_holder(holder: dict | None) -> str:
+    if not holder:
+        return "holder unknown"
+    return (
+        f"{holder.get('mode', 'full')} run, pid {holder.get('pid')} on {holder.get('host')}, "
+        f"since {holder.get('acquired_at')}"
+    )
+
+
+class RunLock:
+    """
+    Leased lock file that keeps scheduler runs from overlapping.
+
+    acquire() creates the file with O_EXCL and starts a heartbeat thread that
+    pushes lease_until forward every HEARTBEAT_INTERVAL. A lock whose lease
+    has run out was left by a run that died without releasing it; it is
+    moved aside and taken over. If the heartbeat finds its token gone (the
+    machine slept past the lease and another run took over), lost is set
+    and the lock is left to the new holder.
+    """
+
+    def __init__(self, path: Path, mode: str) -> None:
+        self.path = path
+        self.mode = mode  # "full" or "urgent" — lets a full trigger coalesce behind an urgent-only run
+        self.lost = False
+        self._token: str | None = None
+        self._acquired_at = ""
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def holder(self) -> dict | None:
+        return _read_json(self.path)
+
+    def acquire(self) -> bool:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        token = uuid.uuid4().hex
+        for _ in range(3):
+            try:
+                fd = os.open(self.path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            except FileExistsError:
+                if not self._break_if_stale():
+                    return False
+                continue
+            self._token = token
+            self._acquired_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+            self.lost = False
+            with os.fdopen(fd, "w", encoding="utf-8") as fh:
+                json.dump(self._record(), fh)
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._heartbeat, name="lock-heartbeat", daemon=True)
+            self._thread.start()
+            return True
+        return False
+
+    def release(self) -> None:
+        if self._token is None:
+            return
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        holder = self.holder()
+        if not self.lost and holder and holder.get("token") == self._token:
+            self.path.unlink(missing_ok=True)
+        self._token = None
+
+    def _record(self) -> dict:
+        now = time.time()
+        return {
+            "pid": os.getpid(),
+            "host": socket.gethostname(),
+            "token": self._token,
+            "acquired_at": self._acquired_at,
+            "mode": self.mode,
+            "heartbeat": datetime.fromtimestamp(now, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "lease_until": now + LEASE_SECONDS,
+        }
+
+    def _break_if_stale(self) -> bool:
+        """Move an expired lock aside. True if the caller should try to acquire again."""
+        holder = self.holder()
+        if holder is None:
+            # Unreadable: either being written right now, or corrupt. Judge by age.
+            try:
+                expired = time.time() - self.path.stat().st_mtime > LEASE_SECONDS
+            except FileNotFoundError:
+                return True
+        else:
+            expired = holder.get("lease_until", 0) < time.time()
+        if not expired:
+            return False
+
+        stale = self.path.with_name(f"{self.path.name}.stale.{uuid.uuid4().hex[:8]}")
+        try:
+            os.replace(self.path, stale)  # only one contender wins the rename
+        except FileNotFoundError:
+            return True
+        log.warning("Recovered stale scheduler lock (%s, lease expired)", _describe_holder(holder))
+        stale.unlink(missing_ok=True)
+        return True
+
+    def _heartbeat(self) -> None:
+        while not self._stop.wait(HEARTBEAT_INTERVAL):
+            holder = self.holder()
+            if holder is not None and holder.get("token") != self._token:
+                self.lost = True
+                log.error("Scheduler lock was taken over (%s) — this run no longer holds it", _describe_holder(holder))
+                return
+            tmp = self.path.with_name(f"{self.path.name}.{self._token[:8]}.tmp")
+            try:
+                tmp.write_text(json.dumps(self._record()), encoding="utf-8")
+                os.replace(tmp, self.path)
+            except OSError as exc:
+                # Windows refuses replace() while another process reads the file — retry next beat
+                log.warning("Could not renew scheduler lock: %s", exc)
+
+
+def _pending_followup() -> str | None:
+    """The mode of the queued follow-up run ("full" / "urgent"), or None."""
+    try:
+        requested = FOLLOWUP_PATH.read_text(encoding="utf-8").strip()
+    except FileNotFoundError:
+        return None
+    return "urgent" if requested == "urgent" else "full"
+
+
+def _on_overlap(lock: RunLock, mode: str, policy: str) -> None:
+    """A run is already in progress: skip this trigger, or queue one follow-up run."""
+    holder = lock.holder() or {}
+    # An urgent-only run leaves ordinary work untouched, so a full trigger
+    # arriving during one is always queued rather than lost
+    if policy == "coalesce" or (mode == "full" and holder.get("mode") == "urgent"):
+        if _pending_followup() == "full":
+            mode = "full"  # a queued full run already covers urgent work
+        FOLLOWUP_PATH.write_text(mode, encoding="utf-8")
+        log.info(
+            "Pre-flight: COALESCE — run in progress (%s); one %s follow-up run queued",
+            _describe_holder(holder), mode,
+        )
+    else:
+        log.info("Pre-flight: SKIP — run in progress (%s)", _describe_holder(holder))
+
+
 # ---------------------------------------------------------------------------
 # Prompt builder
 # ---------------------------------------------------------------------------
 
-def _build_prompt(vault_path: Path) -> str:
+def _build_prompt(vault_path: Path, shard: Shard, run_id: str) -> str:
+    now = datetime.now(timezone.utc)
+    month = f"{now:%Y}/{now:%m}"
     return (
-        f"Read the skill at .claude/skills/reasoning_loop.md and execute it fully. "
+        f"Read the skill at .claude/skills/reasoning_loop.md and execute it for this batch only. "
         f"The Obsidian vault is at {vault_path}. "
-        f"Survey /Needs_Action/, create a Plan.md, process all tasks using the appropriate skills, "
-        f"update Dashboard.md, and log everything to /Logs/. "
-        f"If /Needs_Action/ is empty, just update Dashboard.md and exit."
+        f"Process exactly these action files in /Needs_Action/ using the appropriate skills. "
+        f"The manifest below was built from their front-matter — plan from it instead of surveying "
+        f"the folder, and open each file only when you work on it. Hints: keyword:<word> = urgency "
+        f"word in the content, unread:N = unread messages, part:i/n = one part of a split drop.\n\n"
+        f"{_render_manifest(shard.manifest)}\n\n"
+        f"Add an action_key: <action_key> line (from the table) to the front-matter of every file you "
+        f"write to /Pending_Approval/, naming the action file it answers. "
+        f"Other files in /Needs_Action/ are being handled by parallel runs — do not read, move or edit them. "
+        f"Write your plan to /Plans/{month}/Plan_{run_id}_{shard.label}.md and log everything to "
+        f"/Logs/{month}/{now:%Y-%m-%d}.json (Done/, Plans/ and Logs/ are partitioned by month). "
+        f"Do not update Dashboard.md; it is refreshed once all batches finish."
     )
 
+
+def _build_dashboard_prompt(vault_path: Path, counts: dict[str, int] | None) -> str:
+    now = datetime.now(timezone.utc)
+    prompt = (
+        f"Read the skill at .claude/skills/update_dashboard.md and execute it. "
+        f"The Obsidian vault is at {vault_path}. "
+        f"Only regenerate Dashboard.md — do not process /Needs_Action/. "
+        f"Today's activity log is /Logs/{now:%Y}/{now:%m}/{now:%Y-%m-%d}.json."
+    )
+    if counts:
+        listing = ", ".join(f"/{folder}/ {n}" for folder, n in counts.items())
+        prompt += (
+            f" Pipeline Overview counts come from the vault catalog and are exact — use them "
+            f"as-is instead of listing the folders: {listing}."
+        )
+    return prompt
+
 # ---------------------------------------------------------------------------
 # Claude executable resolver
 # ---------------------------------------------------------------------------
@@ -65,62 +702,421 @@ def _find_claude() -> tuple[str, bool]:
 
 
 # ---------------------------------------------------------------------------
-# Main
+# Claude Code runner
 # ---------------------------------------------------------------------------
 
-def main() -> None:
-    log.info("Scheduler triggered — invoking Claude Code reasoning loop")
-    log.info("Project dir : %s", PROJECT_DIR)
-    log.info("Vault path  : %s", VAULT_PATH)
+def _one_line(text: str, limit: int) -> str:
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[: limit - 1] + "…"
 
-    prompt = _build_prompt(VAULT_PATH)
 
-    claude_exe, use_shell = _find_claude()
-    log.info(
-        "Claude executable : %s%s",
-        claude_exe,
-        " (shell=True fallback)" if use_shell else "",
-    )
+def _describe_tool_input(tool_input: dict) -> str:
+    """The most telling argument of a tool call, for the progress log."""
+    for key in ("file_path", "path", "command", "pattern", "url", "query", "skill"):
+        if key in tool_input:
+            return _one_line(str(tool_input[key]), 120)
+    return ""
+
+
+def _handle_event(line: str, record: dict) -> None:
+    """Log one stream-json event from Claude Code and fold it into the run record."""
+    label = record["label"]
+    line = line.strip()
+    if not line:
+        return
+    try:
+        event = json.loads(line)
+    except json.JSONDecodeError:
+        log.info("[%s] %s", label, _one_line(line, 300))  # plain-text output from an older CLI
+        return
 
+    kind = event.get("type")
+    if kind == "system" and event.get("subtype") == "init":
+        log.info("[%s] Session started (model %s)", label, event.get("model", "unknown"))
+    elif kind == "assistant":
+        for block in event.get("message", {}).get("content", []):
+            if block.get("type") == "tool_use":
+                name = block.get("name", "unknown")
+                record["tool_calls"][name] = record["tool_calls"].get(name, 0) + 1
+                log.info("[%s] → %s %s", label, name, _describe_tool_input(block.get("input") or {}))
+            elif block.get("type") == "text" and block.get("text", "").strip():
+                log.info("[%s] %s", label, _one_line(block["text"], 200))
+    elif kind == "result":
+        record["turns"] = event.get("num_turns")
+        record["cost_usd"] = event.get("total_cost_usd")
+        record["api_error"] = bool(event.get("is_error"))
+        record["result"] = _one_line(event.get("result") or "", 500)
+        log.info("[%s] Result: %s", label, record["result"] or "(empty)")
+
+
+def _pump(stream, sink) -> None:
+    """Feed every line of a pipe to sink, then None once the pipe closes."""
+    for line in stream:
+        sink(line)
+    stream.close()
+    sink(None)
+
+
+def _run_claude(claude_exe: str, use_shell: bool, prompt: str, *, label: str, timeout: int) -> dict:
+    """
+    Run one bounded `claude -p` invocation, logging its stream-json events
+    as they arrive. Returns the run record — exit code, duration, turns,
+    cost and tool-call counts; a missing executable raises FileNotFoundError.
+    """
+    record = {
+        "label": label,
+        "ok": False,
+        "exit_code": None,
+        "timed_out": False,
+        "duration_s": 0.0,
+        "turns": None,
+        "cost_usd": None,
+        "api_error": False,
+        "tool_calls": {},
+        "result": "",
+    }
+    started = time.monotonic()
     try:
-        result = subprocess.run(
-            [claude_exe, "-p", prompt],
-            capture_output=True,
+        proc = subprocess.Popen(
+            [claude_exe, "-p", prompt, *STREAM_ARGS],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
             text=True,
-            timeout=600,
             shell=use_shell,
             cwd=str(PROJECT_DIR),
             encoding="utf-8",
             errors="replace",
+            bufsize=1,
         )
     except FileNotFoundError:
-        log.error("Claude Code not installed or not in PATH")
-        sys.exit(1)
-    except subprocess.TimeoutExpired:
-        log.error("Claude Code timed out after 10 minutes")
-        sys.exit(1)
+        raise
     except Exception as exc:
-        log.exception("Unexpected error invoking Claude Code: %s", exc)
-        sys.exit(1)
-
-    # Log the tail of Claude's stdout (keep it manageable)
-    stdout = result.stdout.strip()
-    if stdout:
-        tail = stdout[-500:] if len(stdout) > 500 else stdout
-        log.info("Claude Code output (last 500 chars):\n%s", tail)
-    else:
-        log.info("Claude Code produced no stdout output")
+        log.exception("[%s] Unexpected error invoking Claude Code: %s", label, exc)
+        return record
 
-    if result.returncode != 0:
-        stderr = result.stderr.strip()
+    # Pipes are drained on their own threads so neither can fill up and stall Claude
+    lines: queue.Queue[str | None] = queue.Queue()
+    stderr_tail: deque[str | None] = deque(maxlen=20)
+    threading.Thread(target=_pump, args=(proc.stdout, lines.put), daemon=True).start()
+    stderr_thread = threading.Thread(target=_pump, args=(proc.stderr, stderr_tail.append), daemon=True)
+    stderr_thread.start()
+
+    deadline = started + timeout
+    last_output = started
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            record["timed_out"] = True
+            proc.kill()
+            log.error("[%s] Claude Code timed out after %d s", label, timeout)
+            break
+        try:
+            line = lines.get(timeout=min(remaining, SILENCE_WARNING))
+        except queue.Empty:
+            silent = time.monotonic() - last_output
+            if silent >= SILENCE_WARNING:
+                log.warning(
+                    "[%s] No output for %.0f s (%.0f s elapsed, limit %d s)",
+                    label, silent, time.monotonic() - started, timeout,
+                )
+            continue
+        if line is None:
+            break
+        last_output = time.monotonic()
+        _handle_event(line, record)
+
+    proc.wait()
+    stderr_thread.join(timeout=5)
+    record["exit_code"] = proc.returncode
+    record["duration_s"] = round(time.monotonic() - started, 1)
+
+    if record["timed_out"]:
+        return record
+    if proc.returncode != 0:
+        stderr = "".join(line for line in stderr_tail if line).strip()
         log.error(
-            "Claude Code exited with code %d%s",
-            result.returncode,
+            "[%s] Claude Code exited with code %d%s",
+            label,
+            proc.returncode,
             f"\nstderr: {stderr}" if stderr else "",
         )
-        sys.exit(result.returncode)
+        return record
+
+    record["ok"] = not record["api_error"]
+    tools = sum(record["tool_calls"].values())
+    log.info(
+        "[%s] Finished in %.0f s — %s turn(s), %d tool call(s)%s",
+        label, record["duration_s"], record["turns"] or "?", tools,
+        f", ${record['cost_usd']:.4f}" if record["cost_usd"] is not None else "",
+    )
+    return record
+
+
+# ---------------------------------------------------------------------------
+# Run log
+# ---------------------------------------------------------------------------
+
+def _append_log(entry: dict) -> None:
+    """Append a structured entry to today's JSON log file."""
+    now = datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    log_path = vault_io.dated(LOGS_DIR, now) / f"{today}.json"
+
+    try:
+        data = json.loads(log_path.read_text(encoding="utf-8")) if log_path.exists() else {}
+    except (json.JSONDecodeError, OSError):
+        data = {}
+
+    data.setdefault("date", today)
+    data.setdefault("entries", [])
+    data["entries"].append(entry)
+
+    vault_io.write(log_path, json.dumps(data, indent=2, ensure_ascii=False))
+
+
+def _run_entry(run_id: str, reason: str, started: datetime, shards: list[Shard], dashboard: dict | None,
+               after: Snapshot, requeued: set[str], cached: list[str]) -> dict:
+    """The per-run record written to /Logs/: one entry covering every shard."""
+    runs = []
+    tool_calls: dict[str, int] = {}
+    for shard in shards:
+        processed = [name for name in shard.files if name not in after]
+        runs.append({**shard.record, "files": shard.files, "processed": processed})
+    if dashboard is not None:
+        runs.append({**dashboard, "files": [], "processed": []})
+    for run in runs:
+        for name, count in run["tool_calls"].items():
+            tool_calls[name] = tool_calls.get(name, 0) + count
+
+    failed = [run["label"] for run in runs if not run["ok"]]
+    costs = [run["cost_usd"] for run in runs if run["cost_usd"] is not None]
+    return {
+        "timestamp": started.strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "component": "scheduler",
+        "level": "error" if failed else "info",
+        "action": "reasoning_run",
+        "run_id": run_id,
+        "reason": reason,
+        "duration_s": round((datetime.now(timezone.utc) - started).total_seconds(), 1),
+        "result": "failed" if failed else "completed",
+        "failed": failed,
+        "files_processed": sum(len(run["processed"]) for run in runs),
+        "files_requeued": sorted(requeued),
+        "files_from_cache": cached,
+        "tool_calls": tool_calls,
+        "cost_usd": round(sum(costs), 4) if costs else None,
+        "runs": runs,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Reasoning loop trigger")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Run Claude Code even if the pre-flight check finds no new work",
+    )
+    parser.add_argument(
+        "--urgent-only",
+        action="store_true",
+        help="Process only new action files that match the urgency rule (used by urgent_trigger.py)",
+    )
+    parser.add_argument(
+        "--on-overlap",
+        choices=("skip", "coalesce"),
+        default=OVERLAP_POLICY,
+        help="What to do if another run holds the lock (default: SCHEDULER_OVERLAP or skip)",
+    )
+    return parser.parse_args()
+
+
+def _run_once(force: bool, urgent_only: bool) -> int:
+    """One pre-flight check and, if there is work, one sharded run. Returns the exit code."""
+    state = _load_state()
+    before = _snapshot_needs_action()
+    stamps = _folder_stamps()
+    seen = state.get("needs_action", {})
+    if urgent_only:
+        fresh = [name for name, sig in sorted(before.items()) if seen.get(name) != sig]
+        candidates = [e["file"] for e in map(manifest_entry, fresh) if e is not None and is_urgent(e)]
+        should_run = bool(candidates)
+        reason = (
+            f"{len(candidates)} urgent action file(s): {', '.join(candidates)}"
+            if candidates else "no new urgent action files"
+        )
+    else:
+        candidates = sorted(before)
+        should_run, reason = _preflight(state, before, stamps)
+    if force:
+        should_run, reason = True, f"--force ({reason})"
+
+    if not should_run:
+        log.info("Pre-flight: SKIP — %s", reason)
+        return 0
+    log.info("Pre-flight: RUN — %s", reason)
+
+    log.info("Scheduler triggered — invoking Claude Code reasoning loop")
+    log.info("Project dir : %s", PROJECT_DIR)
+    log.info("Vault path  : %s", VAULT_PATH)
+
+    claude_exe, use_shell = _find_claude()
+    log.info(
+        "Claude executable : %s%s",
+        claude_exe,
+        " (shell=True fallback)" if use_shell else "",
+    )
+
+    claimed = [name for name in candidates if _claim(name)]
+    if len(claimed) < len(candidates):
+        log.info("%d action file(s) are claimed by another run — leaving them", len(candidates) - len(claimed))
+
+    cache = None
+    try:
+        started = datetime.now(timezone.utc)
+        run_id = started.strftime("%Y%m%d_%H%M")
+        manifest = _build_manifest(claimed)
+        gone = set(claimed) - {entry["file"] for entry in manifest}
+        _release(sorted(gone))
+
+        # Files whose drafts already exist are answered from the result cache
+        cache = _load_result_cache()
+        cached = []
+        for entry in list(manifest):
+            hit = cache.get(entry["key"])
+            if hit is None:
+                continue
+            outputs = _live_outputs(hit)
+            if not outputs:
+                del cache[entry["key"]]  # drafts rejected or gone — reason about it again
+                continue
+            if _answer_from_cache(entry, hit, outputs):
+                manifest.remove(entry)
+                cached.append(entry["file"])
+        _release(cached)
+        if cached:
+            log.info("Result cache answered %d action file(s); %d left to dispatch", len(cached), len(manifest))
+
+        dispatched_ns = time.time_ns() - 2_000_000_000  # slack for coarse (FAT / network share) mtimes
+        shards = _plan_shards(manifest)
+        try:
+            if shards:
+                log.info(
+                    "Running %d shard(s), %d at a time: %s",
+                    len(shards), SHARD_WORKERS,
+                    ", ".join(f"{shard.label} ({len(shard.files)})" for shard in shards),
+                )
+                with ThreadPoolExecutor(max_workers=SHARD_WORKERS, thread_name_prefix="shard") as pool:
+                    futures = {
+                        pool.submit(
+                            _run_claude, claude_exe, use_shell, _build_prompt(VAULT_PATH, shard, run_id),
+                            label=shard.label, timeout=SHARD_TIMEOUT,
+                        ): shard
+                        for shard in shards
+                    }
+                    for future in as_completed(futures):
+                        shard = futures[future]
+                        shard.record = future.result()
+                        # Release as soon as each shard ends so a timed-out shard's
+                        # files are free for an overlapping run
+                        _release(shard.files)
+
+                # Cache what every shard drafted — a timed-out shard's finished
+                # files are then not reasoned about again on the retry
+                outputs = _collect_outputs(dispatched_ns, {entry["key"] for entry in manifest})
+                recorded = _record_outputs(cache, manifest, outputs)
+                if recorded:
+                    log.info("Result cache: recorded drafts for %d action file(s)", recorded)
+
+            try:
+                vault_archive.migrate()  # files a run left at the top of Done/, Plans/, Logs/
+            except OSError as exc:
+                log.warning("Could not partition this run's files (%s) — the nightly compaction will", exc)
+            counts = vault_catalog.refresh_counts()
+            dashboard = None
+            if not urgent_only:  # urgent runs stay short; the next full run refreshes the dashboard
+                dashboard = _run_claude(
+                    claude_exe, use_shell, _build_dashboard_prompt(VAULT_PATH, counts),
+                    label="dashboard", timeout=DASHBOARD_TIMEOUT,
+                )
+        except FileNotFoundError:
+            log.error("Claude Code not installed or not in PATH")
+            return 1
+    finally:
+        _release(claimed)
+        if cache is not None:
+            _save_result_cache(cache)
+
+    # Remember what this run was given. Files that appeared while Claude was
+    # working, files another run holds, and files left behind by a failed
+    # shard are all left out, so the next trigger still sees them as new.
+    # Files this run did not touch keep whatever state they had before.
+    after = _snapshot_needs_action()
+    requeued = {name for shard in shards if not shard.ok for name in shard.files if name in after}
+    handled = {
+        name: sig for name, sig in after.items()
+        if (name in claimed and before.get(name) == sig and name not in requeued)
+        or (name not in claimed and seen.get(name) == sig)
+    }
+    _save_state(handled, state.get("folders", {}) if urgent_only else _folder_stamps())
+
+    entry = _run_entry(run_id, reason, started, shards, dashboard, after, requeued, cached)
+    entry["mode"] = "urgent" if urgent_only else "full"
+    _append_log(entry)
+
+    if requeued:
+        log.warning("Requeued %d unfinished action file(s): %s", len(requeued), ", ".join(sorted(requeued)))
+    log.info(
+        "Run %s: %d file(s) processed in %.0f s, %d tool call(s)",
+        run_id, entry["files_processed"], entry["duration_s"], sum(entry["tool_calls"].values()),
+    )
+    if entry["failed"]:
+        log.error("Scheduler finished with failures: %s", ", ".join(entry["failed"]))
+        return 1
 
     log.info("Scheduler complete")
+    return 0
+
+
+def main() -> None:
+    args = _parse_args()
+
+    mode = "urgent" if args.urgent_only else "full"
+    lock = RunLock(LOCK_PATH, mode)
+    if not lock.acquire():
+        _on_overlap(lock, mode, args.on_overlap)
+        return
+
+    exit_code = 0
+    force = args.force
+    try:
+        while True:
+            # This run covers every trigger coalesced so far
+            FOLLOWUP_PATH.unlink(missing_ok=True)
+            exit_code = _run_once(force, urgent_only=mode == "urgent") or exit_code
+            force = False
+
+            followup = _pending_followup()
+            if followup and not lock.lost:
+                log.info("A trigger was coalesced during this run — starting the %s follow-up run", followup)
+                mode = lock.mode = followup
+                continue
+            lock.release()
+            # A trigger may have landed between the check above and the release
+            followup = _pending_followup()
+            if followup:
+                mode = lock.mode = followup
+                if lock.acquire():
+                    continue
+            break
+    finally:
+        lock.release()
+
+    if exit_code:
+        sys.exit(exit_code)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,200 @@
+"""
+Urgent Trigger — event-driven reasoning loop start
+Watches /Needs_Action/ and starts the scheduler straight away, in
+--urgent-only mode, when a new action file matches the local urgency rule
+(scheduler.is_urgent: an email or WhatsApp message with an urgency keyword,
+or an explicit priority: urgent). Ordinary items are left for the regular
+30-minute cron cadence.
+
+Arrivals are debounced — files are only classified once DEBOUNCE_SECONDS
+pass without a new one, so a burst of messages becomes one run and no file
+is read half-written — and trigger-started runs are spaced at least
+MIN_SPACING_MINUTES apart. If a scheduler run is already in progress the
+urgent run is coalesced into it (see scheduler.py).
+"""
+
+import logging
+import os
+import queue
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from watchdog.events import FileCreatedEvent, FileMovedEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
+
+import scheduler  # loads .env; shares the manifest parser and urgency rule
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+NEEDS_ACTION = scheduler.NEEDS_ACTION
+SCHEDULER_SCRIPT = Path(__file__).parent / "scheduler.py"
+
+DEBOUNCE_SECONDS = 5  # quiet period after the last arrival before classifying
+MIN_SPACING_MINUTES = float(os.environ.get("URGENT_MIN_SPACING_MIN", "5"))
+
+log = logging.getLogger("urgent_trigger")
+
+
+# ---------------------------------------------------------------------------
+# Trigger
+# ---------------------------------------------------------------------------
+
+class UrgentTrigger:
+    """
+    Collects new action file names from the observer thread and, on its own
+    thread, decides when to start an urgent scheduler run.
+    """
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[str | None] = queue.Queue()
+        self._proc: subprocess.Popen | None = None
+        self._thread = threading.Thread(target=self._run, name="urgent-trigger", daemon=True)
+        self._thread.start()
+
+    def notify(self, name: str) -> None:
+        self._queue.put(name)
+
+    def stop(self) -> None:
+        self._queue.put(None)
+        self._thread.join()
+
+    def _run(self) -> None:
+        arrived: set[str] = set()
+        urgent: list[str] = []
+        last_arrival = 0.0
+        last_start = float("-inf")
+        spacing = MIN_SPACING_MINUTES * 60
+
+        while True:
+            now = time.monotonic()
+            if arrived:
+                wait = last_arrival + DEBOUNCE_SECONDS - now
+            elif urgent:
+                wait = last_start + spacing - now
+            else:
+                wait = None
+
+            try:
+                name = self._queue.get(timeout=max(wait, 0) if wait is not None else None)
+            except queue.Empty:
+                pass
+            else:
+                if name is None:
+                    return
+                arrived.add(name)
+                last_arrival = time.monotonic()
+                continue
+
+            self._reap()
+            if arrived:
+                urgent.extend(name for name in sorted(arrived) if self._is_urgent(name))
+                arrived.clear()
+            if not urgent:
+                continue
+
+            due = last_start + spacing - time.monotonic()
+            if due > 0:
+                log.info("Urgent run held back %.0f s by the %g-min spacing: %s", due, MIN_SPACING_MINUTES, ", ".join(urgent))
+                continue
+
+            self._start_scheduler(urgent)
+            urgent = []
+            last_start = time.monotonic()
+
+    def _is_urgent(self, name: str) -> bool:
+        entry = scheduler.manifest_entry(name)
+        if entry is None:
+            return False  # already processed or moved
+        if scheduler.is_urgent(entry):
+            log.info("Urgent: %s (%s — %s)", name, entry["type"], " ".join(entry["hints"]) or entry["priority"])
+            return True
+        log.info("Queued for the next scheduled run: %s", name)
+        return False
+
+    def _start_scheduler(self, names: list[str]) -> None:
+        log.info("Starting urgent scheduler run for %d file(s): %s", len(names), ", ".join(names))
+        self._proc = subprocess.Popen(
+            [sys.executable, str(SCHEDULER_SCRIPT), "--urgent-only", "--on-overlap", "coalesce"],
+            cwd=str(scheduler.PROJECT_DIR),
+        )
+
+    def _reap(self) -> None:
+        """Log how the last urgent run ended, once it has."""
+        if self._proc is not None and self._proc.poll() is not None:
+            if self._proc.returncode:
+                log.warning("Urgent scheduler run exited with code %d", self._proc.returncode)
+            self._proc = None
+
+
+# ---------------------------------------------------------------------------
+# Watchdog event handler
+# ---------------------------------------------------------------------------
+
+class NeedsActionHandler(FileSystemEventHandler):
+    def __init__(self, trigger: UrgentTrigger) -> None:
+        super().__init__()
+        self._trigger = trigger
+
+    def on_created(self, event: FileCreatedEvent) -> None:
+        if not event.is_directory:
+            self._offer(Path(event.src_path))
+
+    def on_moved(self, event: FileMovedEvent) -> None:
+        if not event.is_directory and Path(event.dest_path).parent == NEEDS_ACTION:
+            self._offer(Path(event.dest_path))
+
+    def _offer(self, path: Path) -> None:
+        if path.suffix == ".md" and not path.name.startswith("."):
+            self._trigger.notify(path.name)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def run(stop: threading.Event, observer: BaseObserver | None = None) -> None:
+    """
+    Watch /Needs_Action/ until stop is set, on the given (already running)
+    observer if there is one, and otherwise on one of its own.
+    """
+    NEEDS_ACTION.mkdir(parents=True, exist_ok=True)
+    log.info(
+        "Urgent Trigger started — watching %s (debounce %d s, min spacing %g min)",
+        NEEDS_ACTION, DEBOUNCE_SECONDS, MIN_SPACING_MINUTES,
+    )
+
+    trigger = UrgentTrigger()
+    own_observer = observer is None
+    if own_observer:
+        observer = Observer()
+        observer.start()
+    watch = observer.schedule(NeedsActionHandler(trigger), str(NEEDS_ACTION), recursive=False)
+
+    try:
+        while not stop.wait(1):
+            if not observer.is_alive():
+                raise RuntimeError("file system observer stopped")
+    except KeyboardInterrupt:
+        log.info("Shutting down...")
+    finally:
+        if own_observer:
+            observer.stop()
+            observer.join()
+        else:
+            observer.unschedule(watch)
+        trigger.stop()
+        log.info("Urgent Trigger stopped.")
+
+
+def main() -> None:
+    run(threading.Event())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,311 @@
+"""
+Vault Archive — date partitions and monthly compaction
+/Done/, /Plans/ and /Logs/ are partitioned by month (Done/2026/10/...) so no
+folder grows forever. Components write new files straight into the current
+partition (vault_io.dated); migrate() sweeps anything still at the top
+level — files from before partitioning, or written there by a Claude Code
+run — into the partition for its date.
+
+compact() rolls every month older than VAULT_ARCHIVE_AFTER_MONTHS into
+<folder>/archive/YYYY-MM.zip and records each file (name, size, hash,
+front-matter) in <folder>/archive/index.json, then removes the live files.
+The zip is built beside the old one, verified and swapped in before
+anything is deleted, so an interrupted compaction just runs again. search()
+looks through the manifests (and, with --content, inside the archives), so
+old items stay findable without being live notes Obsidian has to index.
+
+Done/originals/ is not date-partitioned: it is a content-addressed store,
+already spread over blobs/<sha[:2]>/, that duplicate detection looks up by
+hash.
+
+Usage (PM2 runs `compact` nightly):
+    uv run python src/vault_archive.py migrate
+    uv run python src/vault_archive.py compact [--after-months N] [--dry-run]
+    uv run python src/vault_archive.py search "agents" [--folder Done] [--content]
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import zipfile
+from collections.abc import Iterator
+from datetime import datetime, timezone
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+import vault_catalog
+import vault_io
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+load_dotenv()
+
+VAULT_PATH = Path(os.environ["VAULT_PATH"])
+PARTITIONED = ("Done", "Plans", "Logs")
+ARCHIVE_DIR = "archive"  # <folder>/archive/YYYY-MM.zip + index.json
+
+ARCHIVE_AFTER_MONTHS = int(os.environ.get("VAULT_ARCHIVE_AFTER_MONTHS", "3"))
+
+_LOG_NAME = re.compile(r"^(\d{4})-(\d{2})-(\d{2})\.json$")
+
+log = logging.getLogger("vault_archive")
+
+
+# ---------------------------------------------------------------------------
+# Migration
+# ---------------------------------------------------------------------------
+
+def _merge_log(src: Path, dest: Path) -> None:
+    """Fold a flat daily log into the partitioned one for the same day."""
+    def entries(path: Path) -> list[dict]:
+        try:
+            return json.loads(path.read_text(encoding="utf-8")).get("entries", [])
+        except (OSError, json.JSONDecodeError, AttributeError):
+            return []
+
+    merged = sorted(entries(dest) + entries(src), key=lambda e: str(e.get("timestamp", "")))
+    data = {"date": src.stem, "entries": merged}
+    vault_io.write(dest, json.dumps(data, indent=2, ensure_ascii=False))
+    vault_io.remove(src)
+
+
+def migrate(now: datetime | None = None) -> int:
+    """Move top-level files of the partitioned folders into YYYY/MM. Returns how many moved."""
+    now = now or datetime.now(timezone.utc)
+    today = now.strftime("%Y-%m-%d")
+    moved = 0
+    with vault_io.batch():
+        for name in PARTITIONED:
+            folder = VAULT_PATH / name
+            try:
+                entries = [e for e in os.scandir(folder) if e.is_file() and not e.name.startswith(".")]
+            except FileNotFoundError:
+                continue
+            for entry in sorted(entries, key=lambda e: e.name):
+                path = Path(entry.path)
+                if name == "Logs":
+                    match = _LOG_NAME.match(entry.name)
+                    if match is None or path.stem >= today:
+                        continue  # not a daily log, or a day that is still being written
+                    target = folder / match[1] / match[2] / entry.name
+                    if target.exists():
+                        _merge_log(path, target)
+                    else:
+                        vault_io.move(path, target.parent)
+                else:
+                    when = datetime.fromtimestamp(entry.stat().st_mtime, timezone.utc)
+                    vault_io.move(path, vault_io.dated(folder, when))
+                moved += 1
+    if moved:
+        log.info("Partitioned %d file(s) into YYYY/MM folders", moved)
+    return moved
+
+
+# ---------------------------------------------------------------------------
+# Compaction
+# ---------------------------------------------------------------------------
+
+def _months(folder: Path) -> Iterator[tuple[int, int, Path]]:
+    """(year, month, path) of every YYYY/MM partition in folder."""
+    for year in sorted(folder.iterdir()) if folder.is_dir() else []:
+        if not (year.is_dir() and len(year.name) == 4 and year.name.isdigit()):
+            continue
+        for month in sorted(year.iterdir()):
+            if month.is_dir() and len(month.name) == 2 and month.name.isdigit():
+                yield int(year.name), int(month.name), month
+
+
+def _describe(path: Path, data: bytes) -> dict:
+    """Manifest fields for one archived file: front-matter for notes, a summary for logs."""
+    if path.suffix == ".md":
+        return {"meta": vault_catalog.read_front_matter(path)}
+    if path.suffix == ".json":
+        try:
+            entries = json.loads(data).get("entries", [])
+        except (json.JSONDecodeError, AttributeError):
+            return {}
+        return {
+            "entries": len(entries),
+            "components": sorted({str(e.get("component")) for e in entries if e.get("component")}),
+        }
+    return {}
+
+
+def _load_manifest(archive_dir: Path) -> dict:
+    try:
+        return json.loads((archive_dir / "index.json").read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+    except (OSError, json.JSONDecodeError) as exc:
+        raise RuntimeError(f"archive manifest {archive_dir / 'index.json'} is unreadable: {exc}") from exc
+
+
+def _compact_month(folder: Path, year: int, month: int, month_dir: Path) -> int:
+    """Roll one month partition into its zip; returns how many files were archived."""
+    files = sorted(p for p in month_dir.rglob("*") if p.is_file() and not p.name.startswith("."))
+    if not files:
+        shutil.rmtree(month_dir, ignore_errors=True)
+        return 0
+
+    key = f"{year}-{month:02d}"
+    archive_dir = folder / ARCHIVE_DIR
+    archive_dir.mkdir(parents=True, exist_ok=True)
+    archive = archive_dir / f"{key}.zip"
+    manifest = _load_manifest(archive_dir)
+    section = manifest.setdefault(key, {"archive": archive.name, "files": {}})
+
+    # Build the new zip beside the old one (extending it if this month was
+    # compacted before) and only swap it in once it has been verified
+    tmp = archive_dir / f".{archive.name}.tmp"
+    if archive.exists():
+        shutil.copy2(archive, tmp)
+    else:
+        tmp.unlink(missing_ok=True)
+    with zipfile.ZipFile(tmp, "a", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as zf:
+        stored = {info.filename for info in zf.infolist()}
+        for path in files:
+            data = path.read_bytes()
+            digest = hashlib.sha256(data).hexdigest()
+            arcname = path.relative_to(month_dir).as_posix()
+            stem, suffix = os.path.splitext(arcname)
+            n = 1
+            while arcname in stored:
+                known = section["files"].get(arcname, {}).get("sha256")
+                if (known or hashlib.sha256(zf.read(arcname)).hexdigest()) == digest:
+                    break  # already archived by an interrupted run
+                n += 1
+                arcname = f"{stem}_{n}{suffix}"
+            else:
+                zf.write(path, arcname)
+                stored.add(arcname)
+            mtime = datetime.fromtimestamp(path.stat().st_mtime, timezone.utc)
+            section["files"][arcname] = {
+                "name": path.name,
+                "size": len(data),
+                "sha256": digest,
+                "modified": mtime.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                **_describe(path, data),
+            }
+    with zipfile.ZipFile(tmp) as zf:
+        bad = zf.testzip()
+    if bad is not None:
+        tmp.unlink(missing_ok=True)
+        raise RuntimeError(f"{archive.name}: verification failed at {bad}")
+    with open(tmp, "rb+") as fh:
+        os.fsync(fh.fileno())
+    os.replace(tmp, archive)
+
+    section["compacted_at"] = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+    vault_io.write(archive_dir / "index.json", json.dumps(manifest, indent=2, ensure_ascii=False))
+
+    with vault_io.batch():
+        for path in files:
+            vault_io.remove(path)
+    shutil.rmtree(month_dir, ignore_errors=True)  # only empty subfolders are left
+    year_dir = month_dir.parent
+    if not any(year_dir.iterdir()):
+        year_dir.rmdir()
+    return len(files)
+
+
+def compact(after_months: int = ARCHIVE_AFTER_MONTHS, *, dry_run: bool = False,
+            now: datetime | None = None) -> dict[str, int]:
+    """
+    Archive every month partition that ended more than after_months ago.
+    Returns {"Folder/YYYY-MM": files archived}.
+    """
+    now = now or datetime.now(timezone.utc)
+    cutoff = now.year * 12 + now.month - 1 - after_months
+    done: dict[str, int] = {}
+    for name in PARTITIONED:
+        folder = VAULT_PATH / name
+        for year, month, month_dir in list(_months(folder)):
+            if year * 12 + month - 1 >= cutoff:
+                continue
+            label = f"{name}/{year}-{month:02d}"
+            if dry_run:
+                done[label] = sum(1 for p in month_dir.rglob("*") if p.is_file())
+                continue
+            done[label] = _compact_month(folder, year, month, month_dir)
+            log.info("Compacted %s: %d file(s) → %s/%s/%d-%02d.zip", label, done[label], name, ARCHIVE_DIR, year, month)
+    return done
+
+
+# ---------------------------------------------------------------------------
+# Search
+# ---------------------------------------------------------------------------
+
+def search(term: str, folders: tuple[str, ...] = PARTITIONED, *, content: bool = False) -> Iterator[dict]:
+    """Archived files whose name or front-matter (or, with content, text) contains term."""
+    needle = term.lower()
+    for name in folders:
+        archive_dir = VAULT_PATH / name / ARCHIVE_DIR
+        for key, section in sorted(_load_manifest(archive_dir).items()):
+            zf = zipfile.ZipFile(archive_dir / section["archive"]) if content else None
+            try:
+                for arcname, info in section["files"].items():
+                    fields = " ".join([arcname, *map(str, info.get("meta", {}).values())])
+                    hit = needle in fields.lower()
+                    if not hit and zf is not None:
+                        hit = needle in zf.read(arcname).decode("utf-8", errors="replace").lower()
+                    if hit:
+                        yield {"archive": f"{name}/{ARCHIVE_DIR}/{section['archive']}", "file": arcname, **info}
+            finally:
+                if zf is not None:
+                    zf.close()
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Vault date partitions and archive compaction")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="Move flat files in Done/, Plans/ and Logs/ into YYYY/MM partitions")
+    comp = sub.add_parser("compact", help="Migrate, then archive months older than the threshold")
+    comp.add_argument("--after-months", type=int, default=ARCHIVE_AFTER_MONTHS,
+                      help=f"Keep this many past months live (default: {ARCHIVE_AFTER_MONTHS})")
+    comp.add_argument("--dry-run", action="store_true", help="Only list what would be archived")
+    find = sub.add_parser("search", help="Search archived files by name and front-matter")
+    find.add_argument("term")
+    find.add_argument("--folder", choices=PARTITIONED, help="Only this folder's archives")
+    find.add_argument("--content", action="store_true", help="Also search inside archived files")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s  [%(levelname)s]  %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    args = _parse_args()
+
+    if args.command == "migrate":
+        migrate()
+    elif args.command == "compact":
+        if not args.dry_run:
+            migrate()
+        archived = compact(args.after_months, dry_run=args.dry_run)
+        for label, n in archived.items():
+            if args.dry_run:
+                log.info("Would archive %s: %d file(s)", label, n)
+        if not archived:
+            log.info("Nothing older than %d month(s) to archive", args.after_months)
+    else:
+        folders = (args.folder,) if args.folder else PARTITIONED
+        for hit in search(args.term, folders, content=args.content):
+            meta = hit.get("meta", {})
+            print(f"{hit['archive']}  {hit['file']}  {meta.get('type', '')}  {meta.get('topic', '')}".rstrip())
+
+
+if __name__ == "__main__":
+    main()
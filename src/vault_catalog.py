@@ -0,0 +1,341 @@
+"""
+Vault Catalog — indexed view of the pipeline folders
+One SQLite row per markdown file in the vault's pipeline folders: folder,
+type, status, created, source and the other front-matter keys, so questions
+like "how many drafts await review?" are an indexed query instead of a
+folder listing plus a markdown re-parse.
+
+The database (secrets/vault_catalog.db) runs in WAL mode, so the watchers,
+the orchestrator and the scheduler can all update it while readers query
+it. Components call record() after writing a file and record_move() after
+moving one. Files written by someone else — Claude Code runs, or a human
+dragging a draft in Obsidian — are picked up by sync(), an incremental pass
+that re-reads only files whose size or mtime changed. rebuild() re-parses
+everything.
+
+A catalog failure is logged and never stops the component that called it;
+the next sync() repairs whatever was missed.
+
+Usage:
+    uv run python src/vault_catalog.py rebuild
+    uv run python src/vault_catalog.py sync
+    uv run python src/vault_catalog.py counts
+    uv run python src/vault_catalog.py list Done --since 2026-02-23
+"""
+
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterator
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+load_dotenv()
+
+VAULT_PATH = Path(os.environ["VAULT_PATH"])
+CATALOG_PATH = Path("secrets/vault_catalog.db")
+
+# Pipeline stages, in order. Subfolders are catalogued too, except the
+# originals store, which holds raw drops rather than vault notes, and the
+# compacted month archives (see vault_archive.py).
+PIPELINE_FOLDERS = ("Needs_Action", "Plans", "Pending_Approval", "Approved", "Done", "Rejected")
+SKIP_DIRS = {"originals", "archive"}
+
+# Front-matter keys with a column of their own; everything else is in meta
+COLUMNS = ("type", "status", "action", "created", "source", "priority", "topic")
+
+FRONT_MATTER_BYTES = 8192  # front-matter is read from the head of each file only
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path       TEXT PRIMARY KEY,   -- vault-relative, forward slashes
+    folder     TEXT NOT NULL,      -- pipeline stage (top-level folder)
+    name       TEXT NOT NULL,
+    type       TEXT,
+    status     TEXT,
+    action     TEXT,
+    created    TEXT,
+    source     TEXT,
+    priority   TEXT,
+    topic      TEXT,
+    meta       TEXT NOT NULL,      -- full front-matter as JSON
+    size       INTEGER NOT NULL,
+    mtime_ns   INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS files_folder ON files (folder, type);
+CREATE INDEX IF NOT EXISTS files_created ON files (folder, created);
+CREATE INDEX IF NOT EXISTS files_name ON files (name);
+"""
+
+log = logging.getLogger("vault_catalog")
+
+_local = threading.local()  # one connection per thread
+
+
+# ---------------------------------------------------------------------------
+# Connection
+# ---------------------------------------------------------------------------
+
+def _connect() -> sqlite3.Connection:
+    conn = getattr(_local, "conn", None)
+    if conn is not None:
+        return conn
+    CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CATALOG_PATH, timeout=10, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+        conn.executescript("DROP TABLE IF EXISTS files;" + _SCHEMA + f"PRAGMA user_version={SCHEMA_VERSION};")
+    _local.conn = conn
+    return conn
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _relative(path: Path) -> tuple[str, str] | None:
+    """(vault-relative path, folder) for a catalogued file, or None if out of scope."""
+    try:
+        rel = path.resolve().relative_to(VAULT_PATH.resolve())
+    except ValueError:
+        return None
+    parts = rel.parts
+    if len(parts) < 2 or parts[0] not in PIPELINE_FOLDERS or path.suffix != ".md":
+        return None
+    if any(part in SKIP_DIRS or part.startswith(".") for part in parts[1:]):
+        return None
+    return rel.as_posix(), parts[0]
+
+
+def read_front_matter(path: Path) -> dict[str, str]:
+    """Flat key: value front-matter, tolerating the BOM Obsidian sometimes adds."""
+    with path.open("rb") as fh:
+        head = fh.read(FRONT_MATTER_BYTES).decode("utf-8", errors="replace").lstrip("\ufeff")
+    if not head.startswith("---"):
+        return {}
+    end = head.find("\n---", 3)
+    if end == -1:
+        return {}
+    meta = {}
+    for line in head[3:end].splitlines():
+        key, sep, value = line.partition(":")
+        if sep and key.strip() and not key.startswith((" ", "\t")):
+            meta[key.strip()] = value.strip().strip("\"'")
+    return meta
+
+
+def _row(path: Path, rel: str, folder: str, st: os.stat_result) -> tuple:
+    meta = read_front_matter(path)
+    return (
+        rel, folder, path.name,
+        *(meta.get(column) for column in COLUMNS),
+        json.dumps(meta, ensure_ascii=False), st.st_size, st.st_mtime_ns, time.time(),
+    )
+
+
+_UPSERT = (
+    f"INSERT OR REPLACE INTO files (path, folder, name, {', '.join(COLUMNS)}, meta, size, mtime_ns, indexed_at) "
+    f"VALUES ({', '.join('?' * (len(COLUMNS) + 7))})"
+)
+
+
+# ---------------------------------------------------------------------------
+# Incremental updates
+# ---------------------------------------------------------------------------
+
+def record(path: Path) -> None:
+    """Catalog a file that was just written (or drop it if it has gone)."""
+    scoped = _relative(path)
+    if scoped is None:
+        return
+    rel, folder = scoped
+    try:
+        conn = _connect()
+        try:
+            st = path.stat()
+        except FileNotFoundError:
+            conn.execute("DELETE FROM files WHERE path = ?", (rel,))
+            return
+        conn.execute(_UPSERT, _row(path, rel, folder, st))
+    except (sqlite3.Error, OSError) as exc:
+        log.warning("Vault catalog: could not record %s (%s)", rel, exc)
+
+
+def record_move(src: Path, dest: Path) -> None:
+    """Catalog a move between (or out of) pipeline folders."""
+    forget(src)
+    record(dest)
+
+
+def forget(path: Path) -> None:
+    scoped = _relative(path)
+    if scoped is None:
+        return
+    try:
+        _connect().execute("DELETE FROM files WHERE path = ?", (scoped[0],))
+    except sqlite3.Error as exc:
+        log.warning("Vault catalog: could not forget %s (%s)", scoped[0], exc)
+
+
+# ---------------------------------------------------------------------------
+# Sync and rebuild
+# ---------------------------------------------------------------------------
+
+def _walk(folder: Path) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in SKIP_DIRS:
+                        yield from _walk(Path(entry.path))
+                elif entry.name.endswith(".md") and entry.is_file():
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def sync(full: bool = False) -> dict[str, int]:
+    """
+    Bring the catalog in line with the vault. Only files whose size or mtime
+    changed are re-read unless full is set. Returns added / updated / removed
+    counts; raises sqlite3.Error if the database itself is unusable.
+    """
+    conn = _connect()
+    known = {row["path"]: (row["size"], row["mtime_ns"]) for row in conn.execute("SELECT path, size, mtime_ns FROM files")}
+    stats = {"added": 0, "updated": 0, "removed": 0, "unchanged": 0}
+    rows = []
+    present = set()
+    for folder in PIPELINE_FOLDERS:
+        for entry in _walk(VAULT_PATH / folder):
+            path = Path(entry.path)
+            rel = path.relative_to(VAULT_PATH).as_posix()
+            present.add(rel)
+            try:
+                st = entry.stat()
+                if not full and known.get(rel) == (st.st_size, st.st_mtime_ns):
+                    stats["unchanged"] += 1
+                    continue
+                rows.append(_row(path, rel, folder, st))
+            except FileNotFoundError:
+                present.discard(rel)
+                continue
+            stats["updated" if rel in known else "added"] += 1
+
+    gone = [(rel,) for rel in known.keys() - present]
+    stats["removed"] = len(gone)
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(_UPSERT, rows)
+        conn.executemany("DELETE FROM files WHERE path = ?", gone)
+    return stats
+
+
+def rebuild() -> dict[str, int]:
+    """Re-parse every file in the pipeline folders."""
+    return sync(full=True)
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def counts() -> dict[str, int]:
+    """Number of files in each pipeline folder (zero for empty ones)."""
+    result = dict.fromkeys(PIPELINE_FOLDERS, 0)
+    rows = _connect().execute("SELECT folder, COUNT(*) AS n FROM files GROUP BY folder")
+    result.update({row["folder"]: row["n"] for row in rows})
+    return result
+
+
+def refresh_counts() -> dict[str, int] | None:
+    """sync(), then counts() — or None (logged) if the catalog is unusable."""
+    try:
+        sync()
+        return counts()
+    except sqlite3.Error as exc:
+        log.warning("Vault catalog unavailable (%s) — pipeline counts not refreshed", exc)
+        return None
+
+
+def locate(folder: str, name: str) -> list[str]:
+    """Vault-relative paths of files called name anywhere in folder (e.g. any Done/ partition)."""
+    try:
+        rows = _connect().execute("SELECT path FROM files WHERE folder = ? AND name = ?", (folder, name))
+        return [row["path"] for row in rows]
+    except sqlite3.Error as exc:
+        log.warning("Vault catalog: could not look up %s/%s (%s)", folder, name, exc)
+        return []
+
+
+def files(folder: str, *, kind: str | None = None, since: str | None = None) -> list[dict]:
+    """Catalog rows for one folder, newest first; since filters on the created field."""
+    query = "SELECT * FROM files WHERE folder = ?"
+    params: list = [folder]
+    if kind is not None:
+        query += " AND type = ?"
+        params.append(kind)
+    if since is not None:
+        query += " AND created >= ?"
+        params.append(since)
+    rows = _connect().execute(query + " ORDER BY created DESC, name", params)
+    return [{**dict(row), "meta": json.loads(row["meta"])} for row in rows]
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Vault catalog maintenance and queries")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("rebuild", help="Re-parse every file in the pipeline folders")
+    sub.add_parser("sync", help="Re-read only files that changed since the last sync")
+    sub.add_parser("counts", help="Files per pipeline folder")
+    listing = sub.add_parser("list", help="Files in one folder, newest first")
+    listing.add_argument("folder", choices=PIPELINE_FOLDERS)
+    listing.add_argument("--type", help="Only this front-matter type")
+    listing.add_argument("--since", help="Only files created on or after this date (YYYY-MM-DD)")
+    return parser.parse_args()
+
+
+def main() -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s  [%(levelname)s]  %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+    )
+    args = _parse_args()
+
+    if args.command in ("rebuild", "sync"):
+        started = time.monotonic()
+        stats = rebuild() if args.command == "rebuild" else sync()
+        log.info(
+            "Catalog %s: %d added, %d updated, %d removed, %d unchanged in %.0f ms",
+            args.command, stats["added"], stats["updated"], stats["removed"], stats["unchanged"],
+            (time.monotonic() - started) * 1000,
+        )
+    elif args.command == "counts":
+        for folder, n in counts().items():
+            print(f"{folder:<18}{n:>6}")
+    else:
+        for row in files(args.folder, kind=args.type, since=args.since):
+            print(f"{row['created'] or '-':<22}{row['type'] or '-':<16}{row['path']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+"""
+Vault I/O — atomic, collision-free writes and moves for vault notes
+Every component that creates, rewrites or moves a note in the vault goes
+through here, so no reader (Obsidian, the orchestrator, the scheduler's
+snapshot, the urgent trigger) ever sees a half-written file and no note
+ever silently replaces another.
+
+- create() writes to a hidden temp file in the target folder, fsyncs it and
+  gives it its final name with os.link, which fails instead of overwriting.
+  A taken name gets a numeric suffix (NAME_2.md, NAME_3.md, ...). On file
+  systems without hard links, the name is reserved with O_EXCL and the
+  temp file renamed over the reservation.
+- write() atomically replaces a note that has one fixed name (Dashboard.md,
+  the daily logs).
+- move() is the same no-clobber placement for an existing file, and copies
+  then removes when the destination is on another drive.
+- Directory entries are fsynced after each change; inside batch() they are
+  fsynced once per directory when the batch ends.
+- dated() is the YYYY/MM partition new files in /Done/, /Plans/ and /Logs/
+  go into (see vault_archive.py for migration and compaction).
+
+Every change is also recorded in the vault catalog.
+"""
+
+import errno
+import logging
+import os
+import shutil
+import threading
+import time
+import uuid
+from collections.abc import Iterator
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from itertools import count
+from pathlib import Path
+
+import vault_catalog
+
+log = logging.getLogger("vault_io")
+
+REPLACE_RETRIES = 5  # Windows refuses a replace while another process has the file open
+
+_local = threading.local()  # pending directory fsyncs of the current batch()
+_hard_links = True          # cleared once a probe confirms the vault's file system has none
+
+# errnos os.link raises when the file system (not this file) cannot hard-link
+_NO_LINK_ERRNOS = {errno.EPERM, errno.ENOTSUP, errno.EOPNOTSUPP, errno.ENOSYS, errno.EMLINK}
+
+
+# ---------------------------------------------------------------------------
+# Durability helpers
+# ---------------------------------------------------------------------------
+
+def _fsync_dir(folder: Path) -> None:
+    if os.name == "nt":
+        return  # directories cannot be opened on Windows; NTFS journals the entry itself
+    try:
+        fd = os.open(folder, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass  # some network file systems do not support it
+    finally:
+        os.close(fd)
+
+
+def _sync_dir(folder: Path) -> None:
+    pending = getattr(_local, "pending", None)
+    if pending is None:
+        _fsync_dir(folder)
+    else:
+        pending.add(folder)
+
+
+@contextmanager
+def batch() -> Iterator[None]:
+    """Defer directory fsyncs to the end of the block — one per directory touched."""
+    if getattr(_local, "pending", None) is not None:
+        yield  # already inside a batch
+        return
+    _local.pending = set()
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        for folder in pending:
+            _fsync_dir(folder)
+
+
+def _temp_path(folder: Path, name: str) -> Path:
+    # Hidden, so watchers, the scheduler snapshot and Obsidian all ignore it
+    return folder / f".{name}.{uuid.uuid4().hex[:8]}.tmp"
+
+
+def _write_temp(folder: Path, name: str, content: str | bytes) -> Path:
+    data = content.encode("utf-8") if isinstance(content, str) else content
+    tmp = _temp_path(folder, name)
+    with open(tmp, "xb") as fh:
+        fh.write(data)
+        fh.flush()
+        os.fsync(fh.fileno())
+    return tmp
+
+
+# ---------------------------------------------------------------------------
+# No-clobber placement
+# ---------------------------------------------------------------------------
+
+def _links_supported(folder: Path) -> bool:
+    """Probe whether folder's file system can hard-link a fresh file of our own."""
+    probe = _temp_path(folder, "link-probe")
+    linked = probe.with_name(f"{probe.name}.link")
+    try:
+        os.close(os.open(probe, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+        os.link(probe, linked)
+    except OSError as exc:
+        return exc.errno not in _NO_LINK_ERRNOS
+    finally:
+        linked.unlink(missing_ok=True)
+        probe.unlink(missing_ok=True)
+    return True
+
+
+def _link_no_clobber(src: Path, dest: Path) -> None:
+    """Give src the name dest and drop the old name. FileExistsError if dest is taken."""
+    global _hard_links
+    if _hard_links:
+        try:
+            os.link(src, dest)
+        except OSError as exc:
+            # A missing source, EACCES, ENOSPC, EXDEV, a taken name... are this
+            # call's problem. EPERM can also be a protected_hardlinks refusal,
+            # so only a failed probe switches the whole process to O_EXCL.
+            if exc.errno not in _NO_LINK_ERRNOS or _links_supported(dest.parent):
+                raise
+            _hard_links = False
+            log.info("Vault file system has no hard links (%s) — reserving names with O_EXCL instead", exc)
+        else:
+            src.unlink()
+            return
+
+    os.close(os.open(dest, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    try:
+        os.replace(src, dest)
+    except OSError:
+        dest.unlink(missing_ok=True)
+        raise
+
+
+def _place(src: Path, folder: Path, name: str) -> Path:
+    """Move src into folder under name, or the first free NAME_n variant of it."""
+    stem, suffix = os.path.splitext(name)
+    for n in count(1):
+        dest = folder / (name if n == 1 else f"{stem}_{n}{suffix}")
+        try:
+            _link_no_clobber(src, dest)
+        except FileExistsError:
+            continue
+        return dest
+
+
+# ---------------------------------------------------------------------------
+# Public API
+# ---------------------------------------------------------------------------
+
+def create(folder: Path, name: str, content: str | bytes) -> Path:
+    """
+    Atomically create a new note in folder. Never replaces an existing file:
+    a taken name gets a _2, _3, ... suffix. Returns the path written.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    tmp = _write_temp(folder, name, content)
+    try:
+        dest = _place(tmp, folder, name)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _sync_dir(folder)
+    vault_catalog.record(dest)
+    return dest
+
+
+def write(path: Path, content: str | bytes) -> None:
+    """Atomically replace the contents of a note with a fixed name (or create it)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = _write_temp(path.parent, path.name, content)
+    try:
+        for attempt in range(REPLACE_RETRIES):
+            try:
+                os.replace(tmp, path)
+                break
+            except PermissionError:
+                if attempt == REPLACE_RETRIES - 1:
+                    raise
+                time.sleep(0.1 * (attempt + 1))
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+    _sync_dir(path.parent)
+    vault_catalog.record(path)
+
+
+def move(src: Path, folder: Path, name: str | None = None) -> Path:
+    """
+    Move src into folder (as name, default its own), never replacing an
+    existing file. Works across drives. Returns the new path.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    name = name or src.name
+    try:
+        dest = _place(src, folder, name)
+    except OSError as exc:
+        if exc.errno != errno.EXDEV:
+            raise
+        tmp = _temp_path(folder, name)
+        try:
+            shutil.copy2(src, tmp)
+            with open(tmp, "rb+") as fh:
+                os.fsync(fh.fileno())
+            dest = _place(tmp, folder, name)
+        except BaseException:
+            tmp.unlink(missing_ok=True)
+            raise
+        src.unlink()
+    _sync_dir(folder)
+    _sync_dir(src.parent)
+    vault_catalog.record_move(src, dest)
+    return dest
+
+
+def dated(folder: Path, when: datetime | None = None) -> Path:
+    """The YYYY/MM partition of folder for when (default: now, UTC)."""
+    when = when or datetime.now(timezone.utc)
+    return folder / f"{when:%Y}" / f"{when:%m}"
+
+
+def remove(path: Path) -> None:
+    """Delete a note (if it is still there)."""
+    path.unlink(missing_ok=True)
+    _sync_dir(path.parent)
+    vault_catalog.forget(path)
@@ -0,0 +1,219 @@
+"""
+Drop Extractors — text extraction for the File Drop Watcher
+Turns documents dropped into /Drop_Here/ (HTML saves, .docx, .eml, PDF)
+into plain text the reasoning loop can read.
+
+Extractors are registered per format with @register(kind, *suffixes).
+The format of a file is sniffed from its first bytes and falls back to
+its suffix, so a mis-named file is still parsed correctly.
+
+Extractors run in a worker process (see filesystem_watcher), so each one
+must be a top-level function that takes a Path and returns str.
+"""
+
+import email
+import re
+import zipfile
+from collections.abc import Callable
+from email import policy
+from html.parser import HTMLParser
+from pathlib import Path
+from xml.etree import ElementTree
+
+try:
+    import pypdf  # declared in pyproject; guarded so an unsynced env only loses PDF
+except ImportError:
+    pypdf = None
+
+# kind → extractor, and suffix → kind; filled in by @register below
+EXTRACTORS: dict[str, Callable[[Path], str]] = {}
+SUFFIX_KINDS: dict[str, str] = {}
+
+SNIFF_BYTES = 2048
+
+
+class ExtractionError(Exception):
+    """A dropped file could not be turned into text."""
+
+
+def register(kind: str, *suffixes: str) -> Callable:
+    """Register the decorated function as the extractor for kind / suffixes."""
+    def decorator(func: Callable[[Path], str]) -> Callable[[Path], str]:
+        EXTRACTORS[kind] = func
+        for suffix in suffixes:
+            SUFFIX_KINDS[suffix] = kind
+        return func
+    return decorator
+
+
+# ---------------------------------------------------------------------------
+# Format detection
+# ---------------------------------------------------------------------------
+
+_EMAIL_HEADER = re.compile(
+    rb"^(Return-Path|Received|From|MIME-Version|Message-ID|Delivered-To|Date|Subject):",
+    re.IGNORECASE,
+)
+
+
+def _sniff_kind(path: Path) -> str | None:
+    """Guess the format from the file's first SNIFF_BYTES, or None."""
+    with path.open("rb") as fh:
+        head = fh.read(SNIFF_BYTES)
+
+    if head.startswith(b"%PDF-"):
+        return "pdf"
+    if head.startswith(b"PK\x03\x04"):
+        try:
+            with zipfile.ZipFile(path) as zf:
+                if "word/document.xml" in zf.namelist():
+                    return "docx"
+        except zipfile.BadZipFile:
+            pass
+        return None
+
+    lowered = head.lstrip(b"\xef\xbb\xbf \t\r\n").lower()
+    if lowered.startswith((b"<!doctype html", b"<html")):
+        return "html"
+    if _EMAIL_HEADER.match(lowered.lstrip()) and b"\n" in lowered:
+        return "eml"
+    return None
+
+
+def detect_kind(path: Path) -> str | None:
+    """
+    Return the registered kind for path, or None if unsupported.
+    Sniffed content wins over the suffix, except for plain text files —
+    a note that happens to start with "Subject:" is still a note.
+    """
+    by_suffix = SUFFIX_KINDS.get(path.suffix.lower())
+    if by_suffix is None:
+        return None
+    if by_suffix == "text":
+        return "text"
+    try:
+        sniffed = _sniff_kind(path)
+    except OSError:
+        sniffed = None
+    return sniffed if sniffed in EXTRACTORS else by_suffix
+
+
+def extract(path: str, kind: str) -> str:
+    """Run the extractor for kind on path. Entry point for the process pool."""
+    return EXTRACTORS[kind](Path(path)).strip()
+
+
+# ---------------------------------------------------------------------------
+# Extractors
+# ---------------------------------------------------------------------------
+
+@register("text", ".md", ".txt")
+def extract_text(path: Path) -> str:
+    return path.read_text(encoding="utf-8", errors="replace")
+
+
+class _HTMLText(HTMLParser):
+    """Collect visible text; block-level tags become line breaks."""
+
+    _SKIP  = {"script", "style", "noscript", "template", "svg", "head"}
+    _BLOCK = {
+        "p", "div", "br", "li", "tr", "section", "article", "header", "footer",
+        "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "table",
+    }
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._chunks: list[str] = []
+        self._skip_depth = 0
+
+    def handle_starttag(self, tag: str, attrs) -> None:
+        if tag in self._SKIP:
+            self._skip_depth += 1
+        elif tag in self._BLOCK:
+            self._chunks.append("\n")
+        if tag in {"h1", "h2", "h3"} and not self._skip_depth:
+            self._chunks.append("#" * int(tag[1]) + " ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in self._SKIP and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self._BLOCK:
+            self._chunks.append("\n")
+
+    def handle_data(self, data: str) -> None:
+        if not self._skip_depth:
+            self._chunks.append(data)
+
+    def text(self) -> str:
+        joined = "".join(self._chunks)
+        joined = re.sub(r"[ \t\r\f\v]+", " ", joined)
+        return re.sub(r"\n\s*\n\s*", "\n\n", joined).strip()
+
+
+def _html_to_text(markup: str) -> str:
+    parser = _HTMLText()
+    parser.feed(markup)
+    parser.close()
+    return parser.text()
+
+
+@register("html", ".html", ".htm")
+def extract_html(path: Path) -> str:
+    return _html_to_text(path.read_text(encoding="utf-8", errors="replace"))
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+
+
+@register("docx", ".docx")
+def extract_docx(path: Path) -> str:
+    """Paragraph text from word/document.xml; headings keep a markdown marker."""
+    try:
+        with zipfile.ZipFile(path) as zf:
+            root = ElementTree.fromstring(zf.read("word/document.xml"))
+    except (zipfile.BadZipFile, KeyError, ElementTree.ParseError) as exc:
+        raise ExtractionError(f"not a readable .docx: {exc}") from exc
+
+    paragraphs: list[str] = []
+    for para in root.iter(f"{_W}p"):
+        text = "".join(node.text or "" for node in para.iter(f"{_W}t")).strip()
+        if not text:
+            continue
+        style = para.find(f"{_W}pPr/{_W}pStyle")
+        level = (style.get(f"{_W}val", "") if style is not None else "").lower()
+        if level.startswith("heading") and level[-1:].isdigit():
+            text = "#" * min(int(level[-1]), 6) + " " + text
+        paragraphs.append(text)
+    return "\n\n".join(paragraphs)
+
+
+@register("eml", ".eml")
+def extract_eml(path: Path) -> str:
+    """Key headers plus the plain-text body (HTML body converted if that's all there is)."""
+    with path.open("rb") as fh:
+        msg = email.message_from_binary_file(fh, policy=policy.default)
+
+    headers = [
+        f"**{name}:** {msg[name]}"
+        for name in ("From", "To", "Date", "Subject")
+        if msg[name]
+    ]
+    body_part = msg.get_body(preferencelist=("plain", "html"))
+    body = ""
+    if body_part is not None:
+        body = body_part.get_content()
+        if body_part.get_content_type() == "text/html":
+            body = _html_to_text(body)
+    return "\n".join(headers) + "\n\n" + body
+
+
+@register("pdf", ".pdf")
+def extract_pdf(path: Path) -> str:
+    if pypdf is None:
+        raise ExtractionError("PDF support needs pypdf — run uv sync")
+    try:
+        reader = pypdf.PdfReader(str(path))
+        pages = [page.extract_text() or "" for page in reader.pages]
+    except Exception as exc:
+        raise ExtractionError(f"pypdf could not read the file: {exc}") from exc
+    return "\n\n".join(page.strip() for page in pages if page.strip())
@@ -1,21 +1,62 @@
 """
 File Drop Watcher — Perception Layer
 Monitors /Drop_Here/ in the Obsidian vault and creates action files
-in /Needs_Action/ for any .md or .txt file dropped there.
+in /Needs_Action/ for any note or document dropped there.
+
+Plain .md / .txt notes are read directly. Other formats (HTML saves, .docx,
+.eml, PDF) go through the extractor registry in extractors.py: the format
+is sniffed from the file's first bytes, parsing runs in a small process
+pool so the watcher stays responsive, and the extracted text is cached by
+the original's SHA-256 so dropping the same document again is instant.
+
+The watchdog thread only queues events. A dispatcher thread debounces them
+into bursts (files dropped together) and hands each burst to a small worker
+pool, so dropping hundreds of notes at once never blocks the observer.
+With DROP_MERGE_BURSTS=true, a multi-file burst becomes one combined
+action file instead of one per file.
+
+Files larger than the part budget (DROP_PART_BUDGET_KB) are never loaded
+whole: they are scanned through mmap and split on heading / paragraph
+boundaries into numbered, linked action files that each record the byte
+range and hash of the original they came from.
+
+Drop_Here is also swept on startup, so files dropped while the watcher was
+down are not stranded, and rescanned every RECONCILE_INTERVAL in case the
+observer missed an event. For vaults on network or sync-managed drives,
+where inotify/FSEvents are unreliable, DROP_WATCH_MODE=polling replaces the
+observer with an incremental snapshot diff every DROP_POLL_INTERVAL seconds.
+
+Originals are archived content-addressed: each unique file is stored once
+as Done/originals/blobs/<sha[:2]>/<sha256><suffix>, and index.json maps each
+hash to its blob, the names it was dropped under and the action files it
+produced. A drop whose content is already in the store is recognised on
+arrival, logged against the earlier drop and skipped.
 """
 
+import hashlib
+import json
 import logging
-import shutil
+import mmap
+import queue
+import sys
+import threading
 import time
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from datetime import datetime, timezone
 from pathlib import Path
 
 from dotenv import load_dotenv
-from watchdog.events import FileCreatedEvent, FileSystemEventHandler
+from watchdog.events import FileCreatedEvent, FileMovedEvent, FileSystemEventHandler
 from watchdog.observers import Observer
+from watchdog.observers.api import BaseObserver
 
 import os
 
+import extractors
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # src/ — shared vault modules
+import vault_io  # noqa: E402
+
 # ---------------------------------------------------------------------------
 # Setup
 # ---------------------------------------------------------------------------
@@ -26,8 +67,30 @@ VAULT_PATH = Path(os.environ["VAULT_PATH"])
 DROP_HERE = VAULT_PATH / "Drop_Here"
 NEEDS_ACTION = VAULT_PATH / "Needs_Action"
 DONE_ORIGINALS = VAULT_PATH / "Done" / "originals"
+ORIGINALS_BLOBS = DONE_ORIGINALS / "blobs"         # <sha[:2]>/<sha256><suffix>, one per unique content
+ORIGINALS_INDEX = DONE_ORIGINALS / "index.json"    # sha256 → blob path + every name it was dropped as
+
+ALLOWED_SUFFIXES = set(extractors.SUFFIX_KINDS)  # .md/.txt plus every registered extractor
+
+DEBOUNCE_SECONDS = 0.5  # quiet period that ends a burst (also lets writes finish)
+BATCH_MAX = 50          # flush a burst early once it reaches this many files
+DROP_WORKERS = 4        # threads writing action files / moving originals
 
-ALLOWED_SUFFIXES = {".md", ".txt"}
+MERGE_BURSTS = os.environ.get("DROP_MERGE_BURSTS", "false").lower() == "true"
+
+PART_BUDGET_KB = int(os.environ.get("DROP_PART_BUDGET_KB", "32"))
+PART_BUDGET_BYTES = max(PART_BUDGET_KB, 1) * 1024  # raw content per action file (at least 1 KB)
+MAX_PARTS = int(os.environ.get("DROP_MAX_PARTS", "20"))  # parts beyond this are left in the original
+MMAP_THRESHOLD = 1024 * 1024  # files above this are scanned via mmap instead of read()
+
+WATCH_MODE = os.environ.get("DROP_WATCH_MODE", "events").lower()  # "events" or "polling"
+POLL_INTERVAL = float(os.environ.get("DROP_POLL_INTERVAL", "5"))   # seconds between scans in polling mode
+RECONCILE_INTERVAL = 300                # full rescan that catches anything the observer missed
+MTIME_GRANULARITY_NS = 2_000_000_000    # coarsest directory mtime resolution we expect (FAT/SMB)
+
+EXTRACT_WORKERS = 2        # processes parsing PDF / .docx / HTML / .eml drops
+EXTRACT_TIMEOUT = 120      # seconds before a single extraction is given up on
+EXTRACT_CACHE_DIR = Path("secrets/extract_cache")  # <sha256>.txt per extracted original
 
 logging.basicConfig(
     level=logging.INFO,
@@ -37,12 +100,157 @@ logging.basicConfig(
 log = logging.getLogger("file_drop_watcher")
 
 
+# ---------------------------------------------------------------------------
+# Large-file reader
+# ---------------------------------------------------------------------------
+
+# Preferred split points, best first: before a markdown heading, at a blank
+# line between paragraphs, at any line break.
+_SPLIT_SEPARATORS = (b"\n#", b"\n\n", b"\n")
+
+
+def _split_ranges(buf, size: int, budget: int, limit: int) -> list[tuple[int, int]]:
+    """
+    Return up to limit (start, end) byte ranges covering buf[0:size] from the
+    front, each at most budget bytes. buf is bytes or an mmap — only rfind() and indexing are used, so
+    nothing is copied. Cuts land on the best separator in the back half of
+    the window; failing that, on a UTF-8 character boundary.
+    """
+    ranges: list[tuple[int, int]] = []
+    start = 0
+    while start < size and len(ranges) < limit:
+        end = min(start + budget, size)
+        if end < size:
+            floor = start + budget // 2  # never cut a part down to a sliver
+            cut = -1
+            for sep in _SPLIT_SEPARATORS:
+                pos = buf.rfind(sep, floor, end)
+                if pos != -1:
+                    cut = pos + 1  # the newline stays with this part
+                    break
+            if cut == -1:
+                cut = end
+                while cut > start and (buf[cut] & 0xC0) == 0x80:  # UTF-8 continuation byte
+                    cut -= 1
+            end = cut
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def _read_parts(path: Path, size: int) -> list[tuple[int, int, str]]:
+    """
+    Return [(start, end, text), ...] for path, split into at most MAX_PARTS
+    parts of PART_BUDGET_BYTES. Files above MMAP_THRESHOLD are mapped, so
+    only one part at a time is decoded into memory.
+    """
+    with path.open("rb") as fh:
+        if size > MMAP_THRESHOLD:
+            buf = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        else:
+            buf = fh.read()
+        try:
+            ranges = _split_ranges(buf, size, PART_BUDGET_BYTES, MAX_PARTS)
+            parts = [
+                (start, end, bytes(buf[start:end]).decode("utf-8", errors="replace").strip())
+                for start, end in ranges
+            ]
+        finally:
+            if isinstance(buf, mmap.mmap):
+                buf.close()
+    return parts
+
+
+# ---------------------------------------------------------------------------
+# Document extraction
+# ---------------------------------------------------------------------------
+
+_extract_pool: ProcessPoolExecutor | None = None  # started in main(); inline when None
+_extract_pool_lock = threading.Lock()
+
+
+def _recycle_extract_pool(stuck: ProcessPoolExecutor) -> None:
+    """
+    Replace stuck — a pool whose worker overran EXTRACT_TIMEOUT — with a
+    fresh one. A timed-out future cannot be cancelled once it is running,
+    so the workers are terminated; other extractions in flight on it fail
+    and their drops are left in Drop_Here like any other failure.
+    """
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is not stuck:
+            return  # another thread already replaced it
+        _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    # ProcessPoolExecutor has no public way to kill a running task. Since
+    # CPython 3.2 its workers are in _processes, a {pid: Process} dict (None
+    # after shutdown); if that changes, the hung worker is left to finish.
+    processes = getattr(stuck, "_processes", None)
+    if isinstance(processes, dict):
+        for proc in list(processes.values()):
+            proc.terminate()
+    else:
+        log.warning("Cannot reach the extraction workers — the hung one runs until it finishes")
+    stuck.shutdown(wait=False, cancel_futures=True)
+    log.warning("Extraction overran %ds — restarted the extraction workers", EXTRACT_TIMEOUT)
+
+
+def _file_sha256(path: Path) -> str:
+    """SHA-256 of path, read in 1 MB chunks."""
+    h = hashlib.sha256()
+    with path.open("rb") as fh:
+        for chunk in iter(lambda: fh.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _extract_to_cache(src: Path, kind: str, digest: str) -> Path:
+    """
+    Return a path holding src's extracted text. Text is cached under
+    EXTRACT_CACHE_DIR keyed by the original's hash (digest), so only the
+    first drop of a given document pays for parsing.
+    """
+    cached = EXTRACT_CACHE_DIR / f"{digest}.txt"
+    if cached.exists():
+        log.info("Extraction cache hit: %s (%s)", src.name, digest[:12])
+        return cached
+
+    started = time.monotonic()
+    pool = _extract_pool
+    if pool is None:
+        text = extractors.extract(str(src), kind)
+    else:
+        future = pool.submit(extractors.extract, str(src), kind)
+        try:
+            text = future.result(timeout=EXTRACT_TIMEOUT)
+        except TimeoutError:
+            _recycle_extract_pool(pool)
+            raise
+
+    EXTRACT_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    tmp = cached.with_name(f"{digest}.{threading.get_ident()}.tmp")
+    tmp.write_text(text, encoding="utf-8")
+    tmp.replace(cached)
+
+    log.info(
+        "Extracted %s (%s): %s chars in %.2fs",
+        src.name, kind, f"{len(text):,}", time.monotonic() - started,
+    )
+    return cached
+
+
 # ---------------------------------------------------------------------------
 # Action file builder
 # ---------------------------------------------------------------------------
 
-def _build_action_file(original_path: Path) -> tuple[str, str]:
-    """Return (filename, content) for the new action file."""
+def _build_action_file(
+    original_path: Path,
+    content_path: Path | None = None,
+    kind: str = "text",
+) -> tuple[str, str]:
+    """
+    Return (filename, content) for the new action file. content_path is the
+    extracted text for non-text drops; plain notes are read directly.
+    """
     now = datetime.now(timezone.utc)
     timestamp_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
     timestamp_short = now.strftime("%Y%m%d_%H%M")
@@ -50,12 +258,13 @@ def _build_action_file(original_path: Path) -> tuple[str, str]:
     stem = original_path.stem
     action_filename = f"DROP_{stem}_{timestamp_short}.md"
 
-    raw_content = original_path.read_text(encoding="utf-8")
+    raw_content = (content_path or original_path).read_text(encoding="utf-8")
 
     content = f"""---
 type: thought_drop
 source: file_drop
 original_file: {original_path.name}
+original_format: {kind}
 created: {timestamp_iso}
 status: pending
 ---
@@ -74,85 +283,686 @@ Save the approval request to /Pending_Approval/ and wait for human approval.
     return action_filename, content
 
 
+def _build_part_action_files(
+    original_path: Path,
+    archived_as: Path,
+    size: int,
+    original_sha256: str,
+    content_path: Path | None = None,
+    kind: str = "text",
+) -> list[tuple[str, str]]:
+    """
+    Return [(filename, content), ...] for an oversized drop, one per part.
+    Parts link to their neighbours with Obsidian wikilinks and carry the
+    original's name, archive path, SHA-256 and their own byte range.
+    For extracted documents, size and byte_range refer to the extracted
+    text in content_path; original_sha256 is still the original file's,
+    as already computed when the drop was claimed.
+    """
+    now = datetime.now(timezone.utc)
+    timestamp_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    timestamp_short = now.strftime("%Y%m%d_%H%M")
+
+    parts = _read_parts(content_path or original_path, size)
+    digest = original_sha256
+    total = len(parts)
+    covered = parts[-1][1] if parts else 0
+    stem = original_path.stem
+    # The hash keeps part names unique (parts link to each other by name, so
+    # they must not be renamed on a collision) — each content is split once
+    names = [f"DROP_{stem}_{timestamp_short}_{digest[:8]}_part{i:02d}of{total:02d}" for i in range(1, total + 1)]
+    archive_link = archived_as.relative_to(VAULT_PATH).as_posix()
+
+    files = []
+    for i, (start, end, raw_content) in enumerate(parts, start=1):
+        nav = []
+        if i > 1:
+            nav.append(f"← Previous: [[{names[i - 2]}]]")
+        if i < total:
+            nav.append(f"Next: [[{names[i]}]] →")
+        if i == total and covered < size:
+            nav.append(
+                f"⚠️ The last {size - covered:,} bytes exceed the {MAX_PARTS}-part limit "
+                f"and were not queued — see the original."
+            )
+
+        content = f"""---
+type: thought_drop
+source: file_drop
+original_file: {original_path.name}
+original_path: {archive_link}
+original_format: {kind}
+original_sha256: {digest}
+original_size: {size}
+part: {i}
+parts: {total}
+byte_range: {start}-{end}
+created: {timestamp_iso}
+status: pending
+---
+
+## Raw Content (part {i} of {total})
+
+{" | ".join(nav)}
+
+{raw_content}
+
+## Instructions for Claude
+
+This is part {i} of {total} of a large dropped file ({original_path.name}).
+Read only the raw content above. If it contains a self-contained, post-worthy idea, use the
+draft_linkedin_post skill to create a polished LinkedIn post from it; otherwise note in your plan
+that this part has nothing to draft and move on.
+Read /Company_Handbook.md for tone and identity rules.
+Save any approval request to /Pending_Approval/ and wait for human approval.
+"""
+        files.append((f"{names[i - 1]}.md", content))
+
+    return files
+
+
+def _build_combined_action_file(original_paths: list[Path]) -> tuple[str, str]:
+    """Return (filename, content) for one action file covering a burst of drops."""
+    now = datetime.now(timezone.utc)
+    timestamp_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
+    timestamp_long = now.strftime("%Y%m%d_%H%M%S_%f")  # bursts split by BATCH_MAX can share a second
+
+    action_filename = f"DROP_BATCH_{timestamp_long}_{len(original_paths)}files.md"
+
+    sections = []
+    for path in original_paths:
+        raw_content = path.read_text(encoding="utf-8")
+        sections.append(f"### {path.name}\n\n{raw_content}")
+    names = ", ".join(path.name for path in original_paths)
+    body = "\n\n".join(sections)
+
+    content = f"""---
+type: thought_drop
+source: file_drop
+original_file: "{names}"
+file_count: {len(original_paths)}
+created: {timestamp_iso}
+status: pending
+---
+
+## Raw Content
+
+These {len(original_paths)} files were dropped together and are treated as related material.
+
+{body}
+
+## Instructions for Claude
+
+Read the raw content above. The files were dropped together — treat them as one body of related notes.
+Use the draft_linkedin_post skill to create a single polished LinkedIn post from them.
+If they clearly cover unrelated ideas, draft one post per idea instead.
+Read /Company_Handbook.md for tone and identity rules.
+Save the approval request(s) to /Pending_Approval/ and wait for human approval.
+"""
+
+    return action_filename, content
+
+
 # ---------------------------------------------------------------------------
-# Watchdog event handler
+# Content-addressed originals store
 # ---------------------------------------------------------------------------
 
-class DropHandler(FileSystemEventHandler):
-    def __init__(self) -> None:
-        super().__init__()
-        self._processed: set[str] = set()
+# sha256 → {"blob": vault-relative path, "size": int, "drops": [{name, at, actions}, ...]}
+# The first drop is the one that was processed; later drops are duplicates
+# that were skipped. "blob" is None while the first drop is still in flight.
+_originals: dict[str, dict] = {}
+_originals_lock = threading.Lock()
 
-    def on_created(self, event: FileCreatedEvent) -> None:
-        if event.is_directory:
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _load_originals_index() -> None:
+    """Load Done/originals/index.json into _originals."""
+    global _originals
+    try:
+        index = json.loads(ORIGINALS_INDEX.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        index = {}
+    except (OSError, json.JSONDecodeError) as exc:
+        log.warning("Could not read %s (%s) — starting a fresh index", ORIGINALS_INDEX, exc)
+        index = {}
+    # An entry without a blob was in flight when the watcher stopped
+    _originals = {digest: entry for digest, entry in index.items() if entry.get("blob")}
+
+
+def _save_originals_index() -> None:
+    """Write the index atomically. Caller holds _originals_lock."""
+    tmp = ORIGINALS_INDEX.with_suffix(".json.tmp")
+    tmp.write_text(json.dumps(_originals, indent=2), encoding="utf-8")
+    tmp.replace(ORIGINALS_INDEX)
+
+
+def _index_legacy_originals() -> None:
+    """
+    Hash files archived flat in Done/originals/ before the blob store
+    existed and index them where they are, so re-dropping old notes is
+    caught too. Existing action files keep pointing at valid paths.
+    """
+    with _originals_lock:
+        known = {entry["blob"] for entry in _originals.values()}
+        known.update(
+            drop["archived"]
+            for entry in _originals.values()
+            for drop in entry["drops"]
+            if drop.get("archived")
+        )
+
+    added = 0
+    for path in sorted(DONE_ORIGINALS.iterdir()):
+        if not path.is_file() or path.suffix in {".json", ".tmp"}:
+            continue
+        rel = path.relative_to(VAULT_PATH).as_posix()
+        if rel in known:
+            continue
+        digest = _file_sha256(path)
+        stat = path.stat()
+        dropped = datetime.fromtimestamp(stat.st_mtime, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+        with _originals_lock:
+            entry = _originals.setdefault(digest, {"blob": rel, "size": stat.st_size, "drops": []})
+            entry["drops"].append({"name": path.name, "at": dropped, "actions": [], "archived": rel})
+        added += 1
+
+    if added:
+        with _originals_lock:
+            _save_originals_index()
+        log.info("Indexed %d previously archived original(s) for duplicate detection", added)
+
+
+def _claim_original(digest: str, name: str) -> dict | None:
+    """
+    Reserve digest for a new drop and return None, or — if this content was
+    dropped before (or is being processed right now) — record this drop
+    against the existing entry and return it. A successful claim must be
+    followed by _commit_original() or _release_original().
+    """
+    with _originals_lock:
+        entry = _originals.get(digest)
+        if entry is None:
+            _originals[digest] = {
+                "blob": None,
+                "size": None,
+                "drops": [{"name": name, "at": _now_iso(), "actions": []}],
+            }
+            return None
+        entry["drops"].append({"name": name, "at": _now_iso(), "actions": []})
+        if entry["blob"]:
+            _save_originals_index()
+        return entry
+
+
+def _commit_original(digest: str, blob: Path, size: int, actions: list[str]) -> None:
+    """Mark a claimed drop as processed: its blob is stored and its action files written."""
+    with _originals_lock:
+        entry = _originals[digest]
+        entry["blob"] = blob.relative_to(VAULT_PATH).as_posix()
+        entry["size"] = size
+        entry["drops"][0]["actions"] = actions
+        _save_originals_index()
+
+
+def _release_original(digest: str) -> None:
+    """Drop a claim whose processing failed, so the content can be re-dropped."""
+    with _originals_lock:
+        entry = _originals.get(digest)
+        if entry is not None and entry["blob"] is None:
+            del _originals[digest]
+
+
+def _blob_path(digest: str, suffix: str) -> Path:
+    """Done/originals/blobs/ab/abcdef….ext — sharded so no folder grows huge."""
+    return ORIGINALS_BLOBS / digest[:2] / f"{digest}{suffix.lower()}"
+
+
+def _archive_original(src: Path, blob: Path) -> Path:
+    """
+    Move a processed drop into the blob store (or discard it if the blob
+    exists) and return the blob path that holds its content.
+    """
+    if blob.exists():
+        src.unlink()
+        return blob
+    stored = vault_io.move(src, blob.parent, blob.name)
+    if stored != blob:
+        # The blob appeared after the check; blobs are content-addressed, so
+        # the copy under the de-duplicated name is redundant
+        stored.unlink()
+    return blob
+
+
+def _skip_duplicate(src: Path, entry: dict) -> None:
+    """Remove a duplicate drop — its content is already in the store — and say where it went."""
+    first = entry["drops"][0]
+    if first["actions"]:
+        actions = ", ".join(first["actions"])
+    else:
+        actions = entry["blob"] or "still being processed"
+    log.info(
+        "Duplicate drop skipped: %s has the same content as %s (dropped %s → %s)",
+        src.name, first["name"], first["at"], actions,
+    )
+    src.unlink(missing_ok=True)
+
+
+# ---------------------------------------------------------------------------
+# Drop processing
+# ---------------------------------------------------------------------------
+
+def _process_large_drop(
+    src: Path,
+    size: int,
+    blob: Path,
+    content_path: Path,
+    kind: str,
+    digest: str,
+) -> list[str]:
+    """Write linked part action files for an oversized drop; return their names."""
+    files = _build_part_action_files(src, blob, size, digest, content_path, kind)
+    with vault_io.batch():
+        written = [vault_io.create(NEEDS_ACTION, action_filename, content) for action_filename, content in files]
+
+    log.info(
+        "Created %d part action file(s) for %s (%s bytes)",
+        len(files), src.name, f"{size:,}",
+    )
+    return [path.name for path in written]
+
+
+def _process_drop(src: Path) -> None:
+    """Write the action file for one dropped file and archive the original."""
+    # File may already be gone if a duplicate event beat us here
+    if not src.exists():
+        return
+
+    kind = extractors.detect_kind(src)
+    if kind is None:
+        log.info("Ignored (unsupported format): %s", src.name)
+        return
+
+    try:
+        digest = _file_sha256(src)
+    except FileNotFoundError:
+        return
+    except OSError as exc:
+        # e.g. still locked by the program saving it (Windows) — re-drop to retry
+        log.error("Could not read %s: %s — left in Drop_Here", src.name, exc)
+        return
+    duplicate = _claim_original(digest, src.name)
+    if duplicate is not None:
+        _skip_duplicate(src, duplicate)
+        return
+
+    content_path = src
+    if kind != "text":
+        try:
+            content_path = _extract_to_cache(src, kind, digest)
+        except Exception as exc:
+            # Leave it in Drop_Here so it can be fixed (or the env synced) and re-dropped
+            _release_original(digest)
+            log.error("Could not extract text from %s (%s): %s", src.name, kind, exc or type(exc).__name__)
             return
 
-        src = Path(event.src_path)
+    try:
+        original_size = src.stat().st_size
+        blob = _blob_path(digest, src.suffix)
+        size = content_path.stat().st_size
+        if size > PART_BUDGET_BYTES:
+            actions = _process_large_drop(src, size, blob, content_path, kind, digest)
+        else:
+            action_filename, content = _build_action_file(src, content_path, kind)
 
-        if src.suffix.lower() not in ALLOWED_SUFFIXES:
-            log.info("Ignored (not .md/.txt): %s", src.name)
+            # Write action file
+            action_path = vault_io.create(NEEDS_ACTION, action_filename, content)
+            actions = [action_path.name]
+
+            log.info("Created action file: %s", action_path.name)
+
+        stored = _archive_original(src, blob)
+        _commit_original(digest, stored, original_size, actions)
+
+    except Exception:
+        _release_original(digest)
+        log.exception("Error processing dropped file: %s", src.name)
+
+
+def _process_burst(paths: list[Path]) -> None:
+    """Write one combined action file for a burst of drops and archive them all."""
+    claimed: list[tuple[Path, str]] = []
+    try:
+        paths = [p for p in paths if p.exists()]
+
+        # Only plain notes are merged; documents need extraction and go on their own
+        documents = [p for p in paths if extractors.detect_kind(p) != "text"]
+        for path in documents:
+            _process_drop(path)
+        paths = [p for p in paths if p not in documents]
+
+        if len(paths) < 2 or sum(p.stat().st_size for p in paths) > PART_BUDGET_BYTES:
+            # Single file, or too big to merge — handle each file on its own
+            for path in paths:
+                _process_drop(path)
             return
 
-        # Deduplicate: watchdog fires created + modified for the same file
-        if event.src_path in self._processed:
+        for path in paths:
+            digest = _file_sha256(path)
+            duplicate = _claim_original(digest, path.name)
+            if duplicate is None:
+                claimed.append((path, digest))
+            else:
+                _skip_duplicate(path, duplicate)
+
+        if len(claimed) < 2:
+            for path, digest in claimed:
+                _release_original(digest)
+                _process_drop(path)
             return
-        self._processed.add(event.src_path)
 
-        # Give the OS time to finish writing the file
-        time.sleep(0.5)
+        action_filename, content = _build_combined_action_file([path for path, _ in claimed])
+
+        action_path = vault_io.create(NEEDS_ACTION, action_filename, content)
+
+        with vault_io.batch():
+            for path, digest in claimed:
+                size = path.stat().st_size
+                blob = _blob_path(digest, path.suffix)
+                stored = _archive_original(path, blob)
+                _commit_original(digest, stored, size, [action_path.name])
+
+        log.info("Created combined action file: %s (%d files)", action_path.name, len(claimed))
+
+    except Exception:
+        for _, digest in claimed:
+            _release_original(digest)  # no-op for originals already committed
+        log.exception("Error processing burst of %d dropped files", len(paths))
+
+
+def _log_failure(future: Future) -> None:
+    """Done-callback for pool work: an exception that escaped a worker is logged, not lost."""
+    if not future.cancelled() and future.exception() is not None:
+        log.error("Drop worker failed", exc_info=future.exception())
+
+
+class DropBatcher:
+    """
+    Debounced work queue between the watchdog thread and the worker pool.
+
+    submit() only enqueues. A dispatcher thread groups paths that arrive
+    within DEBOUNCE_SECONDS of each other (up to BATCH_MAX) into a burst,
+    then hands the burst to the pool — file by file, or as one combined
+    action file when merge is on.
+    """
+
+    def __init__(self, *, merge: bool) -> None:
+        self._merge = merge
+        self._queue: queue.Queue[tuple[Path, float] | None] = queue.Queue()
+        self._pool = ThreadPoolExecutor(max_workers=DROP_WORKERS, thread_name_prefix="drop")
+        self._thread = threading.Thread(target=self._run, name="drop-dispatcher", daemon=True)
+        self._thread.start()
+
+    def submit(self, path: Path) -> None:
+        self._queue.put((path, time.monotonic()))
+
+    def stop(self) -> None:
+        """Flush anything queued, then wait for in-flight work to finish."""
+        self._queue.put(None)
+        self._thread.join()
+        self._pool.shutdown(wait=True)
+
+    def _run(self) -> None:
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            burst = [first]
+            stopping = False
+            while len(burst) < BATCH_MAX:
+                try:
+                    item = self._queue.get(timeout=DEBOUNCE_SECONDS)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                burst.append(item)
+
+            self._dispatch(burst)
+            if stopping:
+                return
+
+    def _dispatch(self, burst: list[tuple[Path, float]]) -> None:
+        # A burst cut short by BATCH_MAX may contain files that arrived
+        # moments ago — give the newest one the full settle time first.
+        newest = max(arrived for _, arrived in burst)
+        delay = newest + DEBOUNCE_SECONDS - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+
+        paths = [path for path, _ in burst]
+        if len(paths) > 1:
+            log.info("Burst of %d dropped file(s) queued", len(paths))
+        if self._merge and len(paths) > 1:
+            self._pool.submit(_process_burst, paths).add_done_callback(_log_failure)
+        else:
+            for path in paths:
+                self._pool.submit(_process_drop, path).add_done_callback(_log_failure)
 
-        # File may already be gone if a duplicate event beat us here
-        if not src.exists():
-            return
 
+# ---------------------------------------------------------------------------
+# Drop_Here snapshot (startup sweep, reconciliation, polling mode)
+# ---------------------------------------------------------------------------
+
+def _is_candidate(name: str) -> bool:
+    """A finished, supported file — not a hidden or sync-tool temp file."""
+    return not name.startswith((".", "~")) and Path(name).suffix.lower() in ALLOWED_SUFFIXES
+
+
+class DropScanner:
+    """
+    Incremental snapshot of Drop_Here, shared by every way a file can be
+    noticed: watchdog events, the startup sweep, periodic reconciliation
+    and polling mode. A file is handed to the batcher once per (name, size,
+    mtime), so the same drop seen by two paths is queued once, while a new
+    file re-using an old name is still picked up.
+
+    scan() costs one stat() while the folder is unchanged. The folder is only
+    listed when its mtime moves, and only names not already in the snapshot
+    are stat()ed — so work scales with what changed, not with how many
+    (e.g. unparseable) files sit in the folder.
+    """
+
+    def __init__(self, batcher: DropBatcher, *, settle: bool) -> None:
+        self._batcher = batcher
+        self._settle = settle  # polling: queue a file only once two scans agree on it
+        self._lock = threading.Lock()
+        self._queued: dict[str, tuple[int, int]] = {}   # name → (size, mtime_ns) when queued
+        self._pending: dict[str, tuple[int, int]] = {}  # name → (size, mtime_ns) awaiting settle
+        self._dir_mtime_ns: int | None = None
+
+    def offer(self, path: Path) -> bool:
+        """Queue path unless this exact file was queued already. Returns True if queued."""
         try:
-            action_filename, content = _build_action_file(src)
+            st = path.stat()
+        except FileNotFoundError:
+            return False
+        return self._queue(path.name, (st.st_size, st.st_mtime_ns))
+
+    def _queue(self, name: str, signature: tuple[int, int]) -> bool:
+        with self._lock:
+            if self._queued.get(name) == signature:
+                return False
+            self._queued[name] = signature
+            self._pending.pop(name, None)
+        self._batcher.submit(DROP_HERE / name)
+        return True
+
+    def scan(self, *, force: bool = False) -> int:
+        """Diff Drop_Here against the snapshot and queue new files. Returns how many were queued."""
+        try:
+            dir_mtime_ns = DROP_HERE.stat().st_mtime_ns
+        except FileNotFoundError:
+            return 0
+        if not force and not self._pending and dir_mtime_ns == self._dir_mtime_ns:
+            return 0
+        # Network and sync-managed drives often keep coarse mtimes: a change in
+        # the same tick as this scan wouldn't move it again, so don't trust
+        # an mtime that recent and look again next time.
+        recent = time.time_ns() - dir_mtime_ns < MTIME_GRANULARITY_NS
+        self._dir_mtime_ns = None if recent else dir_mtime_ns
+
+        present: set[str] = set()
+        fresh: list[tuple[str, tuple[int, int]]] = []
+        with os.scandir(DROP_HERE) as entries:
+            for entry in entries:
+                if not _is_candidate(entry.name) or not entry.is_file(follow_symlinks=False):
+                    continue
+                present.add(entry.name)
+                with self._lock:
+                    known = entry.name in self._queued and entry.name not in self._pending
+                if known and not force:
+                    continue
+                try:
+                    st = entry.stat(follow_symlinks=False)
+                except FileNotFoundError:
+                    continue
+                fresh.append((entry.name, (st.st_size, st.st_mtime_ns)))
+
+        with self._lock:
+            for name in set(self._queued) - present:
+                del self._queued[name]
+            for name in set(self._pending) - present:
+                del self._pending[name]
+
+        queued = 0
+        for name, signature in fresh:
+            if self._settle and self._pending.get(name) != signature and self._queued.get(name) != signature:
+                self._pending[name] = signature  # still being written / synced
+                continue
+            queued += self._queue(name, signature)
+        return queued
 
-            # Write action file
-            action_path = NEEDS_ACTION / action_filename
-            action_path.write_text(content, encoding="utf-8")
 
-            # Move original to Done/originals/
-            dest = DONE_ORIGINALS / src.name
-            # Avoid collisions if a file with the same name was already archived
-            if dest.exists():
-                ts = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-                dest = DONE_ORIGINALS / f"{src.stem}_{ts}{src.suffix}"
-            shutil.move(str(src), str(dest))
+# ---------------------------------------------------------------------------
+# Watchdog event handler
+# ---------------------------------------------------------------------------
+
+class DropHandler(FileSystemEventHandler):
+    def __init__(self, scanner: DropScanner) -> None:
+        super().__init__()
+        self._scanner = scanner
+
+    def on_created(self, event: FileCreatedEvent) -> None:
+        if event.is_directory:
+            return
+        self._offer(Path(event.src_path))
+
+    def on_moved(self, event: FileMovedEvent) -> None:
+        # Sync clients and browsers write a temp file, then rename it into place
+        if event.is_directory or Path(event.dest_path).parent != DROP_HERE:
+            return
+        self._offer(Path(event.dest_path))
 
-            log.info("Created action file: %s", action_filename)
+    def _offer(self, src: Path) -> None:
+        if src.suffix.lower() not in ALLOWED_SUFFIXES:
+            log.info("Ignored (unsupported format): %s", src.name)
+            return
+        if not _is_candidate(src.name):
+            return
 
-        except Exception:
-            log.exception("Error processing dropped file: %s", src.name)
+        # Hand off immediately — the debounce window gives the OS time to
+        # finish writing, and the observer thread is never blocked. The
+        # scanner drops repeats (watchdog can fire more than once per file).
+        self._scanner.offer(src)
 
 
 # ---------------------------------------------------------------------------
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def run(stop: threading.Event, observer: BaseObserver | None = None) -> None:
+    """
+    Watch Drop_Here until stop is set. Uses the given (already running)
+    observer if there is one, and otherwise starts its own.
+    """
+    global _extract_pool
+
     # Ensure required folders exist
     NEEDS_ACTION.mkdir(parents=True, exist_ok=True)
     DONE_ORIGINALS.mkdir(parents=True, exist_ok=True)
     DROP_HERE.mkdir(parents=True, exist_ok=True)
 
-    log.info("File Drop Watcher started — watching %s", DROP_HERE)
-
-    handler = DropHandler()
-    observer = Observer()
-    observer.schedule(handler, str(DROP_HERE), recursive=False)
-    observer.start()
-
+    polling = WATCH_MODE == "polling"
+    log.info(
+        "File Drop Watcher started — watching %s (%s, %d workers%s)",
+        DROP_HERE,
+        f"polling every {POLL_INTERVAL:g}s" if polling else "events",
+        DROP_WORKERS,
+        ", merging bursts" if MERGE_BURSTS else "",
+    )
+
+    log.info("Accepted formats: %s", " ".join(sorted(ALLOWED_SUFFIXES)))
+    if PART_BUDGET_KB < 1:
+        log.warning("DROP_PART_BUDGET_KB=%d is below 1 — using 1 KB parts", PART_BUDGET_KB)
+    if extractors.pypdf is None:
+        log.warning("pypdf not installed (run uv sync) — PDF drops will be left in Drop_Here")
+
+    _load_originals_index()
+    _index_legacy_originals()
+    log.info("Originals store: %d unique file(s) indexed", len(_originals))
+
+    _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_WORKERS)
+    batcher = DropBatcher(merge=MERGE_BURSTS)
+    scanner = DropScanner(batcher, settle=polling)
+
+    own_observer = observer is None
+    watch = None
+    if not polling:
+        if own_observer:
+            observer = Observer()
+            observer.start()
+        watch = observer.schedule(DropHandler(scanner), str(DROP_HERE), recursive=False)
+
+    # Catch up on anything dropped while the watcher was down. Runs after the
+    # observer starts, so a file arriving in between is seen by one or both.
+    caught_up = scanner.scan(force=True)
+    if caught_up:
+        log.info("Startup sweep: %d file(s) dropped while the watcher was stopped", caught_up)
+
+    next_reconcile = time.monotonic() + RECONCILE_INTERVAL
     try:
-        while observer.is_alive():
-            time.sleep(1)
+        while not stop.wait(POLL_INTERVAL if polling else 1):
+            if watch is not None and not observer.is_alive():
+                raise RuntimeError("file system observer stopped")
+            if polling:
+                scanner.scan()
+            if time.monotonic() >= next_reconcile:
+                next_reconcile = time.monotonic() + RECONCILE_INTERVAL
+                missed = scanner.scan(force=True)
+                if missed and not polling:
+                    log.warning("Reconciliation queued %d file(s) the watcher had not picked up", missed)
     except KeyboardInterrupt:
         log.info("Shutting down...")
     finally:
-        observer.stop()
-        observer.join()
+        if watch is not None:
+            if own_observer:
+                observer.stop()
+                observer.join()
+            else:
+                observer.unschedule(watch)
+        batcher.stop()
+        _extract_pool.shutdown(wait=True, cancel_futures=True)
         log.info("File Drop Watcher stopped.")
 
 
+def main() -> None:
+    run(threading.Event())
+
+
 if __name__ == "__main__":
     main()
@@ -12,6 +12,7 @@ import json
 import logging
 import os
 import sys
+import threading
 import time
 from datetime import datetime, timezone
 from pathlib import Path
@@ -22,6 +23,9 @@ from google.oauth2.credentials import Credentials
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # src/ — shared vault modules
+import vault_io  # noqa: E402
+
 # ---------------------------------------------------------------------------
 # Setup
 # ---------------------------------------------------------------------------
@@ -262,8 +266,7 @@ def _poll(service, processed_ids: set[str]) -> None:
         now = datetime.now(timezone.utc)
         filename, content = _build_action_file(msg_id, headers, body, now)
 
-        action_path = NEEDS_ACTION / filename
-        action_path.write_text(content, encoding="utf-8")
+        vault_io.create(NEEDS_ACTION, filename, content)
 
         processed_ids.add(msg_id)
         _save_processed_ids(processed_ids)
@@ -277,7 +280,8 @@ def _poll(service, processed_ids: set[str]) -> None:
 # Entry point
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def run(stop: threading.Event) -> None:
+    """Poll the inbox every POLL_INTERVAL seconds until stop is set."""
     NEEDS_ACTION.mkdir(parents=True, exist_ok=True)
     PROCESSED_IDS_PATH.parent.mkdir(parents=True, exist_ok=True)
 
@@ -287,9 +291,13 @@ def main() -> None:
     processed_ids = _load_processed_ids()
     log.info("Gmail Watcher started — polling every 2 minutes")
 
-    while True:
+    while not stop.is_set():
         _poll(service, processed_ids)
-        time.sleep(POLL_INTERVAL)
+        stop.wait(POLL_INTERVAL)
+
+
+def main() -> None:
+    run(threading.Event())
 
 
 if __name__ == "__main__":
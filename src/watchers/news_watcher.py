@@ -4,18 +4,44 @@ Fetches the latest AI/tech news via Tavily and creates action files
 in /Needs_Action/ so Claude Code can draft LinkedIn posts about them.
 
 Runs once per execution — schedule daily via PM2 cron.
+
+Topics are read from the front-matter of /News_Topics.md in the vault (see
+vault_template/News_Topics.md); SEARCH_TOPICS is the fallback when that file
+is missing. Topics are fetched concurrently over one keep-alive session,
+and run() stops waiting for them at RUN_DEADLINE. A fetch still in flight
+at that point is abandoned rather than joined; its thread ends on the
+request's own timeout.
+
+Tavily responses are cached for CACHE_TTL per (query, search depth), and
+every queued article URL is remembered, so each topic walks down its
+results to the first article that has never been queued before.
+
+Results are also grouped into story clusters by a 64-bit SimHash over
+title + snippet. Near-duplicates from other outlets in the same run are
+listed as alternate sources on one action file; near-duplicates of a story
+queued in a recent run are skipped.
 """
 
+import hashlib
+import json
 import logging
 import os
 import re
 import sys
-from datetime import datetime, timezone
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import nullcontext
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
 
 import requests
+import yaml
 from dotenv import load_dotenv
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # src/ — shared vault modules
+import vault_io  # noqa: E402
+
 # ---------------------------------------------------------------------------
 # Setup
 # ---------------------------------------------------------------------------
@@ -24,15 +50,42 @@ load_dotenv()
 
 VAULT_PATH = Path(os.environ["VAULT_PATH"])
 NEEDS_ACTION = VAULT_PATH / "Needs_Action"
+TOPICS_FILE = VAULT_PATH / "News_Topics.md"
+
+SEEN_URLS_PATH = Path("secrets/news_seen_urls.json")
+RESPONSE_CACHE_PATH = Path("secrets/tavily_cache.json")
+SIGNATURES_PATH = Path("secrets/news_signatures.json")
 
 TAVILY_API_KEY = os.environ.get("TAVILY_API_KEY", "")
 TAVILY_ENDPOINT = "https://api.tavily.com/search"
 
+# Fallback when /News_Topics.md is missing or unreadable
 SEARCH_TOPICS = [
     "AI agents development 2026",
     "Claude AI Anthropic latest",
 ]
 
+FETCH_WORKERS = 4      # concurrent Tavily requests
+REQUEST_TIMEOUT = 15   # seconds, per request
+RUN_DEADLINE = 60      # seconds, for all topics together
+
+CACHE_TTL = timedelta(hours=6)        # reuse a Tavily response this long
+SEEN_RETENTION = timedelta(days=180)  # forget queued URLs after this long
+
+NEAR_DUP_MAX_BITS = 12                     # SimHash Hamming distance for "same story"
+SIGNATURE_RETENTION = timedelta(days=14)   # how long a queued story blocks near-duplicates
+
+# Dropped before hashing so headline boilerplate doesn't dominate the signature
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or that the "
+    "this to was were will with new says said how why what after over into about".split()
+)
+
+# Per-topic settings accepted from /News_Topics.md and their defaults.
+# Keys without a default are only sent to Tavily when set.
+_TOPIC_DEFAULTS = {"max_results": 3, "search_depth": "basic"}
+_TOPIC_OPTIONAL = ("topic", "days", "include_domains", "exclude_domains")
+
 logging.basicConfig(
     level=logging.INFO,
     format="%(asctime)s  [%(levelname)s]  %(message)s",
@@ -52,43 +105,253 @@ def _safe_slug(topic: str) -> str:
     return slug.strip("-")
 
 
-def _fetch_top_result(topic: str) -> dict | None:
-    """Call Tavily and return the top result dict, or None on failure."""
+def _load_topics() -> list[dict]:
+    """
+    Return the enabled topic configs from /News_Topics.md front-matter.
+    Each config has at least "query"; falls back to SEARCH_TOPICS with
+    default settings if the file is missing, malformed or empty.
+    """
+    fallback = [{"query": query, **_TOPIC_DEFAULTS} for query in SEARCH_TOPICS]
+
+    if not TOPICS_FILE.exists():
+        log.info("No %s — using built-in topics", TOPICS_FILE.name)
+        return fallback
+
+    try:
+        text = TOPICS_FILE.read_text(encoding="utf-8").lstrip("\ufeff")
+        match = re.match(r"^---\n(.*?)\n---", text, re.DOTALL)
+        data = yaml.safe_load(match.group(1)) if match else None
+    except (OSError, yaml.YAMLError) as exc:
+        log.warning("Could not read %s (%s) — using built-in topics", TOPICS_FILE.name, exc)
+        return fallback
+    if data is not None and not isinstance(data, dict):
+        log.warning(
+            "Could not read %s (front-matter is a %s, expected a topics: key) — using built-in topics",
+            TOPICS_FILE.name, type(data).__name__,
+        )
+        return fallback
+    entries = (data or {}).get("topics") or []
+    if not isinstance(entries, list):
+        log.warning("Could not read %s (topics: is not a list) — using built-in topics", TOPICS_FILE.name)
+        return fallback
+
+    topics: list[dict] = []
+    for entry in entries:
+        if isinstance(entry, str):
+            entry = {"query": entry}
+        if not isinstance(entry, dict) or not entry.get("query"):
+            log.warning("Skipping malformed topic entry in %s: %r", TOPICS_FILE.name, entry)
+            continue
+        if entry.get("enabled", True) is False:
+            continue
+        config = {"query": str(entry["query"])}
+        for key, default in _TOPIC_DEFAULTS.items():
+            config[key] = entry.get(key, default)
+        for key in _TOPIC_OPTIONAL:
+            if key in entry:
+                config[key] = entry[key]
+        topics.append(config)
+
+    if not topics:
+        log.warning("%s lists no enabled topics — using built-in topics", TOPICS_FILE.name)
+        return fallback
+    return topics
+
+
+# ---------------------------------------------------------------------------
+# Seen-URL index and response cache
+# ---------------------------------------------------------------------------
+
+def _load_json(path: Path) -> dict:
+    """Load a JSON object from path, or {} if missing or unreadable."""
+    if not path.exists():
+        return {}
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+        return data if isinstance(data, dict) else {}
+    except Exception as exc:
+        log.warning("Could not load %s (%s) — starting fresh.", path, exc)
+        return {}
+
+
+def _save_json(path: Path, data: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
+
+
+def _normalize_url(url: str) -> str:
+    """
+    Canonical form used as the seen-index key: lowercase scheme/host, no
+    fragment, no trailing slash, and utm_* tracking parameters removed.
+    """
+    parts = urlsplit(url.strip())
+    query = urlencode([
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith("utm_")
+    ])
+    path = parts.path.rstrip("/") or "/"
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), path, query, ""))
+
+
+def _prune_seen_urls(seen: dict[str, str], now: datetime) -> dict[str, str]:
+    """Drop URLs first seen more than SEEN_RETENTION ago. Values are ISO dates."""
+    cutoff = (now - SEEN_RETENTION).strftime("%Y-%m-%d")
+    return {url: first_seen for url, first_seen in seen.items() if first_seen >= cutoff}
+
+
+def _cache_key(config: dict) -> str:
+    return f"{config['search_depth']}::{config['query']}"
+
+
+def _cached_results(cache: dict, config: dict, now: datetime) -> list[dict] | None:
+    """Return the cached results for config if younger than CACHE_TTL, else None."""
+    entry = cache.get(_cache_key(config))
+    if not entry:
+        return None
+    try:
+        fetched = datetime.fromisoformat(entry["fetched"])
+    except (KeyError, ValueError):
+        return None
+    if now - fetched > CACHE_TTL:
+        return None
+    return entry.get("results", [])
+
+
+def _prune_cache(cache: dict, now: datetime) -> dict:
+    """Drop cache entries older than CACHE_TTL."""
+    fresh = {}
+    for key, entry in cache.items():
+        try:
+            if now - datetime.fromisoformat(entry["fetched"]) <= CACHE_TTL:
+                fresh[key] = entry
+        except (KeyError, TypeError, ValueError):
+            continue
+    return fresh
+
+
+# ---------------------------------------------------------------------------
+# Near-duplicate detection
+# ---------------------------------------------------------------------------
+
+def _simhash(text: str) -> int | None:
+    """
+    64-bit SimHash over the words of text (stopwords removed). Single words
+    rather than longer shingles, because other outlets paraphrase: the same
+    story typically lands within ~10 bits, unrelated stories ~30 bits apart.
+    None when there are no words — such an article is treated as unique.
+    """
+    words = [w for w in re.findall(r"[a-z0-9]+", text.lower()) if w not in _STOPWORDS]
+    if not words:
+        return None
+
+    weights = [0] * 64
+    for feature in words:
+        h = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def _article_signature(article: dict) -> int | None:
+    return _simhash(f"{article.get('title', '')} {article.get('content', '')}")
+
+
+def _is_near_dup(sig: int | None, other: int | None) -> bool:
+    if sig is None or other is None:
+        return False  # nothing to compare — never clustered
+    return (sig ^ other).bit_count() <= NEAR_DUP_MAX_BITS
+
+
+def _load_signatures(now: datetime) -> list[list]:
+    """
+    Load the on-disk signature index as [[sig_hex, "YYYY-MM-DD"], ...],
+    dropping entries older than SIGNATURE_RETENTION.
+    """
+    cutoff = (now - SIGNATURE_RETENTION).strftime("%Y-%m-%d")
+    entries = _load_json(SIGNATURES_PATH).get("signatures", [])
+    return [e for e in entries if isinstance(e, list) and len(e) == 2 and e[1] >= cutoff]
+
+
+# ---------------------------------------------------------------------------
+# Tavily client
+# ---------------------------------------------------------------------------
+
+def _make_session() -> requests.Session:
+    """Shared keep-alive session with one pooled connection per worker."""
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=FETCH_WORKERS)
+    session.mount("https://", adapter)
+    return session
+
+
+def _fetch_results(
+    session: requests.Session,
+    config: dict,
+    deadline: float,
+) -> tuple[list[dict] | None, float]:
+    """
+    Call Tavily for one topic config. Returns (results, elapsed_seconds);
+    results is None on failure. The request timeout never runs past deadline
+    (a time.monotonic() value).
+    """
+    topic = config["query"]
     payload = {
         "api_key": TAVILY_API_KEY,
-        "query": topic,
-        "max_results": 3,
-        "search_depth": "basic",
         "include_answer": False,
+        **config,
     }
+    start = time.monotonic()
+    timeout = min(REQUEST_TIMEOUT, max(deadline - start, 0.1))
     try:
-        resp = requests.post(TAVILY_ENDPOINT, json=payload, timeout=15)
+        resp = session.post(TAVILY_ENDPOINT, json=payload, timeout=timeout)
         resp.raise_for_status()
-        results = resp.json().get("results", [])
-        return results[0] if results else None
+        return resp.json().get("results", []), time.monotonic() - start
     except requests.RequestException as exc:
         log.error("Tavily API call failed for topic %r: %s", topic, exc)
-        return None
-
-
-def _build_action_file(topic: str, article: dict, now: datetime) -> tuple[str, str]:
-    """Return (filename, content) for the news action file."""
+        return None, time.monotonic() - start
+
+
+def _build_action_file(
+    topic: str,
+    article: dict,
+    now: datetime,
+    alternates: list[dict] | None = None,
+) -> tuple[str, str]:
+    """
+    Return (filename, content) for the news action file. alternates are
+    other articles in the same story cluster, listed as extra sources.
+    """
     timestamp_iso = now.strftime("%Y-%m-%dT%H:%M:%SZ")
     date_str = now.strftime("%Y%m%d")
     slug = _safe_slug(topic)
-    filename = f"NEWS_{date_str}_{slug}.md"
 
     title = article.get("title", "Unknown title")
     url = article.get("url", "")
+
+    # Article hash in the name: a second run the same day picks a different
+    # (unseen) article and must not overwrite the first one's file.
+    url_hash = hashlib.sha1(_normalize_url(url).encode("utf-8")).hexdigest()[:8]
+    filename = f"NEWS_{date_str}_{slug}_{url_hash}.md"
     published = article.get("published_date", "Not available")
     snippet = article.get("content", "No content available.")
 
+    alternates = alternates or []
+    if alternates:
+        alternates_block = "\n".join(
+            f"- [{alt.get('title', 'Untitled')}]({alt.get('url', '')})"
+            f" — {urlsplit(alt.get('url', '')).netloc or 'unknown source'}"
+            for alt in alternates
+        )
+    else:
+        alternates_block = "_No other outlets found for this story._"
+
     content = f"""---
 type: tech_news
 topic: "{topic}"
 source: tavily
 article_title: "{title}"
 article_url: "{url}"
+alternate_sources: {len(alternates)}
 created: {timestamp_iso}
 status: pending
 ---
@@ -103,6 +366,10 @@ status: pending
 
 {snippet}
 
+## Alternate Sources
+
+{alternates_block}
+
 ## Instructions for Claude
 
 Read the article above. Use the draft_linkedin_post skill to write a LinkedIn post sharing this news with Taha's personal perspective and insights.
@@ -117,7 +384,11 @@ Save the approval request to /Pending_Approval/ and wait for human approval.
 # Main
 # ---------------------------------------------------------------------------
 
-def main() -> None:
+def run(session: requests.Session | None = None) -> int:
+    """
+    One fetch: queue at most one new article per topic. Uses the given HTTP
+    session if there is one. Returns how many action files were written.
+    """
     log.info("News Watcher started — fetching latest tech news")
 
     if not TAVILY_API_KEY:
@@ -126,26 +397,142 @@ def main() -> None:
 
     NEEDS_ACTION.mkdir(parents=True, exist_ok=True)
 
+    topics = _load_topics()
+    log.info(
+        "Fetching %d topic(s) — %d worker(s), %d s deadline",
+        len(topics), FETCH_WORKERS, RUN_DEADLINE,
+    )
+
+    started = datetime.now(timezone.utc)
+    seen_urls = _prune_seen_urls(_load_json(SEEN_URLS_PATH), started)
+    cache = _prune_cache(_load_json(RESPONSE_CACHE_PATH), started)
+
+    deadline = time.monotonic() + RUN_DEADLINE
+    latencies: dict[str, str] = {}
+    results_by_topic: dict[str, list[dict]] = {}
     queued = 0
 
-    for topic in SEARCH_TOPICS:
-        log.info("Searching: %r", topic)
+    to_fetch = []
+    for config in topics:
+        cached = _cached_results(cache, config, started)
+        if cached is None:
+            to_fetch.append(config)
+        else:
+            results_by_topic[config["query"]] = cached
+            latencies[config["query"]] = "cached"
+
+    pool = ThreadPoolExecutor(max_workers=FETCH_WORKERS)
+    with nullcontext(session) if session is not None else _make_session() as session:
+        try:
+            futures = {
+                pool.submit(_fetch_results, session, config, deadline): config
+                for config in to_fetch
+            }
+            done, not_done = wait(futures, timeout=max(deadline - time.monotonic(), 0))
+        finally:
+            # Leaving a with-block would join fetches still running past the deadline
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        for future in not_done:
+            topic = futures[future]["query"]
+            latencies[topic] = "deadline"
+            log.warning("Topic %r did not finish before the %d s deadline — skipping", topic, RUN_DEADLINE)
+
+        for future in done:
+            config = futures[future]
+            results, elapsed = future.result()
+            latencies[config["query"]] = f"{elapsed:.2f} s"
+            if results is not None:
+                results_by_topic[config["query"]] = results
+                cache[_cache_key(config)] = {
+                    "fetched": datetime.now(timezone.utc).isoformat(),
+                    "results": results,
+                }
+
+    # One signature per distinct URL returned this run, for clustering
+    run_articles: dict[str, tuple[dict, int | None]] = {}
+    for results in results_by_topic.values():
+        for article in results:
+            url = article.get("url", "")
+            if url and _normalize_url(url) not in run_articles:
+                run_articles[_normalize_url(url)] = (article, _article_signature(article))
+
+    signatures = _load_signatures(started)
+    known_sigs = [int(sig, 16) for sig, _ in signatures]
+    claimed: set[str] = set()  # normalised URLs already placed in a cluster this run
+
+    # Write action files in topic order, so rank ties across topics resolve
+    # the same way every run. Each topic walks down to its first article that
+    # is unseen, not a near-duplicate of a recent story, and not already in a
+    # cluster emitted this run.
+    for config in topics:
+        topic = config["query"]
+        results = results_by_topic.get(topic)
+        if not results:
+            if topic in results_by_topic:
+                log.warning("No result returned for topic %r — skipping", topic)
+            continue
+
+        article = None
+        for candidate in results:
+            key = _normalize_url(candidate.get("url", ""))
+            if key not in run_articles or key in seen_urls or key in claimed:
+                continue
+            sig = run_articles[key][1]
+            if any(_is_near_dup(sig, known) for known in known_sigs):
+                log.info("Near-duplicate of a recent story — skipping %s", candidate["url"])
+                claimed.add(key)
+                continue
+            article = candidate
+            break
 
-        article = _fetch_top_result(topic)
         if article is None:
-            log.warning("No result returned for topic %r — skipping", topic)
+            log.info("All %d result(s) for topic %r already covered — skipping", len(results), topic)
             continue
 
+        key = _normalize_url(article["url"])
+        sig = run_articles[key][1]
+        cluster = [
+            other_key for other_key, (_, other_sig) in run_articles.items()
+            if other_key != key
+            and other_key not in claimed
+            and other_key not in seen_urls
+            and _is_near_dup(sig, other_sig)
+        ]
+        alternates = [run_articles[k][0] for k in cluster]
+
         now = datetime.now(timezone.utc)
-        filename, content = _build_action_file(topic, article, now)
+        filename, content = _build_action_file(topic, article, now, alternates)
 
-        action_path = NEEDS_ACTION / filename
-        action_path.write_text(content, encoding="utf-8")
+        action_path = vault_io.create(NEEDS_ACTION, filename, content)
 
-        log.info("Created news action: %s", filename)
+        today = now.strftime("%Y-%m-%d")
+        for member in [key, *cluster]:
+            seen_urls[member] = today
+            claimed.add(member)
+        if sig is not None:
+            known_sigs.append(sig)
+            signatures.append([f"{sig:016x}", today])
+
+        log.info(
+            "Created news action: %s (%d alternate source(s))", action_path.name, len(alternates)
+        )
         queued += 1
 
+    _save_json(SEEN_URLS_PATH, seen_urls)
+    _save_json(RESPONSE_CACHE_PATH, cache)
+    _save_json(SIGNATURES_PATH, {"signatures": signatures})
+
+    log.info("Per-topic latency:")
+    for config in topics:
+        log.info("  %-45s %s", config["query"][:45], latencies.get(config["query"], "-"))
+
     log.info("News fetch complete. %d article(s) queued.", queued)
+    return queued
+
+
+def main() -> None:
+    run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,360 @@
+"""
+WhatsApp Watcher Benchmark — offline DOM fixture harness
+Drives the real whatsapp_watcher poll loop against saved WhatsApp Web DOM
+fixtures served from a local HTTP server, so _poll, _find_chat_row and
+_extract_messages can be tested and timed without a live account.
+
+Reports, for 1 / 20 / 200 unread chats: per-cycle latency, Playwright call
+counts and selector-strategy hits. Nothing is written to the real vault or
+to secrets/ — action files and state go to a temporary directory.
+
+Usage:
+    uv run python src/watchers/whatsapp_bench.py
+    uv run python src/watchers/whatsapp_bench.py --chats 1 20 --render-wait-ms 0
+
+    Refresh the fixtures from your live session (needs at least one unread chat):
+        uv run python src/watchers/whatsapp_bench.py --capture
+
+NOTE: --capture saves a real chat row and conversation. Names and message
+IDs are replaced with placeholders, but message text is kept — review
+fixtures/whatsapp/ before committing it.
+"""
+
+import argparse
+import functools
+import html
+import logging
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# The watcher reads VAULT_PATH at import time — point it at a scratch vault
+# so a benchmark run can never drop files into the real /Needs_Action/.
+_SCRATCH_DIR = Path(tempfile.mkdtemp(prefix="whatsapp_bench_"))
+os.environ["VAULT_PATH"] = str(_SCRATCH_DIR / "vault")
+
+import whatsapp_watcher as ww  # noqa: E402
+from playwright.sync_api import ElementHandle, Page, sync_playwright  # noqa: E402
+
+ww.vault_io.vault_catalog.CATALOG_PATH = _SCRATCH_DIR / "vault_catalog.db"
+
+# ---------------------------------------------------------------------------
+# Setup
+# ---------------------------------------------------------------------------
+
+PROJECT_DIR  = Path(__file__).parent.parent.parent
+FIXTURES_DIR = PROJECT_DIR / "fixtures" / "whatsapp"
+
+DEFAULT_CHAT_COUNTS = [1, 20, 200]
+
+# Playwright methods counted during a poll cycle
+_COUNTED_METHODS = {
+    Page: [
+        "query_selector", "query_selector_all", "wait_for_selector",
+        "wait_for_timeout", "evaluate", "screenshot",
+    ],
+    ElementHandle: [
+        "query_selector", "evaluate", "evaluate_handle", "get_attribute",
+        "inner_text", "click", "screenshot",
+    ],
+}
+
+log = logging.getLogger("whatsapp_bench")
+
+
+# ---------------------------------------------------------------------------
+# Argument parsing
+# ---------------------------------------------------------------------------
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Offline benchmark for the WhatsApp watcher",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=(
+            "Examples:\n"
+            "  Default run:         uv run python src/watchers/whatsapp_bench.py\n"
+            "  Skip render waits:   uv run python src/watchers/whatsapp_bench.py --render-wait-ms 0\n"
+            "  Refresh fixtures:    uv run python src/watchers/whatsapp_bench.py --capture"
+        ),
+    )
+    parser.add_argument(
+        "--chats",
+        type=int,
+        nargs="+",
+        default=DEFAULT_CHAT_COUNTS,
+        help="Unread chat counts to benchmark (default: 1 20 200)",
+    )
+    parser.add_argument(
+        "--render-wait-ms",
+        type=int,
+        default=ww.RENDER_WAIT_MS,
+        help=f"Override the watcher's post-click render wait (default: {ww.RENDER_WAIT_MS})",
+    )
+    parser.add_argument(
+        "--capture",
+        action="store_true",
+        help="Refresh fixtures/whatsapp/ from the live WhatsApp Web session and exit",
+    )
+    parser.add_argument(
+        "--headed",
+        action="store_true",
+        help="Show the browser while benchmarking",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Keep the watcher's per-chat INFO logging",
+    )
+    return parser.parse_args()
+
+
+# ---------------------------------------------------------------------------
+# Fixture rendering / serving
+# ---------------------------------------------------------------------------
+
+def _render_page(unread_chats: int) -> str:
+    """Compose shell.html with unread_chats copies of row.html and conversation.html."""
+    shell = (FIXTURES_DIR / "shell.html").read_text(encoding="utf-8")
+    row   = (FIXTURES_DIR / "row.html").read_text(encoding="utf-8")
+    conv  = (FIXTURES_DIR / "conversation.html").read_text(encoding="utf-8")
+
+    rows: list[str] = []
+    conversations: list[str] = []
+    for i in range(1, unread_chats + 1):
+        fields = {
+            "{{chat}}":   str(i),
+            "{{name}}":   f"Bench Contact {i:03d}",
+            "{{unread}}": str(i % 9 + 1),
+        }
+        row_html, conv_html = row, conv
+        for key, value in fields.items():
+            row_html  = row_html.replace(key, value)
+            conv_html = conv_html.replace(key, value)
+        # Tag the row's outermost element so the shell's click handler can find it
+        rows.append(re.sub(r"^(\s*<[a-zA-Z]+)", rf'\1 data-chat="{i}"', row_html, count=1))
+        conversations.append(f'<template id="conv-{i}">{conv_html}</template>')
+
+    return (
+        shell.replace("{{rows}}", "\n".join(rows))
+             .replace("{{conversations}}", "\n".join(conversations))
+    )
+
+
+class _FixtureHandler(BaseHTTPRequestHandler):
+    """Serve _render_page(N) for GET /?unread=N."""
+
+    def do_GET(self) -> None:
+        query = parse_qs(urlparse(self.path).query)
+        try:
+            unread = int(query.get("unread", ["1"])[0])
+        except ValueError:
+            unread = 1
+        body = _render_page(unread).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args) -> None:
+        pass  # keep the benchmark output clean
+
+
+def _start_server() -> tuple[ThreadingHTTPServer, str]:
+    """Start the fixture server on a free localhost port; return (server, base_url)."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address[:2]
+    return server, f"http://{host}:{port}"
+
+
+# ---------------------------------------------------------------------------
+# Playwright call counting
+# ---------------------------------------------------------------------------
+
+_call_counts: Counter[str] = Counter()
+
+
+def _install_call_counters() -> None:
+    """Wrap the methods in _COUNTED_METHODS so every call bumps _call_counts."""
+    for cls, names in _COUNTED_METHODS.items():
+        for name in names:
+            original = getattr(cls, name)
+
+            @functools.wraps(original)
+            def counted(self, *args, _name=f"{cls.__name__}.{name}", _original=original, **kwargs):
+                _call_counts[_name] += 1
+                return _original(self, *args, **kwargs)
+
+            setattr(cls, name, counted)
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _reset_watcher_state(scenario_dir: Path) -> dict:
+    """Point the watcher's state files at scenario_dir and return fresh seen state."""
+    ww.NEEDS_ACTION     = scenario_dir / "Needs_Action"
+    ww.SEEN_STATE_PATH  = scenario_dir / "whatsapp_seen.json"
+    ww.PROBE_STATS_PATH = scenario_dir / "whatsapp_probe_stats.json"
+    ww.NEEDS_ACTION.mkdir(parents=True, exist_ok=True)
+    ww._probe_stats = {}
+    return ww._load_seen_state()
+
+
+def _run_scenario(page: Page, base_url: str, unread_chats: int) -> list[dict]:
+    """Load the fixture with unread_chats unread chats and time two poll cycles."""
+    seen_state = _reset_watcher_state(_SCRATCH_DIR / f"chats_{unread_chats}")
+
+    page.goto(f"{base_url}/?unread={unread_chats}")
+    if not ww._wait_for_chat_list(page, 5_000):
+        raise RuntimeError("Fixture chat list did not render — check fixtures/whatsapp/")
+
+    cycles: list[dict] = []
+    for label in ("drain", "idle"):
+        _call_counts.clear()
+        start = time.perf_counter()
+        ww._poll(page, seen_state)
+        elapsed = time.perf_counter() - start
+        cycles.append({
+            "label":   label,
+            "seconds": elapsed,
+            "calls":   Counter(_call_counts),
+            "written": len(list(ww.NEEDS_ACTION.glob("WHATSAPP_*.md"))),
+        })
+    return cycles
+
+
+def _report(unread_chats: int, cycles: list[dict]) -> None:
+    log.info("=" * 72)
+    log.info("%d unread chat(s)", unread_chats)
+    for cycle in cycles:
+        calls = cycle["calls"]
+        log.info(
+            "  %-5s cycle: %8.3f s   %5d Playwright call(s)   %d action file(s) on disk",
+            cycle["label"], cycle["seconds"], sum(calls.values()), cycle["written"],
+        )
+        if unread_chats and cycle["label"] == "drain":
+            log.info("        per chat: %.3f s", cycle["seconds"] / unread_chats)
+        for name, count in sorted(calls.items(), key=lambda kv: -kv[1]):
+            log.info("        %-34s %6d", name, count)
+
+    log.info("  selector strategies:")
+    for group, entry in ww._probe_stats.items():
+        for label, counts in entry.get("strategies", {}).items():
+            log.info(
+                "    %-10s %-40s %5d hit(s) / %5d tried",
+                group, label[:40], counts.get("hits", 0), counts.get("tried", 0),
+            )
+
+
+def _benchmark(args: argparse.Namespace) -> None:
+    ww.RENDER_WAIT_MS = args.render_wait_ms
+    ww.DIAGNOSTICS = False
+    _install_call_counters()
+
+    server, base_url = _start_server()
+    log.info("Serving fixtures from %s at %s", FIXTURES_DIR, base_url)
+    log.info("Render wait per chat: %d ms", ww.RENDER_WAIT_MS)
+
+    try:
+        with sync_playwright() as playwright:
+            browser = playwright.chromium.launch(headless=not args.headed)
+            page = browser.new_page(viewport={"width": 1280, "height": 900})
+            try:
+                for unread_chats in args.chats:
+                    _report(unread_chats, _run_scenario(page, base_url, unread_chats))
+            finally:
+                browser.close()
+    finally:
+        server.shutdown()
+
+
+# ---------------------------------------------------------------------------
+# Fixture capture
+# ---------------------------------------------------------------------------
+
+def _templatize_row(row_html: str, name: str) -> str:
+    """Replace the real contact name and unread count in a captured chat row."""
+    row_html = row_html.replace(html.escape(name, quote=True), "{{name}}").replace(name, "{{name}}")
+    # aria-label="3 unread messages" and the visible count inside the badge
+    row_html = re.sub(r'aria-label="\d+ unread message(s?)"', 'aria-label="{{unread}} unread messages"', row_html)
+    return re.sub(
+        r'(aria-label="\{\{unread\}\}[^"]*"[^>]*>(?:\s*<[^>]+>)*\s*)\d+',
+        r"\g<1>{{unread}}",
+        row_html,
+        count=1,
+    )
+
+
+def _templatize_conversation(conv_html: str, name: str) -> str:
+    """Replace the contact name and message data-ids in a captured #main pane."""
+    conv_html = conv_html.replace(html.escape(name, quote=True), "{{name}}").replace(name, "{{name}}")
+    counter = iter(range(10_000))
+    return re.sub(
+        r'data-id="(true|false)_[^"]*"',
+        lambda m: f'data-id="{m.group(1)}_{{{{chat}}}}@c.us_BENCH{{{{chat}}}}M{next(counter)}"',
+        conv_html,
+    )
+
+
+def _capture() -> None:
+    """Save a live chat row and its open conversation as the new fixtures."""
+    with sync_playwright() as playwright:
+        context, page = ww._connect(playwright, first_run=False)
+        try:
+            badge = page.query_selector(ww._UNREAD_BADGE_SELECTOR)
+            if badge is None:
+                log.error("No unread chat found — capture needs at least one unread chat.")
+                sys.exit(1)
+
+            row = ww._find_chat_row(badge, 1)
+            if row is None:
+                log.error("Could not locate the chat row for the unread badge.")
+                sys.exit(1)
+            name = ww._name_from_chat_row(row)
+            if not name:
+                log.error("Could not read the contact name from the chat row.")
+                sys.exit(1)
+
+            row_html = row.evaluate("el => el.outerHTML")
+            row.click()
+            page.wait_for_timeout(ww.RENDER_WAIT_MS)
+            conv_html = page.eval_on_selector("#main", "el => el.outerHTML")
+        finally:
+            context.close()
+
+    FIXTURES_DIR.mkdir(parents=True, exist_ok=True)
+    (FIXTURES_DIR / "row.html").write_text(_templatize_row(row_html, name) + "\n", encoding="utf-8")
+    (FIXTURES_DIR / "conversation.html").write_text(
+        _templatize_conversation(conv_html, name) + "\n", encoding="utf-8"
+    )
+    log.info("Fixtures refreshed in %s — review message text before committing.", FIXTURES_DIR)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    args = _parse_args()
+    if not args.verbose:
+        logging.getLogger("whatsapp_watcher").setLevel(logging.WARNING)
+
+    if args.capture:
+        _capture()
+    else:
+        _benchmark(args)
+
+
+if __name__ == "__main__":
+    main()
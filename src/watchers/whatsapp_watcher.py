@@ -16,11 +16,15 @@ is still read-only — it never writes or sends anything.
 """
 
 import argparse
+import hashlib
+import json
 import logging
 import os
+import random
 import re
 import sys
 import time
+from collections import deque
 from datetime import datetime, timezone
 from pathlib import Path
 
@@ -29,10 +33,19 @@ from playwright.sync_api import (
     BrowserContext,
     ElementHandle,
     Page,
+    Route,
     TimeoutError as PlaywrightTimeoutError,
     sync_playwright,
 )
 
+try:
+    import psutil  # declared dependency; RSS sampling of the Chromium processes
+except ImportError:
+    psutil = None
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))  # src/ — shared vault modules
+import vault_io  # noqa: E402
+
 # ---------------------------------------------------------------------------
 # Setup
 # ---------------------------------------------------------------------------
@@ -42,13 +55,30 @@ load_dotenv()
 VAULT_PATH   = Path(os.environ["VAULT_PATH"])
 NEEDS_ACTION = VAULT_PATH / "Needs_Action"
 SESSION_DIR   = Path("secrets/whatsapp_session")
-DEBUG_SCREENSHOT  = Path("secrets/whatsapp_debug.png")
-HEADER_SCREENSHOT = Path("secrets/whatsapp_header_debug.png")
+SEEN_STATE_PATH   = Path("secrets/whatsapp_seen.json")
+PROBE_STATS_PATH  = Path("secrets/whatsapp_probe_stats.json")
+DIAGNOSTICS_DIR   = Path("secrets/whatsapp_diagnostics")
 
 WHATSAPP_URL  = "https://web.whatsapp.com"
 POLL_INTERVAL = 30       # seconds between polls
 QR_TIMEOUT_MS = 120_000  # 2 minutes for QR scan
 LOAD_TIMEOUT_MS = 30_000 # timeout waiting for chat list on normal start
+RENDER_WAIT_MS  = 1_000  # pause after opening a chat so messages can render
+SEEN_MAX_IDS  = 5_000    # message IDs remembered across restarts (oldest dropped first)
+
+# Diagnostics — off by default; snapshots (screenshot + HTML) are sampled into
+# an in-memory ring buffer and only written to DIAGNOSTICS_DIR on failure.
+DIAGNOSTICS             = os.environ.get("WHATSAPP_DIAGNOSTICS", "false").lower() == "true"
+DIAGNOSTICS_SAMPLE_RATE = float(os.environ.get("WHATSAPP_DIAGNOSTICS_SAMPLE_RATE", "0.1"))
+DIAGNOSTICS_BUFFER_SIZE = 10
+
+MEMORY_CEILING_MB     = 1_500  # recycle the browser context above this (Chromium RSS)
+JS_HEAP_CEILING_MB    = 300    # same, when only the page's JS heap can be read (no psutil)
+MEMORY_CHECK_INTERVAL = 300    # seconds between memory samples
+
+# Resource types the watcher never needs — it only reads text.
+# Avatars, stickers and media previews are all "image" / "media" requests.
+_BLOCKED_RESOURCE_TYPES = {"image", "media", "font"}
 
 # WhatsApp Web selectors — multiple fallbacks because the DOM changes regularly
 _CHAT_LIST_SELECTORS = [
@@ -57,11 +87,20 @@ _CHAT_LIST_SELECTORS = [
     '[data-testid="pane-side"]',
 ]
 _UNREAD_BADGE_SELECTOR = '[aria-label*="unread"]'
-_CONTACT_HEADER_SELECTORS = [
-    '[data-testid="conversation-header"] span[dir="auto"]',
-    'header [data-testid="conversation-info-header-chat-title"] span',
-    'header span[title]',
-    'header [data-testid="conversation-header"] span',
+# (label, selector) pairs for the open conversation's header name, scoped
+# to #main to avoid sidebar collisions. Order is the default; the last
+# winner is promoted at runtime (see _ordered_probes).
+_HEADER_NAME_CANDIDATES = [
+    ('data-testid title span',
+     '#main header span[data-testid="conversation-info-header-chat-title"]'),
+    ('span[title] in #main header',
+     '#main header span[title]'),
+    ('span[dir=auto] in #main header',
+     '#main header span[dir="auto"]'),
+    ('conversation-panel-header span[title]',
+     'header [data-testid="conversation-panel-header"] span[title]'),
+    ('img[alt] in #main header',   # alt often carries the contact name
+     '#main header img[alt]'),
 ]
 
 logging.basicConfig(
@@ -91,6 +130,12 @@ def _parse_args() -> argparse.Namespace:
         action="store_true",
         help="Force visible browser window for QR code scanning",
     )
+    parser.add_argument(
+        "--diagnostics",
+        action="store_true",
+        help="Enable sampled DOM snapshots, dumped to secrets/ on failure "
+             "(same as WHATSAPP_DIAGNOSTICS=true)",
+    )
     return parser.parse_args()
 
 
@@ -98,15 +143,29 @@ def _parse_args() -> argparse.Namespace:
 # Browser / session management
 # ---------------------------------------------------------------------------
 
+def _block_heavy_resources(route: Route) -> None:
+    """Abort requests for resource types listed in _BLOCKED_RESOURCE_TYPES."""
+    if route.request.resource_type in _BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
 def _launch_context(playwright, *, headless: bool) -> BrowserContext:
-    """Launch a persistent Chromium context backed by SESSION_DIR."""
+    """
+    Launch a persistent Chromium context backed by SESSION_DIR.
+    Images, media and fonts are blocked — the QR code is drawn on a canvas,
+    so first-run scanning is unaffected.
+    """
     SESSION_DIR.mkdir(parents=True, exist_ok=True)
-    return playwright.chromium.launch_persistent_context(
+    context = playwright.chromium.launch_persistent_context(
         user_data_dir=str(SESSION_DIR),
         headless=headless,
         args=["--no-sandbox", "--disable-dev-shm-usage"],
         viewport={"width": 1280, "height": 900},
     )
+    context.route("**/*", _block_heavy_resources)
+    return context
 
 
 def _active_page(context: BrowserContext) -> Page:
@@ -115,14 +174,27 @@ def _active_page(context: BrowserContext) -> Page:
 
 
 def _wait_for_chat_list(page: Page, timeout_ms: int) -> bool:
-    """Return True if any chat-list selector becomes visible within timeout_ms."""
-    for selector in _CHAT_LIST_SELECTORS:
+    """
+    Return True if any chat-list selector becomes visible within timeout_ms.
+
+    All selectors are raced as one comma-joined CSS wait, so the worst case
+    is a single timeout rather than one per selector. The selector that
+    matched is recorded so it is checked first next time.
+    """
+    ordered = _ordered_probes("chat_list", [(sel, sel) for sel in _CHAT_LIST_SELECTORS])
+    try:
+        page.wait_for_selector(", ".join(sel for _, sel in ordered), timeout=timeout_ms)
+    except PlaywrightTimeoutError:
+        return False
+
+    for tried, (label, selector) in enumerate(ordered, start=1):
         try:
-            page.wait_for_selector(selector, timeout=timeout_ms)
-            return True
-        except PlaywrightTimeoutError:
+            if page.query_selector(selector):
+                _record_probe("chat_list", label, [lbl for lbl, _ in ordered[:tried]])
+                break
+        except Exception:
             continue
-    return False
+    return True
 
 
 def _connect(playwright, *, first_run: bool) -> tuple[BrowserContext, Page]:
@@ -169,6 +241,249 @@ def _connect(playwright, *, first_run: bool) -> tuple[BrowserContext, Page]:
     sys.exit(1)
 
 
+# ---------------------------------------------------------------------------
+# Learned probe ordering
+# ---------------------------------------------------------------------------
+
+# Populated once at startup by _load_probe_stats(). Shape:
+#   {group: {"winner": label, "strategies": {label: {"tried": n, "hits": n}}}}
+# where group is one of "chat_list", "chat_row", "header".
+_probe_stats: dict = {}
+_probe_stats_dirty = False
+
+
+def _load_probe_stats() -> None:
+    """Load per-strategy hit counts and last winners from PROBE_STATS_PATH."""
+    global _probe_stats
+    if not PROBE_STATS_PATH.exists():
+        return
+    try:
+        _probe_stats = json.loads(PROBE_STATS_PATH.read_text(encoding="utf-8"))
+    except Exception as exc:
+        log.warning("Could not load probe stats (%s) — starting fresh.", exc)
+        _probe_stats = {}
+
+
+def _save_probe_stats() -> None:
+    """Write probe stats to disk if anything changed since the last save."""
+    global _probe_stats_dirty
+    if not _probe_stats_dirty:
+        return
+    PROBE_STATS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    PROBE_STATS_PATH.write_text(json.dumps(_probe_stats, indent=2), encoding="utf-8")
+    _probe_stats_dirty = False
+
+
+def _ordered_probes(group: str, probes: list[tuple[str, str]]) -> list[tuple[str, str]]:
+    """Return (label, probe) pairs with the group's last winner moved to the front."""
+    winner = _probe_stats.get(group, {}).get("winner")
+    return sorted(probes, key=lambda p: p[0] != winner)
+
+
+def _record_probe(group: str, winner: str | None, tried: list[str]) -> None:
+    """
+    Count one probe attempt. Every label in tried gets tried += 1; the winner
+    (None if all failed) gets hits += 1 and becomes the group's first choice.
+    A change of winner usually means WhatsApp shipped a DOM change — log it.
+    """
+    global _probe_stats_dirty
+    entry = _probe_stats.setdefault(group, {"winner": None, "strategies": {}})
+    for label in tried:
+        entry["strategies"].setdefault(label, {"tried": 0, "hits": 0})["tried"] += 1
+    if winner is not None:
+        entry["strategies"][winner]["hits"] += 1
+        if entry["winner"] != winner:
+            if entry["winner"] is not None:
+                log.warning(
+                    "[probe] %s: winner changed %r → %r — WhatsApp DOM may have changed",
+                    group, entry["winner"], winner,
+                )
+            entry["winner"] = winner
+    _probe_stats_dirty = True
+
+
+def _log_probe_stats() -> None:
+    """Log the hit rate of every strategy seen so far."""
+    for group, entry in _probe_stats.items():
+        for label, counts in entry.get("strategies", {}).items():
+            tried = counts.get("tried", 0)
+            rate  = counts.get("hits", 0) / tried if tried else 0.0
+            mark  = "*" if label == entry.get("winner") else " "
+            log.info("[probe] %s %-10s %-45s %5.1f%% of %d", mark, group, label[:45], rate * 100, tried)
+
+
+# ---------------------------------------------------------------------------
+# Diagnostics ring buffer
+# ---------------------------------------------------------------------------
+
+# Last DIAGNOSTICS_BUFFER_SIZE snapshots:
+#   {"label": str, "captured": datetime, "png": bytes | None, "html": str}
+_diagnostics: deque[dict] = deque(maxlen=DIAGNOSTICS_BUFFER_SIZE)
+
+
+def _capture_diagnostic(
+    page: Page,
+    label: str,
+    element: ElementHandle | None = None,
+    *,
+    force: bool = False,
+) -> None:
+    """
+    Keep a screenshot + outerHTML snapshot of element (or the full page) in
+    the ring buffer. No-op unless DIAGNOSTICS is on; otherwise only a
+    DIAGNOSTICS_SAMPLE_RATE fraction of calls capture, unless force=True.
+    Nothing touches the disk here — see _dump_diagnostics.
+    """
+    if not DIAGNOSTICS:
+        return
+    if not force and random.random() >= DIAGNOSTICS_SAMPLE_RATE:
+        return
+    try:
+        if element is not None:
+            png  = element.screenshot()
+            html = element.evaluate("el => el.outerHTML")
+        else:
+            png  = page.screenshot()
+            html = page.content()
+    except Exception as exc:
+        log.warning("[diag] Snapshot %r failed: %s", label, exc)
+        return
+    _diagnostics.append({
+        "label":    label,
+        "captured": datetime.now(timezone.utc),
+        "png":      png,
+        "html":     html,
+    })
+
+
+def _dump_diagnostics(reason: str) -> None:
+    """Write every buffered snapshot to DIAGNOSTICS_DIR and empty the buffer."""
+    if not _diagnostics:
+        return
+    DIAGNOSTICS_DIR.mkdir(parents=True, exist_ok=True)
+    log.warning("[diag] %s — dumping %d snapshot(s) to %s", reason, len(_diagnostics), DIAGNOSTICS_DIR)
+    while _diagnostics:
+        snap = _diagnostics.popleft()
+        stem = f"{snap['captured'].strftime('%Y%m%d_%H%M%S_%f')}_{re.sub(r'[^a-z0-9]+', '-', snap['label'].lower())}"
+        try:
+            if snap["png"]:
+                (DIAGNOSTICS_DIR / f"{stem}.png").write_bytes(snap["png"])
+            (DIAGNOSTICS_DIR / f"{stem}.html").write_text(snap["html"], encoding="utf-8")
+        except OSError as exc:
+            log.warning("[diag] Could not write snapshot %s: %s", stem, exc)
+
+
+# ---------------------------------------------------------------------------
+# Memory watchdog
+# ---------------------------------------------------------------------------
+
+def _memory_ceiling_mb() -> int:
+    """The ceiling matching what _browser_memory_mb() can measure."""
+    return MEMORY_CEILING_MB if psutil is not None else JS_HEAP_CEILING_MB
+
+
+def _browser_memory_mb(page: Page) -> float | None:
+    """
+    Return the browser's current memory use in MB, or None if it can't be read.
+
+    With psutil installed this is the summed RSS of every Chromium process
+    spawned under this watcher. Without it, falls back to the page's JS heap
+    (performance.memory), which is a fraction of RSS — compare it against
+    JS_HEAP_CEILING_MB, not MEMORY_CEILING_MB (see _memory_ceiling_mb).
+    """
+    if psutil is not None:
+        total = 0
+        try:
+            children = psutil.Process().children(recursive=True)
+        except psutil.Error as exc:
+            log.warning("Could not list browser processes: %s", exc)
+            return None
+        for proc in children:
+            try:
+                if "chrom" in proc.name().lower():
+                    total += proc.memory_info().rss
+            except psutil.Error:
+                continue
+        return total / 1_048_576
+
+    try:
+        heap = page.evaluate(
+            "() => performance.memory ? performance.memory.usedJSHeapSize : 0"
+        )
+        return heap / 1_048_576 if heap else None
+    except Exception as exc:
+        log.warning("Could not read JS heap size: %s", exc)
+        return None
+
+
+def _recycle_context(playwright, context: BrowserContext) -> tuple[BrowserContext, Page]:
+    """
+    Close the browser and reopen WhatsApp Web from the same SESSION_DIR.
+    The saved session means no QR re-scan; _connect still falls back to a
+    visible browser if the session turns out to be gone.
+    """
+    try:
+        context.close()
+    except Exception as exc:
+        log.warning("Error closing browser context during recycle: %s", exc)
+    return _connect(playwright, first_run=False)
+
+
+# ---------------------------------------------------------------------------
+# Seen-message persistence
+# ---------------------------------------------------------------------------
+
+def _load_seen_state() -> dict:
+    """
+    Load the dedup store from disk.
+
+    Shape: {"watermarks": {contact: last_message_id}, "seen": [message_id, ...]}
+    "seen" is kept oldest-first so it can be trimmed to SEEN_MAX_IDS on save;
+    "seen_set" mirrors it in memory for O(1) lookups and is never written.
+    """
+    state: dict = {"watermarks": {}, "seen": [], "seen_set": set()}
+    if not SEEN_STATE_PATH.exists():
+        return state
+    try:
+        data = json.loads(SEEN_STATE_PATH.read_text(encoding="utf-8"))
+        state["watermarks"] = dict(data.get("watermarks", {}))
+        state["seen"] = list(data.get("seen", []))
+        state["seen_set"] = set(state["seen"])
+    except Exception as exc:
+        log.warning("Could not load WhatsApp seen state (%s) — starting fresh.", exc)
+    return state
+
+
+def _mark_seen(state: dict, contact: str, message_ids: list[str]) -> None:
+    """Record message_ids (oldest-first) and advance the contact's watermark."""
+    for msg_id in message_ids:
+        if msg_id not in state["seen_set"]:
+            state["seen"].append(msg_id)
+            state["seen_set"].add(msg_id)
+    if message_ids:
+        state["watermarks"][contact] = message_ids[-1]
+
+
+def _save_seen_state(state: dict) -> None:
+    if len(state["seen"]) > SEEN_MAX_IDS:
+        state["seen"] = state["seen"][-SEEN_MAX_IDS:]
+        state["seen_set"] = set(state["seen"])
+    SEEN_STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    SEEN_STATE_PATH.write_text(
+        json.dumps({"watermarks": state["watermarks"], "seen": state["seen"]}),
+        encoding="utf-8",
+    )
+
+
+def _fallback_message_id(contact: str, timestamp: str, text: str) -> str:
+    """
+    Synthetic ID for messages whose row carries no data-id attribute.
+    Hashes the full text (not a prefix) so distinct messages never collide.
+    """
+    digest = hashlib.sha1(f"{contact}|{timestamp}|{text}".encode("utf-8")).hexdigest()
+    return f"local_{digest[:20]}"
+
+
 # ---------------------------------------------------------------------------
 # DOM helpers
 # ---------------------------------------------------------------------------
@@ -206,43 +521,25 @@ def _name_from_chat_row(chat_row: ElementHandle) -> str:
 def _get_contact_name_from_header(page: Page) -> str:
     """
     Extract the contact / group name from the open conversation header.
-    Tries targeted selectors scoped to #main, screenshots the header for
-    debugging, and dumps the first 1000 chars of header HTML to the log.
+    Tries targeted selectors scoped to #main. With diagnostics on, the
+    header is sampled into the ring buffer and the buffer is dumped if
+    every selector fails.
 
     Returns "Unknown" only if every strategy fails.
     """
-    # --- Debug: header screenshot ---
-    try:
-        header_el = page.query_selector("#main header")
-        if header_el:
-            HEADER_SCREENSHOT.parent.mkdir(parents=True, exist_ok=True)
-            header_el.screenshot(path=str(HEADER_SCREENSHOT))
-            log.info("  [header] Screenshot saved to %s", HEADER_SCREENSHOT)
-
-            raw_html = page.evaluate(
-                "el => el.outerHTML", header_el
-            )
-            log.info("  [header] HTML (first 1000 chars): %s", raw_html[:1000])
-        else:
-            log.warning("  [header] #main header element not found for screenshot")
-    except Exception as exc:
-        log.warning("  [header] Screenshot/HTML dump failed: %s", exc)
+    if DIAGNOSTICS:
+        try:
+            header_el = page.query_selector("#main header")
+        except Exception:
+            header_el = None
+        _capture_diagnostic(page, "header", header_el)
 
-    # --- Selector probe (scoped to #main to avoid sidebar collisions) ---
-    candidates = [
-        ('data-testid title span',
-         '#main header span[data-testid="conversation-info-header-chat-title"]'),
-        ('span[title] in #main header',
-         '#main header span[title]'),
-        ('span[dir=auto] in #main header',
-         '#main header span[dir="auto"]'),
-        ('conversation-panel-header span[title]',
-         'header [data-testid="conversation-panel-header"] span[title]'),
-        ('img[alt] in #main header',   # alt often carries the contact name
-         '#main header img[alt]'),
-    ]
+    # --- Selector probe (scoped to #main; last winner first) ---
+    ordered = _ordered_probes("header", _HEADER_NAME_CANDIDATES)
+    tried: list[str] = []
 
-    for label, selector in candidates:
+    for label, selector in ordered:
+        tried.append(label)
         try:
             el = page.query_selector(selector)
             if not el:
@@ -260,11 +557,16 @@ def _get_contact_name_from_header(page: Page) -> str:
 
             log.info("  [header] %-45s → %r", label, name)
             if name and name.lower() not in ("", "click here for group info", "click here for contact info"):
+                _record_probe("header", label, tried)
                 return name
         except Exception as exc:
             log.warning("  [header] selector %r raised: %s", label, exc)
 
+    _record_probe("header", None, tried)
     log.warning("  [header] All header selectors failed — returning Unknown")
+    if DIAGNOSTICS:
+        _capture_diagnostic(page, "header-failed", header_el, force=True)
+        _dump_diagnostics("Header name not found")
     return "Unknown"
 
 
@@ -277,22 +579,48 @@ def _get_unread_count(badge: ElementHandle) -> int:
         return 1
 
 
-def _extract_messages(page: Page, max_messages: int = 5) -> list[dict]:
+def _extract_messages(
+    page: Page,
+    contact: str,
+    seen_state: dict,
+    max_messages: int = 5,
+) -> list[dict]:
     """
-    Extract up to max_messages recent messages from the currently open chat.
+    Extract up to max_messages messages from the currently open chat that are
+    newer than the contact's watermark and not already in the seen store.
 
-    Returns a list of dicts: {'sender': str, 'text': str, 'timestamp': str}
+    Returns a list of dicts (oldest first):
+        {'id': str, 'sender': str, 'text': str, 'timestamp': str}
+
+    'id' is WhatsApp's per-message data-id (taken from the closest [data-id]
+    ancestor), or a content hash when the row has none.
+
+    The DOM is walked newest → oldest and stops at the watermark, so messages
+    that were already written out are never read again.
 
     Strategy 1 (preferred): data-pre-plain-text attribute on .copyable-text elements.
       Format of the attribute: "[HH:MM, DD/MM/YYYY] Sender Name: "
     Strategy 2 (fallback): message-in / message-out class names.
     """
+    watermark = seen_state["watermarks"].get(contact)
+    seen_ids  = seen_state["seen_set"]
     messages: list[dict] = []
+    caught_up = False  # reached the watermark or an already-seen message
 
     # --- Strategy 1: data-pre-plain-text ---
     elements = page.query_selector_all(".copyable-text[data-pre-plain-text]")
-    for el in elements:
+    for el in reversed(elements):
+        if len(messages) >= max_messages:
+            break
         try:
+            data_id = el.evaluate(
+                'el => { const r = el.closest("[data-id]");'
+                ' return r ? r.getAttribute("data-id") : ""; }'
+            ) or ""
+            if data_id and (data_id == watermark or data_id in seen_ids):
+                caught_up = True
+                break
+
             pre = el.get_attribute("data-pre-plain-text") or ""
             # "[12:30, 22/02/2026] Contact Name: "
             match = re.match(r"\[([^\]]+)\]\s*(.*?):\s*$", pre)
@@ -301,36 +629,48 @@ def _extract_messages(page: Page, max_messages: int = 5) -> list[dict]:
 
             text_el = el.query_selector("span.selectable-text.copyable-text")
             text    = text_el.inner_text().strip() if text_el else el.inner_text().strip()
+            if not text:
+                continue
 
-            if text:
-                messages.append({"sender": sender, "text": text, "timestamp": timestamp})
+            msg_id = data_id or _fallback_message_id(contact, timestamp, text)
+            if msg_id == watermark or msg_id in seen_ids:
+                caught_up = True
+                break
+            messages.append({"id": msg_id, "sender": sender, "text": text, "timestamp": timestamp})
         except Exception:
             continue
 
-    if messages:
-        return messages[-max_messages:]
+    if messages or caught_up:
+        return messages[::-1]
 
     # --- Strategy 2: message direction classes ---
     try:
         all_text_els = page.query_selector_all(
             "div.message-in .selectable-text, div.message-out .selectable-text"
         )
-        for el in all_text_els[-max_messages:]:
+        for el in reversed(all_text_els):
+            if len(messages) >= max_messages:
+                break
             try:
+                info = el.evaluate(
+                    'el => { const r = el.closest("[data-id]");'
+                    ' return { id: r ? r.getAttribute("data-id") : "",'
+                    '          out: !!el.closest("div.message-out") }; }'
+                )
                 text   = el.inner_text().strip()
-                is_out = el.evaluate('el => !!el.closest("div.message-out")')
-                if text:
-                    messages.append({
-                        "sender":    "You" if is_out else "Contact",
-                        "text":      text,
-                        "timestamp": "",
-                    })
+                if not text:
+                    continue
+                sender = "You" if info.get("out") else "Contact"
+                msg_id = info.get("id") or _fallback_message_id(contact, "", f"{sender}:{text}")
+                if msg_id == watermark or msg_id in seen_ids:
+                    break
+                messages.append({"id": msg_id, "sender": sender, "text": text, "timestamp": ""})
             except Exception:
                 continue
     except Exception:
         pass
 
-    return messages[-max_messages:] if messages else []
+    return messages[::-1]
 
 
 # ---------------------------------------------------------------------------
@@ -372,7 +712,7 @@ created: {timestamp_iso}
 status: pending
 ---
 
-## Conversation Context (Last 5 Messages)
+## New Messages (since last seen)
 
 {context_block}
 
@@ -399,20 +739,26 @@ Read the conversation above. Use the classify_message skill to:
 # Core polling logic
 # ---------------------------------------------------------------------------
 
-# Ordered list of JavaScript expressions to find the clickable chat row
-# starting from the badge element. Tried top-to-bottom; first non-null wins.
+# Ordered (label, JavaScript) pairs to find the clickable chat row starting
+# from the badge element. First non-null wins; the last winner is tried
+# first on the next call (see _ordered_probes).
 _CHAT_ROW_STRATEGIES = [
     # WhatsApp-specific container (older builds)
-    "el => el.closest('[data-testid=\"cell-frame-container\"]')",
+    ("cell-frame-container",
+     "el => el.closest('[data-testid=\"cell-frame-container\"]')"),
     # Semantic list item
-    "el => el.closest('[role=\"listitem\"]')",
+    ("role=listitem",
+     "el => el.closest('[role=\"listitem\"]')"),
     # Plain HTML <li>
-    "el => el.closest('li')",
+    ("li",
+     "el => el.closest('li')"),
     # Focusable div — WhatsApp sets tabindex="0" on clickable chat rows
-    "el => el.closest('div[tabindex=\"0\"]')",
+    ("div[tabindex=0]",
+     "el => el.closest('div[tabindex=\"0\"]')"),
     # Walk up 6 parent levels and return the highest reachable ancestor.
     # The badge is usually 5–7 levels deep inside the chat row div.
-    ("el => { let n = el;"
+    ("6 parents up",
+     "el => { let n = el;"
      " for (let i = 0; i < 6; i++) { if (n.parentElement) n = n.parentElement; }"
      " return n; }"),
 ]
@@ -421,29 +767,35 @@ _CHAT_ROW_STRATEGIES = [
 def _find_chat_row(badge: ElementHandle, index: int) -> ElementHandle | None:
     """
     Walk up the DOM from a badge element to find its clickable chat row.
-    Tries each strategy in _CHAT_ROW_STRATEGIES and returns the first hit.
-    Logs the strategy that worked (or failure) so we can tune selectors.
+    Tries each strategy in _CHAT_ROW_STRATEGIES (last winner first) and
+    returns the first hit. Hits and misses feed the probe stats.
     """
-    for i, js in enumerate(_CHAT_ROW_STRATEGIES):
+    tried: list[str] = []
+    for label, js in _ordered_probes("chat_row", _CHAT_ROW_STRATEGIES):
+        tried.append(label)
         try:
             el = badge.evaluate_handle(js).as_element()
             if el:
-                log.info("  [chat %d] Found chat row via strategy %d", index, i + 1)
+                log.info("  [chat %d] Found chat row via strategy %r", index, label)
+                _record_probe("chat_row", label, tried)
                 return el
         except Exception as exc:
-            log.warning("  [chat %d] Strategy %d raised: %s", index, i + 1, exc)
+            log.warning("  [chat %d] Strategy %r raised: %s", index, label, exc)
 
+    _record_probe("chat_row", None, tried)
     log.warning("  [chat %d] All chat-row strategies exhausted — cannot click this chat.", index)
+    _dump_diagnostics("Chat row not found")
     return None
 
 
-def _poll(page: Page, processed: set[str]) -> None:
+def _poll(page: Page, seen_state: dict) -> None:
     """
     One poll cycle: find unread chats, extract messages, write action files.
-    Mutates processed in place.
+    Mutates seen_state in place and saves it to disk after each action file.
 
     Clicking a chat will mark it as read in WhatsApp (standard WA behaviour).
-    The processed set prevents duplicate action files within a session.
+    The seen store (message IDs + per-contact watermark) prevents duplicate
+    action files across polls and across restarts.
     """
     try:
         badges = page.query_selector_all(_UNREAD_BADGE_SELECTOR)
@@ -489,7 +841,8 @@ def _poll(page: Page, processed: set[str]) -> None:
                     log.warning("  [chat %d] Could not find a clickable ancestor — skipping.", i)
                     continue
 
-            page.wait_for_timeout(1_000)  # let messages render
+            page.wait_for_timeout(RENDER_WAIT_MS)  # let messages render
+            _capture_diagnostic(page, f"chat-{i}")
 
             # --- Step 3: resolve final contact name ---
             if contact_pre:
@@ -500,30 +853,31 @@ def _poll(page: Page, processed: set[str]) -> None:
                 contact = _get_contact_name_from_header(page)
                 log.info("  [chat %d] Final contact name: %r", i, contact)
 
-            # --- Step 4: extract message history ---
-            messages = _extract_messages(page, max_messages=5)
-            log.info("  [chat %d] Extracted %d message(s)", i, len(messages))
+            # --- Step 4: extract messages newer than the watermark ---
+            messages = _extract_messages(page, contact, seen_state, max_messages=5)
+            log.info("  [chat %d] Extracted %d new message(s)", i, len(messages))
 
             # --- Step 5: dedup check ---
-            latest_text = messages[-1]["text"] if messages else ""
-            dedup_key   = f"{contact}::{latest_text[:60]}"
-            if dedup_key in processed:
-                log.info("  [chat %d] Already processed this message — skipping.", i)
+            if not messages:
+                log.info("  [chat %d] No messages newer than the last seen one — skipping.", i)
                 continue
+            latest_text = messages[-1]["text"]
 
             # --- Step 6: write action file ---
             now = datetime.now(timezone.utc)
             filename, content = _build_action_file(contact, unread_count, messages, now)
-            action_path = NEEDS_ACTION / filename
-            action_path.write_text(content, encoding="utf-8")
-            processed.add(dedup_key)
+            vault_io.create(NEEDS_ACTION, filename, content)
+            _mark_seen(seen_state, contact, [m["id"] for m in messages])
+            _save_seen_state(seen_state)
 
             log.info("New WhatsApp message from %s: %s", contact, latest_text[:50])
 
         except PlaywrightTimeoutError:
             log.exception("  [chat %d] Playwright timeout — skipping this chat.", i)
+            _dump_diagnostics("Playwright timeout in chat")
         except Exception:
             log.exception("  [chat %d] Unexpected error — skipping this chat.", i)
+            _dump_diagnostics("Unexpected error in chat")
 
 
 # ---------------------------------------------------------------------------
@@ -532,22 +886,16 @@ def _poll(page: Page, processed: set[str]) -> None:
 
 def _debug_selectors(page: Page) -> None:
     """
-    Run once after connecting. Saves a screenshot and probes every candidate
-    selector so you can see which ones actually find elements in the live DOM.
-    Results appear in the terminal — use them to update _UNREAD_BADGE_SELECTOR.
+    Run once after connecting. Probes every candidate selector so you can
+    see which ones actually find elements in the live DOM. Results appear in
+    the terminal — use them to update _UNREAD_BADGE_SELECTOR. With
+    diagnostics on, a full-page snapshot is buffered (not written) as well.
     """
-    DEBUG_SCREENSHOT.parent.mkdir(parents=True, exist_ok=True)
-
     # Page identity
     title = page.title()
     log.info("[DEBUG] Page title: %r", title)
 
-    # Screenshot for visual confirmation
-    try:
-        page.screenshot(path=str(DEBUG_SCREENSHOT))
-        log.info("[DEBUG] Screenshot saved to %s", DEBUG_SCREENSHOT)
-    except Exception as exc:
-        log.warning("[DEBUG] Screenshot failed: %s", exc)
+    _capture_diagnostic(page, "startup", force=True)
 
     # Selector probe — add / remove candidates here freely
     candidates = [
@@ -572,9 +920,19 @@ def _debug_selectors(page: Page) -> None:
 # ---------------------------------------------------------------------------
 
 def main() -> None:
+    global DIAGNOSTICS
+
     args = _parse_args()
     NEEDS_ACTION.mkdir(parents=True, exist_ok=True)
 
+    if args.diagnostics:
+        DIAGNOSTICS = True
+    if DIAGNOSTICS:
+        log.info(
+            "Diagnostics on — sampling %.0f%% of snapshots, keeping the last %d in memory",
+            DIAGNOSTICS_SAMPLE_RATE * 100, DIAGNOSTICS_BUFFER_SIZE,
+        )
+
     # Auto-detect first run: treat as first-run if session dir is missing or empty
     session_exists = SESSION_DIR.exists() and any(SESSION_DIR.iterdir())
     first_run = args.first_run or not session_exists
@@ -582,23 +940,47 @@ def main() -> None:
     if first_run and not args.first_run:
         log.info("No existing session found — running in first-run mode (visible browser).")
 
-    processed: set[str] = set()
+    seen_state = _load_seen_state()
+    _load_probe_stats()
+    _log_probe_stats()
 
     with sync_playwright() as playwright:
         context, page = _connect(playwright, first_run=first_run)
         _debug_selectors(page)
         log.info("WhatsApp Watcher started — polling every 30 seconds")
+        if psutil is None:
+            log.warning(
+                "psutil is not installed — browser RSS cannot be monitored; recycling on JS heap "
+                "above %d MB instead. Run `uv sync` to install it.", JS_HEAP_CEILING_MB,
+            )
+
+        last_memory_check = time.monotonic()
 
         try:
             while True:
+                if time.monotonic() - last_memory_check >= MEMORY_CHECK_INTERVAL:
+                    last_memory_check = time.monotonic()
+                    memory_mb = _browser_memory_mb(page)
+                    if memory_mb is not None:
+                        ceiling = _memory_ceiling_mb()
+                        log.info("Browser memory: %.0f MB (ceiling %d MB)", memory_mb, ceiling)
+                        if memory_mb > ceiling:
+                            log.warning("Memory ceiling exceeded — recycling browser context.")
+                            context, page = _recycle_context(playwright, context)
+                            log.info("Browser context recycled.")
+
                 try:
-                    _poll(page, processed)
+                    _poll(page, seen_state)
                 except PlaywrightTimeoutError:
                     log.error("WhatsApp Web timed out during poll — attempting page reload.")
+                    _capture_diagnostic(page, "poll-timeout", force=True)
+                    _dump_diagnostics("Poll timed out")
                     try:
                         page.reload(timeout=30_000)
                         if not _wait_for_chat_list(page, LOAD_TIMEOUT_MS):
                             log.error("Chat list did not reappear after reload — exiting.")
+                            _capture_diagnostic(page, "no-chat-list", force=True)
+                            _dump_diagnostics("Chat list missing after reload")
                             break
                         log.info("Reconnected after reload.")
                     except Exception as reload_exc:
@@ -607,11 +989,13 @@ def main() -> None:
                 except Exception as exc:
                     log.error("Unexpected error during poll: %s", exc)
 
+                _save_probe_stats()
                 time.sleep(POLL_INTERVAL)
 
         except KeyboardInterrupt:
             log.info("WhatsApp Watcher stopped.")
         finally:
+            _save_probe_stats()
             context.close()
             log.info("Browser closed. Session data preserved at %s", SESSION_DIR)
 
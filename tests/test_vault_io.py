@@ -0,0 +1,64 @@
+"""
+vault_io placement tests. Run from the repo root:
+
+    python -m unittest discover -s tests
+"""
+
+import errno
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+_SCRATCH = tempfile.TemporaryDirectory()
+os.environ.setdefault("VAULT_PATH", _SCRATCH.name)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import vault_catalog  # noqa: E402
+import vault_io  # noqa: E402
+
+vault_catalog.CATALOG_PATH = Path(_SCRATCH.name) / "vault_catalog.db"
+
+
+class LinkFallbackTests(unittest.TestCase):
+    def setUp(self) -> None:
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        vault_io._hard_links = True
+        self.addCleanup(setattr, vault_io, "_hard_links", True)
+
+    def test_missing_source_keeps_hard_links(self) -> None:
+        with self.assertRaises(FileNotFoundError):
+            vault_io.move(self.root / "gone.md", self.root / "Done")
+        self.assertTrue(vault_io._hard_links)
+
+        dest = vault_io.create(self.root / "Needs_Action", "note.md", "body")
+        self.assertEqual(dest.read_text(encoding="utf-8"), "body")
+        self.assertTrue(vault_io._hard_links)
+
+    def test_eperm_on_a_linking_file_system_is_reraised(self) -> None:
+        src = self.root / "note.md"
+        src.write_text("body", encoding="utf-8")
+        refused = OSError(errno.EPERM, "Operation not permitted")
+        with mock.patch.object(vault_io.os, "link", side_effect=[refused, None]):
+            with self.assertRaises(PermissionError):
+                vault_io.move(src, self.root / "Done")
+        self.assertTrue(vault_io._hard_links)
+        self.assertTrue(src.exists())
+
+    def test_falls_back_when_the_probe_fails(self) -> None:
+        src = self.root / "note.md"
+        src.write_text("body", encoding="utf-8")
+        unsupported = OSError(errno.EOPNOTSUPP, "Operation not supported")
+        with mock.patch.object(vault_io.os, "link", side_effect=unsupported):
+            dest = vault_io.move(src, self.root / "Done")
+        self.assertFalse(vault_io._hard_links)
+        self.assertEqual(dest.read_text(encoding="utf-8"), "body")
+        self.assertFalse(src.exists())
+
+
+if __name__ == "__main__":
+    unittest.main()